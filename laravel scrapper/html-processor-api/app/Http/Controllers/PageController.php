@@ -19,18 +19,8 @@ public function process(Request $request)
             return response()->json(['error' => 'Missing HTML or URL from extension.'], 400);
         }
 
-        $scraperScript = '';
-        if (str_contains($url, '/in/')) {
-            $scraperScript = 'person_scraper.py';
-        } elseif (str_contains($url, '/jobs/view/')) {
-            $scraperScript = 'job_scraper.py';
-        } elseif (str_contains($url, '/company/')) {
-            $scraperScript = 'company_scraper.py';
-        } elseif (str_contains($url, 'indeed.com/cmp/')) {
-            $scraperScript = 'indeed_company_scraper.py';
-        } elseif (str_contains($url, 'indeed.') && str_contains($url, 'viewjob')) {
-            $scraperScript = 'indeed_job_scraper.py';
-        } else {
+        $scraperScript = $this->scraperScriptFor($url);
+        if (!$scraperScript) {
             return response()->json(['error' => 'This page type is not supported.'], 400);
         }
         
@@ -40,7 +30,12 @@ public function process(Request $request)
         
         $data = null;
         try {
-            $process = new Process([base_path('venv/Scripts/python.exe'), base_path('scripts/' . $scraperScript), $argument]);
+            // The URL is only used when SCRAPER_CAPTURE_DIR enables page capture (scripts/capture.py).
+            $process = new Process(
+                [base_path('venv/Scripts/python.exe'), base_path('scripts/' . $scraperScript), $argument],
+                null,
+                ['SCRAPER_PAGE_URL' => $url]
+            );
             $process->run();
 
             if (!$process->isSuccessful()) {
@@ -70,4 +65,107 @@ public function process(Request $request)
 
         return response()->json($data);
     }
+
+    /**
+     * Same request as process(), but the fields are sent as they are extracted:
+     * NDJSON lines, or server-sent events when the client accepts text/event-stream.
+     * The client assembles the document from the "field" events once "done" arrives.
+     */
+    public function processStream(Request $request)
+    {
+        $htmlContent = $request->input('html');
+        $url = $request->input('url');
+
+        if (!$htmlContent || !$url) {
+            return response()->json(['error' => 'Missing HTML or URL from extension.'], 400);
+        }
+        if (!$this->scraperScriptFor($url)) {
+            return response()->json(['error' => 'This page type is not supported.'], 400);
+        }
+
+        $useSse = str_contains($request->header('Accept', ''), 'text/event-stream');
+        $tempFileName = 'temp_page_' . time() . '_' . bin2hex(random_bytes(4)) . '.html';
+        Storage::put('scraped_pages/' . $tempFileName, $htmlContent);
+        $argument = Storage::path('scraped_pages/' . $tempFileName);
+
+        return response()->stream(function () use ($argument, $url, $tempFileName, $useSse) {
+            $emit = function (array $event) use ($useSse) {
+                $payload = json_encode($event, JSON_UNESCAPED_UNICODE);
+                echo $useSse ? "event: {$event['event']}\ndata: {$payload}\n\n" : $payload . "\n";
+                if (ob_get_level() > 0) {
+                    ob_flush();
+                }
+                flush();
+            };
+
+            $fields = [];
+            $document = null;
+            $buffer = '';
+            try {
+                $process = new Process([base_path('venv/Scripts/python.exe'), base_path('scripts/field_stream.py'), $argument, $url]);
+                $process->start();
+                foreach ($process as $type => $chunk) {
+                    if ($type !== Process::OUT) {
+                        continue;
+                    }
+                    $buffer .= $chunk;
+                    while (($newline = strpos($buffer, "\n")) !== false) {
+                        $line = trim(substr($buffer, 0, $newline));
+                        $buffer = substr($buffer, $newline + 1);
+                        $event = $line === '' ? null : json_decode($line, true);
+                        if (!is_array($event)) {
+                            continue;
+                        }
+                        if ($event['event'] === 'field') {
+                            $fields[$event['field']] = $event['value'];
+                        } elseif ($event['event'] === 'document') {
+                            $document = $event['value'];
+                        } elseif ($event['event'] === 'done') {
+                            $document ??= array_merge(array_flip($event['fields']), $fields);
+                        }
+                        $emit($event);
+                    }
+                }
+                if (!$process->isSuccessful()) {
+                    throw new ProcessFailedException($process);
+                }
+            } catch (\Exception $exception) {
+                Log::error('A script error occurred: ' . $exception->getMessage());
+                $emit(['event' => 'error', 'error' => 'The server script failed during execution.']);
+            } finally {
+                Storage::delete('scraped_pages/' . $tempFileName);
+            }
+
+            if ($document) {
+                Storage::put('last_profile.json', json_encode($document, JSON_PRETTY_PRINT | JSON_UNESCAPED_UNICODE));
+            }
+        }, 200, [
+            'Content-Type' => $useSse ? 'text/event-stream' : 'application/x-ndjson',
+            'Cache-Control' => 'no-cache',
+            'X-Accel-Buffering' => 'no',
+        ]);
+    }
+
+    /**
+     * The scraper script for a page URL, or null if the page type is not supported.
+     */
+    private function scraperScriptFor(string $url): ?string
+    {
+        if (str_contains($url, '/in/')) {
+            return 'person_scraper.py';
+        } elseif (str_contains($url, '/jobs/view/')) {
+            return 'job_scraper.py';
+        } elseif (str_contains($url, '/company/')) {
+            return 'company_scraper.py';
+        } elseif (str_contains($url, 'indeed.com/cmp/')) {
+            return 'indeed_company_scraper.py';
+        } elseif (str_contains($url, 'indeed.') && str_contains($url, 'viewjob')) {
+            return 'indeed_job_scraper.py';
+        } elseif (str_contains($url, 'linkedin.com/jobs/search') || str_contains($url, 'linkedin.com/jobs/collections')) {
+            return 'job_search_scraper.py';
+        } elseif (str_contains($url, 'indeed.') && (str_contains($url, '/jobs?') || str_contains($url, '/q-'))) {
+            return 'indeed_search_scraper.py';
+        }
+        return null;
+    }
 }
\ No newline at end of file
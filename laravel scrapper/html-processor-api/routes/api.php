@@ -3,4 +3,5 @@
 use Illuminate\Support\Facades\Route;
 use App\Http\Controllers\PageController;
 
-Route::post('/process-page', [PageController::class, 'process']);
\ No newline at end of file
+Route::post('/process-page', [PageController::class, 'process']);
+Route::post('/process-page/stream', [PageController::class, 'processStream']);
\ No newline at end of file
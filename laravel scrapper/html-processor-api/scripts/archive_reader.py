@@ -0,0 +1,410 @@
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import zlib
+import binascii
+import multiprocessing
+
+from page_types import detect_page_type, extract_html
+
+# Reads pages out of WARC and MHTML archives without loading the archive into
+# memory. The archive is memory-mapped and scanned once to build an offset
+# index of its HTML records (byte range, source URL, capture date and how the
+# body is encoded). The index is cached next to the archive, so later runs go
+# straight to the records.
+#
+# Bodies stored as-is (uncompressed WARC responses, binary MHTML parts) are
+# handed to the extractors as memoryview slices of the map, so the only copy
+# is the decode to str inside extract_html. Chunked, compressed or
+# transfer-encoded bodies have to be decoded into a new buffer first; gzipped
+# WARC files are indexed per gzip member, so reading one record decompresses
+# only that member (and counts as decoded, not zero-copy).
+
+INDEX_SUFFIX = ".idx.ndjson"
+INDEX_VERSION = 1
+# Header blocks are looked for within this many bytes. For gzipped WARC files
+# it is also how much of each member is kept while indexing; the rest of the
+# member is decompressed and dropped.
+HEADER_SCAN_BYTES = 64 * 1024
+GZIP_FEED_BYTES = 1024 * 1024
+# Records handed to a worker process at a time.
+DEFAULT_RANGE_SIZE = 64
+
+_HEADER_END_RE = re.compile(rb"\r?\n\r?\n")
+_BOUNDARY_RE = re.compile(rb'boundary\s*=\s*"?([^";\r\n]+)"?', re.I)
+_HEADER_LINE_RE = re.compile(rb"^[A-Za-z][A-Za-z0-9-]*:")
+
+def archive_format(path):
+    """Returns "warc", "warc.gz" or "mhtml" for an archive path, or None."""
+    name = path.lower()
+    if name.endswith((".warc.gz", ".arc.gz")):
+        return "warc.gz"
+    if name.endswith(".warc"):
+        return "warc"
+    if name.endswith((".mht", ".mhtml")):
+        return "mhtml"
+    return None
+
+def _parse_headers(raw):
+    """Parses a header block (bytes) into a dict with lower-cased names."""
+    headers = {}
+    name = None
+    for line in raw.decode("latin-1").splitlines():
+        if line[:1] in (" ", "\t") and name:
+            # Folded continuation line.
+            headers[name] += " " + line.strip()
+            continue
+        key, sep, value = line.partition(":")
+        if sep:
+            name = key.strip().lower()
+            headers[name] = value.strip()
+    return headers
+
+def _split_headers(buf, start, end):
+    """Finds the blank line after a header block; returns (headers, body_start) or None."""
+    match = _HEADER_END_RE.search(buf, start, end)
+    if not match:
+        return None
+    return _parse_headers(buf[start:match.start()]), match.end()
+
+def _is_html(content_type):
+    content_type = content_type.lower()
+    return "text/html" in content_type or "application/xhtml" in content_type
+
+def _body_encoding(http_headers):
+    """How an HTTP body has to be decoded, outermost first, joined by '+'."""
+    steps = []
+    if "chunked" in http_headers.get("transfer-encoding", "").lower():
+        steps.append("chunked")
+    content_encoding = http_headers.get("content-encoding", "").lower().strip()
+    if content_encoding and content_encoding != "identity":
+        steps.append(content_encoding)
+    return "+".join(steps) or "identity"
+
+# --- WARC ---
+
+def _warc_entry(buf, warc_headers, block_start, block_end):
+    """Builds an index entry for one WARC record, or None if it is not an HTML page."""
+    record_type = warc_headers.get("warc-type", "").lower()
+    url = warc_headers.get("warc-target-uri", "").strip("<>")
+    entry = {"url": url, "captured_at": warc_headers.get("warc-date")}
+    if record_type == "response":
+        http = _split_headers(buf, block_start, block_end)
+        if not http or not _is_html(http[0].get("content-type", "")):
+            return None
+        status = bytes(buf[block_start:block_start + 12]).split(b" ")
+        if len(status) > 1 and status[1][:1] != b"2":
+            return None
+        entry.update(offset=http[1], length=block_end - http[1], encoding=_body_encoding(http[0]))
+        return entry
+    if record_type == "resource" and _is_html(warc_headers.get("content-type", "")):
+        entry.update(offset=block_start, length=block_end - block_start, encoding="identity")
+        return entry
+    return None
+
+def _index_warc(buf):
+    entries = []
+    pos, size = 0, len(buf)
+    while pos < size:
+        if buf[pos:pos + 5] != b"WARC/":
+            # Skip padding or garbage up to the next record.
+            pos = buf.find(b"WARC/", pos + 1)
+            if pos < 0:
+                break
+            continue
+        parsed = _split_headers(buf, pos, min(size, pos + HEADER_SCAN_BYTES))
+        if not parsed:
+            break
+        warc_headers, block_start = parsed
+        try:
+            length = int(warc_headers.get("content-length", ""))
+        except ValueError:
+            pos += 5
+            continue
+        block_end = min(size, block_start + length)
+        entry = _warc_entry(buf, warc_headers, block_start, block_end)
+        if entry:
+            entries.append(entry)
+        pos = block_end
+    return entries
+
+def _index_warc_gz(buf):
+    """Indexes a gzipped WARC member by member; offsets point into each decompressed member."""
+    entries = []
+    pos, size = 0, len(buf)
+    view = memoryview(buf)
+    try:
+        while pos < size:
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            head = bytearray()
+            fed = 0
+            while not decompressor.eof and pos + fed < size:
+                chunk = view[pos + fed:pos + fed + GZIP_FEED_BYTES]
+                fed += len(chunk)
+                out = decompressor.decompress(chunk)
+                if len(head) < HEADER_SCAN_BYTES:
+                    head += out[:HEADER_SCAN_BYTES - len(head)]
+            member_length = fed - len(decompressor.unused_data)
+            parsed = _split_headers(head, 0, len(head)) if head.startswith(b"WARC/") else None
+            if parsed:
+                warc_headers, block_start = parsed
+                length = int(warc_headers.get("content-length", "0") or 0)
+                entry = _warc_entry(head, warc_headers, block_start, block_start + length)
+                if entry:
+                    entry.update(member_offset=pos, member_length=member_length)
+                    entries.append(entry)
+            if not decompressor.eof:
+                break
+            pos += member_length
+    finally:
+        view.release()
+    return entries
+
+# --- MHTML ---
+
+def _index_mhtml(buf):
+    """
+    Indexes the main document of every MHTML message in the file (Chrome saves
+    one page per message; concatenated messages are handled). Sub-frame HTML
+    parts are skipped.
+    """
+    entries = []
+    pos, size = 0, len(buf)
+    while pos < size:
+        parsed = _split_headers(buf, pos, min(size, pos + HEADER_SCAN_BYTES))
+        if not parsed:
+            break
+        headers, body_start = parsed
+        match = _BOUNDARY_RE.search(headers.get("content-type", "").encode("latin-1"))
+        if not match:
+            break
+        delimiter = b"--" + match.group(1)
+        snapshot_url = headers.get("snapshot-content-location")
+        main = None
+        part = buf.find(delimiter, body_start)
+        while part >= 0:
+            part_start = part + len(delimiter)
+            if buf[part_start:part_start + 2] == b"--":
+                pos = part_start + 2
+                break
+            next_part = buf.find(delimiter, part_start)
+            part_end = next_part if next_part >= 0 else size
+            part_headers = _split_headers(buf, part_start, part_end)
+            if main is None and part_headers and _is_html(part_headers[0].get("content-type", "")):
+                location = part_headers[0].get("content-location", "")
+                if not snapshot_url or location == snapshot_url:
+                    # The line break before the next delimiter belongs to the delimiter.
+                    end = part_end
+                    if buf[end - 2:end] == b"\r\n":
+                        end -= 2
+                    elif buf[end - 1:end] == b"\n":
+                        end -= 1
+                    encoding = part_headers[0].get("content-transfer-encoding", "binary").lower()
+                    main = {
+                        "url": location or snapshot_url,
+                        "captured_at": headers.get("date"),
+                        "offset": part_headers[1],
+                        "length": end - part_headers[1],
+                        "encoding": "identity" if encoding in ("binary", "8bit", "7bit") else encoding,
+                    }
+            part = next_part
+        else:
+            pos = size
+        if main:
+            entries.append(main)
+        # Skip to the next message, if any.
+        while pos < size and buf[pos:pos + 1] in (b"\r", b"\n", b" ", b"\t"):
+            pos += 1
+        if not _HEADER_LINE_RE.match(buf[pos:pos + 64]):
+            break
+    return entries
+
+# --- Index ---
+
+_INDEXERS = {"warc": _index_warc, "warc.gz": _index_warc_gz, "mhtml": _index_mhtml}
+
+def open_archive(path):
+    """Memory-maps an archive read-only. Returns None for an empty file."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _index_header(path, fmt):
+    stat = os.stat(path)
+    return {"version": INDEX_VERSION, "format": fmt, "size": stat.st_size, "mtime": stat.st_mtime}
+
+def build_index(path):
+    """Scans an archive and returns the list of its HTML record entries."""
+    fmt = archive_format(path)
+    if fmt is None:
+        raise ValueError(f"Not a WARC or MHTML archive: {path}")
+    buf = open_archive(path)
+    if buf is None:
+        return []
+    try:
+        return _INDEXERS[fmt](buf)
+    finally:
+        buf.close()
+
+def load_index(path, rebuild=False):
+    """
+    Returns the archive's record index, reading the cached "<archive>.idx.ndjson"
+    when it matches the archive's size and mtime and rebuilding it otherwise.
+    """
+    fmt = archive_format(path)
+    if fmt is None:
+        raise ValueError(f"Not a WARC or MHTML archive: {path}")
+    header = _index_header(path, fmt)
+    cache = path + INDEX_SUFFIX
+    if not rebuild and os.path.exists(cache):
+        try:
+            with open(cache, "r", encoding="utf-8") as f:
+                if json.loads(f.readline()) == header:
+                    return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            pass
+    entries = build_index(path)
+    try:
+        temp = cache + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temp, cache)
+    except OSError as exc:
+        # A read-only archive directory only costs a rescan next time.
+        print(f"Could not write archive index {cache}: {exc}", file=sys.stderr)
+    return entries
+
+# --- Reading records ---
+
+def _dechunk(body):
+    body = bytes(body)
+    out = bytearray()
+    pos, size = 0, len(body)
+    while pos < size:
+        line_end = body.find(b"\r\n", pos)
+        if line_end < 0:
+            break
+        chunk_size = int(bytes(body[pos:line_end]).split(b";")[0].strip() or b"0", 16)
+        if chunk_size == 0:
+            break
+        start = line_end + 2
+        out += body[start:start + chunk_size]
+        pos = start + chunk_size + 2
+    return bytes(out)
+
+def _decode_body(body, encoding):
+    """Undoes transfer/content encodings in the order they were applied."""
+    for step in encoding.split("+"):
+        if step in ("identity", ""):
+            continue
+        if step == "chunked":
+            body = _dechunk(body)
+        elif step in ("gzip", "x-gzip", "deflate"):
+            # 47 = auto-detect gzip or zlib headers; raw deflate needs -15.
+            try:
+                body = zlib.decompress(body, zlib.MAX_WBITS | 32)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        elif step == "quoted-printable":
+            body = binascii.a2b_qp(body)
+        elif step == "base64":
+            body = binascii.a2b_base64(body)
+        else:
+            raise ValueError(f"Unsupported body encoding: {step}")
+    return body
+
+def read_record(buf, entry):
+    """
+    Returns (html, copied) for one indexed record. Identity-encoded records of
+    an uncompressed archive come back as a memoryview into `buf` and copied is
+    False; records of a gzipped WARC or with any body encoding had to be
+    decompressed or decoded into a new buffer first.
+    """
+    if "member_offset" in entry:
+        member = zlib.decompress(buf[entry["member_offset"]:entry["member_offset"] + entry["member_length"]], zlib.MAX_WBITS | 16)
+        body = memoryview(member)[entry["offset"]:entry["offset"] + entry["length"]]
+        copied = True
+    else:
+        body = memoryview(buf)[entry["offset"]:entry["offset"] + entry["length"]]
+        copied = False
+    if entry["encoding"] == "identity":
+        return body, copied
+    try:
+        return _decode_body(body, entry["encoding"]), True
+    finally:
+        body.release()
+
+def extract_record(buf, entry, source):
+    """Extracts one record; returns an NDJSON-ready result in the batch record shape."""
+    page_type = detect_page_type(entry["url"])
+    result = {"url": entry["url"], "page_type": page_type, "source": source, "captured_at": entry.get("captured_at")}
+    if not page_type:
+        result["error"] = "This page type is not supported."
+        return result, "unsupported"
+    body, copied = read_record(buf, entry)
+    try:
+        result["data"] = extract_html(body, page_type)
+        outcome = "decoded" if copied else "zero_copy"
+    except Exception as exc:
+        result["data"] = {"type": page_type, "error": str(exc)}
+        outcome = "error"
+    finally:
+        if isinstance(body, memoryview):
+            body.release()
+    return result, outcome
+
+# --- Processing index ranges ---
+
+_worker_archive = {}
+
+def _extract_range(task):
+    """Worker entry point: extracts entries [start, stop) of an archive's index."""
+    path, start, entries = task
+    buf = _worker_archive.get(path)
+    if buf is None:
+        buf = _worker_archive[path] = open_archive(path)
+    results = []
+    for number, entry in enumerate(entries, start):
+        results.append(extract_record(buf, entry, f"{path}#{number}"))
+    return results
+
+def process_archive(path, out, workers=1, start=0, stop=None, range_size=DEFAULT_RANGE_SIZE, rebuild_index=False):
+    """
+    Extracts the HTML records [start, stop) of an archive and writes one NDJSON
+    record per page to `out`, in index order. With workers > 1 the range is
+    split into slices of `range_size` records processed in parallel; every
+    worker maps the archive itself, so only index entries cross processes.
+    Returns the run statistics.
+    """
+    started = time.perf_counter()
+    entries = load_index(path, rebuild=rebuild_index)
+    stop = len(entries) if stop is None else min(stop, len(entries))
+    tasks = [(path, i, entries[i:min(i + range_size, stop)]) for i in range(start, stop, range_size)]
+    stats = {"records": max(0, stop - start), "index_size": len(entries), "zero_copy": 0, "decoded": 0, "unsupported": 0, "errors": 0}
+
+    if workers > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(min(workers, len(tasks)))
+        batches = pool.imap(_extract_range, tasks)
+    else:
+        pool = None
+        batches = map(_extract_range, tasks)
+    try:
+        for results in batches:
+            for result, outcome in results:
+                stats["errors" if outcome == "error" else outcome] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        buf = _worker_archive.pop(path, None)
+        if buf is not None:
+            buf.close()
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return stats
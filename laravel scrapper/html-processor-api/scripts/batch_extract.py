@@ -0,0 +1,137 @@
+import sys
+import json
+import time
+
+from corpus import iter_corpus
+from page_types import detect_page_type, extract_html
+from near_duplicates import NearDuplicateIndex, page_fingerprint, DEFAULT_SIMILARITY, UNCLUSTERED_PAGE_TYPES
+from layout_fingerprint import variant_stats
+from segments import shard_key, shard_of, content_hash
+
+def _read_html(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _record(page, page_type, representative, data, extractor=None, html_sha256=None, canonical=None):
+    record = {
+        "url": page["url"],
+        "page_type": page_type,
+        "source": page["path"],
+        "captured_at": page["captured_at"],
+        "representative": representative["path"],
+        "content_hash": content_hash(data),
+        "data": data,
+    }
+    # Field versions (and the stored source) let `reextract` refresh stale fields later.
+    if extractor is not None:
+        record["extractor"] = extractor
+    if html_sha256 is not None:
+        record["html_sha256"] = html_sha256
+    if canonical is not None:
+        record["canonical"] = canonical
+    return record
+
+def _plan(pages, dedupe, threshold, stats):
+    """
+    Groups supported pages into clusters. Without dedupe every page is its own
+    cluster; with it, near-identical captures of the same URL share one,
+    except for search pages (see near_duplicates.UNCLUSTERED_PAGE_TYPES).
+    """
+    index = NearDuplicateIndex(threshold) if dedupe else None
+    unclustered = 0
+    for page in pages:
+        page_type = detect_page_type(page["url"])
+        if not page_type:
+            stats["unsupported"] += 1
+            yield None, [page]
+            continue
+        page["page_type"] = page_type
+        if index is None or page_type in UNCLUSTERED_PAGE_TYPES:
+            unclustered += index is not None
+            yield page_type, [page]
+            continue
+        started = time.perf_counter()
+        fingerprint = page_fingerprint(_read_html(page["path"]))
+        stats["fingerprint_seconds"] += time.perf_counter() - started
+        index.add(page["url"], fingerprint, page)
+
+    if index is None:
+        return
+    stats["dedupe"] = index.stats()
+    stats["dedupe"]["unclustered"] = unclustered
+    for members in index.iter_clusters():
+        yield members[0]["page_type"], members
+
+def run_batch(corpus_path, out, dedupe=True, threshold=DEFAULT_SIMILARITY, shard=None, html_store=None,
+              section_store=None, normalization=None, join_companies=False, spill_dir=None):
+    """
+    Extracts every page in a corpus and writes one NDJSON record per page to
+    `out`. With dedupe on, only the newest capture of each near-duplicate
+    cluster is extracted and its result is fanned out to the other members.
+    With shard=(i, N), only pages whose canonical URL hashes to shard i are
+    processed; all captures of a URL land in the same shard. With an HtmlStore, the
+    source of every extracted page is kept (gzipped) for later re-extraction.
+    With a SectionStore, sections unchanged since the URL was last extracted
+    are reused instead of extracted again. With a NormalizationIndex, every
+    record gets the canonical ids of its companies, skills and locations.
+    With join_companies, job records get a company_ref to the company
+    records of the run (see company_join); jobs whose company has not been
+    seen yet are spilled to spill_dir and written at the end.
+    Returns the run statistics.
+    """
+    stats = {"pages": 0, "extracted": 0, "unsupported": 0, "errors": 0, "fingerprint_seconds": 0.0}
+    started = time.perf_counter()
+    pages = list(iter_corpus(corpus_path))
+    if shard is not None:
+        index, count = shard
+        stats["shard"] = f"{index}/{count}"
+        stats["corpus_pages"] = len(pages)
+        pages = [page for page in pages if shard_of(shard_key(page), count) == index]
+    stats["pages"] = len(pages)
+    if section_store is not None:
+        from section_delta import extract_delta
+        stats["sections"] = {"reused": 0, "recomputed": 0}
+    if normalization is not None:
+        stats["normalization"] = {"index": normalization.digest, "annotated": 0}
+    join = None
+    if join_companies:
+        from company_join import CompanyJoin
+        join = CompanyJoin(out, spill_dir)
+
+    for page_type, members in _plan(pages, dedupe, threshold, stats):
+        if page_type is None:
+            page = members[0]
+            out.write(json.dumps({"url": page["url"], "source": page["path"], "error": "This page type is not supported."}, ensure_ascii=False) + "\n")
+            continue
+        representative = max(members, key=lambda p: p["captured_at"])
+        html = _read_html(representative["path"])
+        html_sha256 = html_store.put(html) if html_store is not None else None
+        try:
+            if section_store is not None:
+                data, extractor, delta = extract_delta(html, page_type, representative["url"], section_store)
+                stats["sections"]["reused"] += len(delta["reused"])
+                stats["sections"]["recomputed"] += len(delta["recomputed"])
+            else:
+                data, extractor = extract_html(html, page_type, with_versions=True)
+            stats["extracted"] += 1
+        except Exception as exc:
+            print(f"Extraction failed for {representative['path']}: {exc}", file=sys.stderr)
+            data, extractor = {"type": page_type, "error": str(exc)}, None
+            stats["errors"] += 1
+        canonical = None
+        if normalization is not None and extractor is not None:
+            canonical = normalization.canonical_ids(page_type, data)
+            stats["normalization"]["annotated"] += 1
+        for page in members:
+            record = _record(page, page_type, representative, data, extractor, html_sha256, canonical)
+            if join is not None:
+                join.add(record)
+            else:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if join is not None:
+        stats["company_join"] = join.finish()
+    stats["fingerprint_seconds"] = round(stats["fingerprint_seconds"], 3)
+    stats["layouts"] = variant_stats()
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return stats
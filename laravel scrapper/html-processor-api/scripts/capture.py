@@ -0,0 +1,155 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+
+from corpus import HEAD_SCAN_BYTES, canonical_url, url_from_html
+
+# Opt-in capture of the pages the scrapers receive in production into a
+# replay corpus (see replay.py). Set SCRAPER_CAPTURE_DIR and every page an
+# entry point extracts is saved there with a sidecar holding its URL, page
+# type, size and extraction time:
+#
+#   <dir>/<page_type>/<sha256 prefix>.html
+#   <dir>/<page_type>/<sha256 prefix>.json
+#
+# so the directory is an ordinary corpus for batch, profile and replay.
+# Attributes that carry member or tracking identifiers are removed before a
+# page is written (SCRAPER_CAPTURE_STRIP_ATTRIBUTES overrides the list, comma
+# separated). A page is skipped when a near-duplicate capture of the same
+# canonical URL is already stored (near_duplicates SimHash); the fingerprints
+# seen per URL are kept under <dir>/.index. Two processes capturing the same
+# URL at once may both keep their page.
+#
+# Capturing never fails an extraction: errors are reported on stderr.
+
+CAPTURE_DIR_ENV = "SCRAPER_CAPTURE_DIR"
+STRIP_ATTRIBUTES_ENV = "SCRAPER_CAPTURE_STRIP_ATTRIBUTES"
+# Set by PageController: the scraper scripts only get the page's file path.
+PAGE_URL_ENV = "SCRAPER_PAGE_URL"
+
+# Member ids, tracking tokens and form tokens. None of them is read by a
+# selector; attributes the extractors do read (data-entity-urn, data-jk,
+# data-testid...) must stay.
+DEFAULT_STRIP_ATTRIBUTES = (
+    "data-member-id",
+    "data-tracking-id",
+    "data-tracking-control-name",
+    "data-view-tracking-scope",
+    "data-impression-id",
+    "data-csrf-token",
+    "nonce",
+)
+
+def strip_attributes(html, attributes=DEFAULT_STRIP_ATTRIBUTES):
+    """Removes every occurrence of the named attributes (and their values) from page bytes."""
+    if not attributes:
+        return html
+    pattern = re.compile(
+        rb"\s(?:" + b"|".join(re.escape(name.encode("ascii")) for name in attributes) + rb")"
+        rb"(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'>]+))?(?=[\s/>])",
+        re.I,
+    )
+    return pattern.sub(b"", html)
+
+def _attributes_from_env():
+    value = os.environ.get(STRIP_ATTRIBUTES_ENV)
+    if value is None:
+        return DEFAULT_STRIP_ATTRIBUTES
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+class CaptureStore:
+    """A capture corpus directory; add() saves one page unless it is a near-duplicate."""
+    def __init__(self, root, attributes=DEFAULT_STRIP_ATTRIBUTES, threshold=None):
+        from near_duplicates import DEFAULT_SIMILARITY
+
+        self.root = root
+        self.attributes = attributes
+        self.threshold = DEFAULT_SIMILARITY if threshold is None else threshold
+
+    def _index_path(self, url):
+        digest = hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, ".index", digest[:2], digest + ".json")
+
+    def _write(self, path, data):
+        if not isinstance(data, bytes):
+            data = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+
+    def add(self, html, url, page_type, extract_seconds=None, failed=False):
+        """Stores a page and returns its path, or None when it duplicates a stored capture."""
+        from near_duplicates import page_fingerprint, similarity
+
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        html = strip_attributes(html, self.attributes)
+        url = url or url_from_html(html[:HEAD_SCAN_BYTES])
+        fingerprint = page_fingerprint(html)
+        index_path = self._index_path(url) if url else None
+        seen = []
+        if index_path and os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                seen = json.load(f)
+            if any(similarity(int(known, 16), fingerprint) >= self.threshold for known in seen):
+                return None
+
+        digest = hashlib.sha256(html).hexdigest()
+        base = os.path.join(self.root, page_type or "unknown", digest[:24])
+        if os.path.exists(base + ".html"):
+            return None
+        self._write(base + ".html", html)
+        self._write(base + ".json", {
+            "url": url,
+            "captured_at": time.time(),
+            "page_type": page_type,
+            "size": len(html),
+            "extract_ms": None if extract_seconds is None else round(extract_seconds * 1000, 2),
+            "failed": failed,
+            "sha256": digest,
+            "fingerprint": f"{fingerprint:016x}",
+        })
+        if index_path:
+            self._write(index_path, seen + [f"{fingerprint:016x}"])
+        return base + ".html"
+
+def capture_page(html, url, page_type, extract_seconds=None, failed=False):
+    """Saves a page to the capture corpus when SCRAPER_CAPTURE_DIR is set. Never raises."""
+    root = os.environ.get(CAPTURE_DIR_ENV)
+    if not root:
+        return None
+    try:
+        return CaptureStore(root, _attributes_from_env()).add(html, url, page_type, extract_seconds, failed)
+    except Exception as exc:
+        print(f"Page capture failed: {exc.__class__.__name__}: {exc}", file=sys.stderr)
+        return None
+
+@contextmanager
+def capturing(path, page_type, url=None):
+    """
+    Times the extraction in the block and then captures the page file at `path`
+    (the URL defaults to SCRAPER_PAGE_URL). Does nothing unless capture is enabled.
+    """
+    if not os.environ.get(CAPTURE_DIR_ENV):
+        yield
+        return
+    started = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        elapsed = time.perf_counter() - started
+        try:
+            with open(path, "rb") as f:
+                html = f.read()
+        except OSError:
+            html = None
+        if html is not None:
+            capture_page(html, url or os.environ.get(PAGE_URL_ENV), page_type, elapsed, failed)
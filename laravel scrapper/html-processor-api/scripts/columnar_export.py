@@ -0,0 +1,291 @@
+import os
+import re
+import sys
+import csv
+import json
+from datetime import datetime, timezone
+
+from corpus import canonical_url
+from segments import find_segments
+
+# Exports batch output (NDJSON files or segment directories, see segments.py)
+# into flat tables for spreadsheets and warehouses, one file per table:
+#
+#   jobs                 job, indeed_job and search result rows
+#   companies            company and indeed_company pages
+#   profiles             person pages, scalar fields
+#   profile_experience   one row per entry, keyed by profile_id
+#   profile_education    one row per entry, keyed by profile_id
+#   profile_skills       one row per skill, keyed by profile_id
+#   profile_languages    one row per language, keyed by profile_id
+#
+# Records are read one line at a time and rows are buffered per table only
+# up to a row group, so memory stays bounded whatever the size of the input.
+# Parquet (needs pyarrow) writes every row group as it fills, with repeated
+# strings (company names, industries, skills...) dictionary-encoded. Without
+# pyarrow the export falls back to CSV, one file per table with the same
+# columns and no dictionary encoding. "Not available" becomes an empty value
+# unless keep_not_available is set. Files are written under a temporary name
+# and renamed when complete.
+
+FORMATS = ("parquet", "csv")
+DEFAULT_ROW_GROUP_ROWS = 50000
+
+RECORD_COLUMNS = ("url", "page_type", "captured_at", "content_hash")
+# columns: in output order. dictionary: string columns with few distinct values.
+TABLES = {
+    "jobs": {
+        "columns": RECORD_COLUMNS + (
+            "job_id", "job_url", "job_title", "company_name", "location", "salary", "date_posted", "workplace_type",
+            "employment_type", "job_type", "experience_level", "applicants_count", "job_description",
+        ),
+        "dictionary": (
+            "page_type", "company_name", "location", "date_posted", "workplace_type", "employment_type", "job_type",
+            "experience_level",
+        ),
+    },
+    "companies": {
+        "columns": RECORD_COLUMNS + (
+            "company_name", "tagline", "logo_url", "cover_pic_url", "follower_count", "about", "website", "industry",
+            "company_size", "headquarters", "founded", "specialties",
+        ),
+        "dictionary": ("page_type", "industry", "company_size", "headquarters"),
+    },
+    "profiles": {
+        "columns": ("profile_id",) + RECORD_COLUMNS + (
+            "name", "headline", "location", "profile_pic_url", "cover_pic_url", "about", "highest_education_level",
+        ),
+        "dictionary": ("page_type", "location", "highest_education_level"),
+    },
+    "profile_experience": {
+        "columns": (
+            "profile_id", "position", "company_name", "company_location", "job_type", "role", "date_from", "date_to",
+            "details", "is_current",
+        ),
+        "dictionary": ("company_name", "company_location", "job_type", "role"),
+    },
+    "profile_education": {
+        "columns": ("profile_id", "position", "institution_name", "degree", "date_from", "date_to", "details", "is_current"),
+        "dictionary": ("institution_name", "degree"),
+    },
+    "profile_skills": {
+        "columns": ("profile_id", "position", "skill"),
+        "dictionary": ("skill",),
+    },
+    "profile_languages": {
+        "columns": ("profile_id", "position", "language", "proficiency"),
+        "dictionary": ("language", "proficiency"),
+    },
+}
+INTEGER_COLUMNS = ("position",)
+BOOLEAN_COLUMNS = ("is_current",)
+
+# Page type of a batch record -> table its data goes to.
+PAGE_TABLES = {
+    "job": "jobs",
+    "indeed_job": "jobs",
+    "job_search": "jobs",
+    "indeed_search": "jobs",
+    "company": "companies",
+    "indeed_company": "companies",
+    "person": "profiles",
+}
+# Person list fields -> (child table, column holding a plain string item).
+PROFILE_CHILDREN = {
+    "experience": ("profile_experience", None),
+    "education": ("profile_education", None),
+    "skills": ("profile_skills", "skill"),
+    "languages": ("profile_languages", None),
+}
+
+_PROFILE_SLUG = re.compile(r"/in/([^/?#]+)")
+
+def default_format():
+    """parquet when pyarrow is installed, csv otherwise."""
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        return "csv"
+
+def profile_id(url):
+    """The profile's public slug (linkedin.com/in/<slug>), or its canonical URL."""
+    canonical = canonical_url(url) or url or ""
+    match = _PROFILE_SLUG.search(canonical)
+    return match.group(1) if match else canonical
+
+def _timestamp(value):
+    """captured_at is an mtime or an ISO date (see corpus.read_page_meta); export it as ISO 8601."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat()
+    return value
+
+class CsvTableWriter:
+    extension = ".csv"
+
+    def __init__(self, path, name, row_group_rows):
+        self.path = path
+        self.columns = TABLES[name]["columns"]
+        self.row_group_rows = row_group_rows
+        self.rows = 0
+        self.row_groups = 0
+        self._buffer = []
+        self._temp = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._temp, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def append(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self._writer.writerows(
+            [None if row.get(c) is None else str(row[c]).lower() if c in BOOLEAN_COLUMNS else row[c] for c in self.columns]
+            for row in self._buffer
+        )
+        self.rows += len(self._buffer)
+        self.row_groups += 1
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        os.replace(self._temp, self.path)
+
+    def discard(self):
+        self._file.close()
+        os.remove(self._temp)
+
+class ParquetTableWriter:
+    extension = ".parquet"
+
+    def __init__(self, path, name, row_group_rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.path = path
+        self.columns = TABLES[name]["columns"]
+        self.row_group_rows = row_group_rows
+        self.rows = 0
+        self.row_groups = 0
+        dictionary = TABLES[name]["dictionary"]
+        self.schema = pa.schema([
+            (column, pa.int32() if column in INTEGER_COLUMNS
+             else pa.bool_() if column in BOOLEAN_COLUMNS
+             else pa.dictionary(pa.int32(), pa.string()) if column in dictionary
+             else pa.string())
+            for column in self.columns
+        ])
+        self._buffer = {column: [] for column in self.columns}
+        self._buffered = 0
+        self._temp = f"{path}.{os.getpid()}.tmp"
+        self._writer = pq.ParquetWriter(self._temp, self.schema, compression="zstd", use_dictionary=list(dictionary))
+
+    def append(self, row):
+        for column, values in self._buffer.items():
+            values.append(row.get(column))
+        self._buffered += 1
+        if self._buffered >= self.row_group_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffered:
+            return
+        table = self._pa.Table.from_pydict(self._buffer, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self._buffered)
+        self.rows += self._buffered
+        self.row_groups += 1
+        self._buffer = {column: [] for column in self.columns}
+        self._buffered = 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        os.replace(self._temp, self.path)
+
+    def discard(self):
+        self._writer.close()
+        os.remove(self._temp)
+
+WRITERS = {"parquet": ParquetTableWriter, "csv": CsvTableWriter}
+
+def iter_records(paths):
+    """Batch records from NDJSON files, segment directories or "-" (stdin), one at a time."""
+    for path in find_segments(paths):
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def record_rows(record, keep_not_available=False):
+    """Yields (table, row) for every row a batch record contributes; nothing for errors."""
+    page_type = record.get("page_type")
+    table = PAGE_TABLES.get(page_type)
+    data = record.get("data")
+    if table is None or not data or (isinstance(data, dict) and "error" in data):
+        return
+    clean = (lambda value: value) if keep_not_available else (lambda value: None if value == "Not available" else value)
+    base = {
+        "url": record.get("url"),
+        "page_type": page_type,
+        "captured_at": _timestamp(record.get("captured_at")),
+        "content_hash": record.get("content_hash"),
+    }
+    for item in data if isinstance(data, list) else [data]:
+        row = dict(base)
+        row.update((key, clean(value)) for key, value in item.items() if not isinstance(value, list))
+        if table != "profiles":
+            yield table, row
+            continue
+        row["profile_id"] = profile_id(record.get("url"))
+        yield table, row
+        for field, (child, column) in PROFILE_CHILDREN.items():
+            for position, entry in enumerate(item.get(field) or []):
+                child_row = {"profile_id": row["profile_id"], "position": position}
+                if isinstance(entry, dict):
+                    child_row.update((key, clean(value)) for key, value in entry.items())
+                else:
+                    child_row[column] = clean(entry)
+                yield child, child_row
+
+def export(paths, out_dir, fmt=None, row_group_rows=DEFAULT_ROW_GROUP_ROWS, keep_not_available=False):
+    """
+    Streams the batch records in `paths` into one file per table under
+    out_dir and returns the export statistics.
+    """
+    fmt = fmt or default_format()
+    if fmt == "parquet" and default_format() != "parquet":
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow); use --format csv instead.")
+    os.makedirs(out_dir, exist_ok=True)
+    writer_class = WRITERS[fmt]
+    writers = {
+        name: writer_class(os.path.join(out_dir, name + writer_class.extension), name, row_group_rows)
+        for name in TABLES
+    }
+    stats = {"format": fmt, "records": 0, "skipped": 0, "tables": {}}
+    try:
+        for record in iter_records(paths):
+            stats["records"] += 1
+            exported = False
+            for table, row in record_rows(record, keep_not_available):
+                writers[table].append(row)
+                exported = True
+            stats["skipped"] += not exported
+    except BaseException:
+        # A partial export leaves no files behind.
+        for writer in writers.values():
+            writer.discard()
+        raise
+    for name, writer in writers.items():
+        writer.close()
+        stats["tables"][name] = {"path": writer.path, "rows": writer.rows, "row_groups": writer.row_groups}
+    return stats
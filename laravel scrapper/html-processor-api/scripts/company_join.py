@@ -0,0 +1,138 @@
+import os
+import re
+import json
+import tempfile
+
+from corpus import canonical_url
+from normalization import normalize_name
+
+# Links job postings to the company records of the same run. Records stream
+# through CompanyJoin once, in any order:
+#
+#   - company and indeed_company records are indexed by the normalized
+#     company name and by the company's URL slug (linkedin.com/company/<slug>,
+#     indeed.com/cmp/<slug>), then written out;
+#   - a job record whose company is already indexed gets its company_ref and
+#     is written out at once; one whose company has not been seen yet is
+#     spilled to a temporary NDJSON file on disk;
+#   - finish() reads the spill file back once, with every company indexed,
+#     and writes those records with their company_ref (null when there is
+#     still no match).
+#
+# Only the company index is held in memory; jobs are written or spilled as
+# they arrive, so the number of jobs is not bounded by RAM. Spilled records
+# come out after all others. company_ref is the canonical URL of the matched
+# company page; search pages, which hold a list of jobs, get a list of refs.
+
+JOB_PAGE_TYPES = ("job", "indeed_job", "job_search", "indeed_search")
+COMPANY_PAGE_TYPES = ("company", "indeed_company")
+
+_COMPANY_SLUG = re.compile(r"/(?:company|cmp)/([^/?#]+)")
+
+def company_keys(record):
+    """Join keys of a company record: its normalized name and its URL slug."""
+    keys = []
+    data = record.get("data")
+    if isinstance(data, dict):
+        keys.append(normalize_name("company", data.get("company_name")))
+    match = _COMPANY_SLUG.search(canonical_url(record.get("url")) or "")
+    if match:
+        keys.append(normalize_name("company", match.group(1).replace("-", " ")))
+    return [key for key in dict.fromkeys(keys) if key]
+
+def _jobs(record):
+    data = record.get("data")
+    return data if isinstance(data, list) else [data]
+
+class CompanyJoin:
+    """Writes batch records to `out` with company_ref attached to job records (see above)."""
+    def __init__(self, out, spill_dir=None):
+        self.out = out
+        self.spill_dir = spill_dir
+        # normalized name or slug -> canonical URL of the company record
+        self.index = {}
+        self._spill = None
+        self.stats = {
+            "companies": 0,
+            "index_keys": 0,
+            "key_conflicts": 0,
+            "jobs": 0,
+            "matched": 0,
+            "spilled": 0,
+            "matched_after_spill": 0,
+            "unmatched": 0,
+        }
+
+    def _write(self, record):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _refs(self, record):
+        """company_ref for a job record, or None if any of its companies is not indexed yet."""
+        refs = []
+        for job in _jobs(record):
+            key = normalize_name("company", job.get("company_name")) if isinstance(job, dict) else None
+            if key is not None and key not in self.index:
+                return None
+            refs.append(self.index.get(key))
+        return refs if isinstance(record.get("data"), list) else refs[0]
+
+    def _count(self, ref, counter):
+        for value in ref if isinstance(ref, list) else [ref]:
+            self.stats[counter if value is not None else "unmatched"] += 1
+
+    def add(self, record):
+        page_type = record.get("page_type")
+        data = record.get("data")
+        if not data or (isinstance(data, dict) and "error" in data):
+            self._write(record)
+            return
+        if page_type in COMPANY_PAGE_TYPES:
+            self.stats["companies"] += 1
+            url = canonical_url(record.get("url")) or record.get("url")
+            for key in company_keys(record):
+                # The first company seen keeps a key.
+                if key in self.index:
+                    self.stats["key_conflicts"] += self.index[key] != url
+                else:
+                    self.index[key] = url
+                    self.stats["index_keys"] += 1
+        elif page_type in JOB_PAGE_TYPES:
+            self.stats["jobs"] += len(_jobs(record))
+            refs = self._refs(record)
+            if refs is None:
+                if self._spill is None:
+                    if self.spill_dir:
+                        os.makedirs(self.spill_dir, exist_ok=True)
+                    self._spill = tempfile.TemporaryFile(
+                        "w+", encoding="utf-8", prefix="company-join-", suffix=".ndjson", dir=self.spill_dir,
+                    )
+                self._spill.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.stats["spilled"] += 1
+                return
+            record["company_ref"] = refs
+            self._count(refs, "matched")
+        self._write(record)
+
+    def finish(self):
+        """Writes the spilled job records with the complete index and returns the join statistics."""
+        if self._spill is not None:
+            self._spill.seek(0)
+            for line in self._spill:
+                record = json.loads(line)
+                refs = [
+                    self.index.get(normalize_name("company", job.get("company_name"))) if isinstance(job, dict) else None
+                    for job in _jobs(record)
+                ]
+                record["company_ref"] = refs if isinstance(record.get("data"), list) else refs[0]
+                self._count(record["company_ref"], "matched_after_spill")
+                self._write(record)
+            self._spill.close()
+            self._spill = None
+        return dict(self.stats)
+
+def join_records(records, out, spill_dir=None):
+    """Joins already extracted batch records (e.g. a merged result set) in one pass plus the spill pass."""
+    join = CompanyJoin(out, spill_dir)
+    for record in records:
+        join.add(record)
+    return join.finish()
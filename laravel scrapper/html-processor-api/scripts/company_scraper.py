@@ -1,18 +1,45 @@
 import sys
-import io
 import os
 import json
 import re
-from bs4 import BeautifulSoup
-
-# Reconfigure stdout to ensure UTF-8 output
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from html_decode import read_html
+from selector_stats import SelectorChain
+from selector_registry import SelectorRegistry
+
+# Field versions for `scrape.py reextract` (see page_types.field_versions).
+FIELD_VERSIONS = {
+    "company_name": 1,
+    "tagline": 1,
+    "logo_url": 1,
+    "cover_pic_url": 1,
+    "follower_count": 1,
+    "about": 1,
+    "website": 1,
+    "industry": 1,
+    "company_size": 1,
+    "headquarters": 1,
+    "founded": 1,
+    "specialties": 1,
+}
+
+SELECTORS = SelectorRegistry("company", {
+    "company_name": "h1.org-top-card-summary__title",
+    "tagline": "p.org-top-card-summary__tagline",
+    "logo": "img.org-top-card-primary-content__logo",
+    "cover_img": "img.pic-cropper__target-image",
+    "cover_div": "div.org-cropped-image__cover-image",
+    "about": "p.break-words",
+})
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_COVER_URL_RE = re.compile(r'url\("?(.+?)"?\)')
+_FOLLOWERS_RE = re.compile(r'followers', re.I)
+_OVERVIEW_RE = re.compile("Overview", re.I)
 
 def clean(content):
     """
-    Cleans text by preserving line breaks, fixing encoding errors,
-    and normalizing whitespace.
+    Cleans text by preserving line breaks and normalizing whitespace.
+    Pages are decoded once on read, so the text is already valid Unicode.
     """
     if not content:
         return "Not available"
@@ -26,13 +53,10 @@ def clean(content):
     else:
         text = str(content)
 
-    # Fix any potential encoding errors
-    cleaned_content = text.encode('utf-8', 'replace').decode('utf-8')
-
     # Replace multiple spaces/tabs, but keep the newlines
-    text = re.sub(r'[ \t]+', ' ', cleaned_content)
+    text = _SPACES_RE.sub(' ', text)
     # Condense multiple newlines into a maximum of two
-    text = re.sub(r'\n{3,}', '\n\n', text.strip())
+    text = _BLANK_LINES_RE.sub('\n\n', text.strip())
     
     junk_phrases = ["Skip to main content", "See more", "...see more"]
     for phrase in junk_phrases:
@@ -40,66 +64,87 @@ def clean(content):
         
     return text.strip() if text.strip() else "Not available"
 
+# Headings of the About details list, matched case-insensitively within the <h3> text.
+DETAIL_HEADINGS = ("Website", "Industry", "Company size", "Headquarters", "Founded", "Specialties")
+_DETAIL_HEADING_RES = {heading: re.compile(re.escape(heading), re.I) for heading in DETAIL_HEADINGS}
+
 def _extract_detail_item(soup, heading_text):
     """Helper to find a heading in the details list and return the next sibling's text."""
     try:
-        heading_element = soup.find("h3", string=re.compile(r'\s*' + re.escape(heading_text) + r'\s*', re.I))
+        pattern = _DETAIL_HEADING_RES.get(heading_text) or re.compile(re.escape(heading_text), re.I)
+        heading_element = soup.find("h3", string=pattern)
         if heading_element:
             return clean(heading_element.find_parent('dt').find_next_sibling('dd'))
     except Exception:
         return "Not available"
     return "Not available"
 
+def _cover_from_img(soup):
+    cover_img_tag = SELECTORS.select_one("cover_img", soup)
+    if cover_img_tag and cover_img_tag.has_attr('src'):
+        return cover_img_tag['src']
+    return None
+
+def _cover_from_style(soup):
+    cover_div_tag = SELECTORS.select_one("cover_div", soup)
+    if cover_div_tag and cover_div_tag.has_attr('style'):
+        match = _COVER_URL_RE.search(cover_div_tag['style'])
+        if match:
+            return match.group(1)
+    return None
+
+# Fallback chain; batch and worker modes reorder it by observed hit rate.
+COVER_PIC_CHAIN = SelectorChain("company.cover_pic_url", [
+    ("img.pic-cropper__target-image", _cover_from_img),
+    ("div.org-cropped-image__cover-image[style]", _cover_from_style),
+])
+
 def extract_company_data(input_html_path):
     """Main function to orchestrate company profile extraction from a local HTML file."""
     if not os.path.exists(input_html_path):
         return {"type": "company", "error": f"File not found at {input_html_path}"}
 
-    with open(input_html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = read_html(input_html_path)
+
+    from bs4 import BeautifulSoup
 
     soup = BeautifulSoup(html, "lxml")
+    return extract_company_data_from_soup(soup)
 
+def extract_company_data_from_soup(soup):
+    """Extracts company profile fields from an already parsed page."""
     # --- Extract all fields safely ---
     try:
-        company_name = clean(soup.select_one("h1.org-top-card-summary__title"))
+        company_name = clean(SELECTORS.select_one("company_name", soup))
     except Exception:
         company_name = "Not available"
     
     try:
-        tagline = clean(soup.select_one("p.org-top-card-summary__tagline"))
+        tagline = clean(SELECTORS.select_one("tagline", soup))
     except Exception:
         tagline = "Not available"
 
     try:
-        logo_url = soup.select_one("img.org-top-card-primary-content__logo")['src']
+        logo_url = SELECTORS.select_one("logo", soup)['src']
     except Exception:
         logo_url = "Not available"
 
     try:
-        follower_element = soup.find("div", class_="org-top-card-summary-info-list__info-item", string=re.compile(r'followers', re.I))
+        follower_element = soup.find("div", class_="org-top-card-summary-info-list__info-item", string=_FOLLOWERS_RE)
         follower_count = clean(follower_element)
     except Exception:
         follower_count = "Not available"
 
     cover_pic_url = "Not available"
     try:
-        cover_img_tag = soup.select_one("img.pic-cropper__target-image")
-        if cover_img_tag and cover_img_tag.has_attr('src'):
-            cover_pic_url = cover_img_tag['src']
-        else:
-            cover_div_tag = soup.select_one("div.org-cropped-image__cover-image")
-            if cover_div_tag and cover_div_tag.has_attr('style'):
-                match = re.search(r'url\("?(.+?)"?\)', cover_div_tag['style'])
-                if match:
-                    cover_pic_url = match.group(1)
+        cover_pic_url = COVER_PIC_CHAIN.resolve(soup) or "Not available"
     except Exception:
         pass
 
-    overview_section = soup.find("h2", string=re.compile("Overview", re.I))
+    overview_section = soup.find("h2", string=_OVERVIEW_RE)
     about_container = overview_section.find_parent("section") if overview_section else soup
     
-    about = clean(about_container.select_one("p.break-words"))
+    about = clean(SELECTORS.select_one("about", about_container))
     website = _extract_detail_item(about_container, "Website")
     industry = _extract_detail_item(about_container, "Industry")
     company_size = _extract_detail_item(about_container, "Company size")
@@ -125,9 +170,16 @@ def extract_company_data(input_html_path):
     return data
 
 if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) > 1:
         html_file_path = sys.argv[1]
-        company_data = extract_company_data(html_file_path)
+        from capture import capturing
+        with capturing(html_file_path, "company"):
+            company_data = extract_company_data(html_file_path)
         print(json.dumps(company_data, indent=2, ensure_ascii=False))
     else:
         error_data = {"error": "No file path provided to the Python script."}
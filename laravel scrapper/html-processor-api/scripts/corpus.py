@@ -0,0 +1,90 @@
+import os
+import re
+import json
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# A corpus is a directory of saved pages (*.html / *.htm). The source URL of
+# each page is read from an optional sidecar "<page>.json" file ({"url": ...,
+# "captured_at": ...}); without one it falls back to the page's canonical link.
+
+HTML_EXTENSIONS = (".html", ".htm")
+
+# Query parameters that identify the entity itself rather than a tracking context.
+KEEP_QUERY_PARAMS = {"jk", "vjk", "currentJobId"}
+# A search page is its query: these parameters (and LinkedIn's f_* filters)
+# are kept instead, so different searches of the same site never share a key.
+# The selected job (currentJobId, vjk) only changes the side pane.
+SEARCH_QUERY_PARAMS = {
+    "keywords", "location", "geoId", "distance", "sortBy", "start",
+    "q", "l", "radius", "sort", "fromage", "jt", "sc", "explvl",
+}
+
+_CANONICAL_RE = re.compile(
+    rb'<link[^>]+rel=["\']canonical["\'][^>]*href=["\']([^"\']+)'
+    rb'|<meta[^>]+property=["\']og:url["\'][^>]*content=["\']([^"\']+)',
+    re.I,
+)
+HEAD_SCAN_BYTES = 256 * 1024
+
+def _is_search(host, path):
+    """LinkedIn and Indeed job search pages (see page_types.detect_page_type)."""
+    if host.endswith("linkedin.com"):
+        return path.startswith(("/jobs/search", "/jobs/collections"))
+    return "indeed." in host and (path == "/jobs" or path.startswith("/q-"))
+
+def canonical_url(url):
+    """Normalizes a page URL so captures of the same entity share one key."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    if _is_search(host, path):
+        keep = lambda k: k in SEARCH_QUERY_PARAMS or k.startswith("f_")
+    else:
+        keep = lambda k: k in KEEP_QUERY_PARAMS
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if keep(k)))
+    return urlunsplit(("https", host, path, query, ""))
+
+def url_from_html(head):
+    """The canonical (or og:url) link in the start of a page's bytes, or None."""
+    match = _CANONICAL_RE.search(head)
+    if not match:
+        return None
+    return (match.group(1) or match.group(2)).decode("utf-8", "replace")
+
+def _url_from_html(path):
+    with open(path, "rb") as f:
+        return url_from_html(f.read(HEAD_SCAN_BYTES))
+
+def read_page_meta(path):
+    """Returns the metadata for one saved page: url, captured_at, size and page_type (when recorded)."""
+    meta = {}
+    sidecar = os.path.splitext(path)[0] + ".json"
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+    stat = os.stat(path)
+    return {
+        "path": path,
+        "url": meta.get("url") or _url_from_html(path),
+        "captured_at": meta.get("captured_at") or stat.st_mtime,
+        "size": stat.st_size,
+        "page_type": meta.get("page_type"),
+    }
+
+def iter_corpus(root):
+    """Yields page metadata for every saved page under root, in a stable order."""
+    if os.path.isfile(root):
+        yield read_page_meta(root)
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(HTML_EXTENSIONS):
+                yield read_page_meta(os.path.join(dirpath, name))
@@ -0,0 +1,152 @@
+import sys
+import json
+import time
+
+from page_types import PAGE_TYPES, detect_page_type, resolve_extractor
+
+# Streams a page's fields to the client as they are extracted, so the popup
+# can show the name and headline while experience, education and the About
+# duplicate check are still running. Events, in order:
+#
+#   {"event": "field", "field": "name", "value": "...", "ms": 12.5}
+#   ...
+#   {"event": "done", "fields": ["type", "name", ...], "ms": 80.1}
+#
+# "done" lists the keys in the order of the non-streaming output, so the
+# assembled document is identical to it. Scrapers without a field generator
+# (see "iter_fields" in PAGE_TYPES) send every field once extraction is
+# complete; search pages, whose result is a list, send one "document" event.
+# A failure sends {"event": "error", "error": "..."} and ends the stream.
+#
+# Run as a script for PageController: field_stream.py <page file> <url> [ndjson|sse]
+
+FORMATS = ("ndjson", "sse")
+
+def iter_events(html, page_type):
+    """Parses a page and yields its stream events (see above)."""
+    from bs4 import BeautifulSoup
+    from html_decode import decode_html
+
+    started = time.perf_counter()
+    elapsed = lambda: round((time.perf_counter() - started) * 1000, 2)
+    soup = BeautifulSoup(decode_html(html), "lxml")
+    try:
+        extract, variant = resolve_extractor(page_type, html)
+        spec = PAGE_TYPES[page_type]
+        iter_fields = extract.__globals__.get(spec.get("iter_fields", ""))
+        if iter_fields is not None:
+            for field, value in iter_fields(soup):
+                yield {"event": "field", "field": field, "value": value, "ms": elapsed()}
+            yield {"event": "done", "fields": list(extract.__globals__[spec["field_order"]]), "ms": elapsed()}
+            return
+        data = extract(soup)
+        if not isinstance(data, dict):
+            yield {"event": "document", "value": data, "ms": elapsed()}
+            yield {"event": "done", "fields": None, "ms": elapsed()}
+            return
+        for field, value in data.items():
+            yield {"event": "field", "field": field, "value": value, "ms": elapsed()}
+        yield {"event": "done", "fields": list(data), "ms": elapsed()}
+    finally:
+        soup.decompose()
+
+def format_event(event, fmt="ndjson"):
+    """Frames one event as an NDJSON line or a server-sent event."""
+    payload = json.dumps(event, ensure_ascii=False)
+    if fmt == "sse":
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+def assemble(events):
+    """Builds the final document from stream events, as the popup does."""
+    fields, document = {}, None
+    for event in events:
+        if event["event"] == "field":
+            fields[event["field"]] = event["value"]
+        elif event["event"] == "document":
+            document = event["value"]
+        elif event["event"] == "error":
+            return {"error": event["error"]}
+        elif event["event"] == "done":
+            if document is not None:
+                return document
+            return {field: fields[field] for field in event["fields"]}
+    return None
+
+def _median(values):
+    ordered = sorted(values)
+    return round(ordered[len(ordered) // 2], 2) if ordered else None
+
+def benchmark(corpus_path, repeat=3, page_types=None):
+    """
+    Per page type: median time to the first field and to the last event of
+    the stream, next to buffered extraction (page_types.extract_html), and
+    the number of pages whose assembled stream differs from it.
+    """
+    from corpus import iter_corpus
+    from page_types import extract_html
+
+    samples = {}
+    for page in iter_corpus(corpus_path):
+        page_type = detect_page_type(page["url"])
+        if not page_type or (page_types and page_type not in page_types):
+            continue
+        with open(page["path"], "rb") as f:
+            html = f.read()
+        entry = samples.setdefault(page_type, {"first": [], "stream": [], "buffered": [], "pages": 0, "mismatches": 0})
+        entry["pages"] += 1
+        for run in range(repeat):
+            started = time.perf_counter()
+            events, first = [], None
+            for event in iter_events(html, page_type):
+                if first is None and event["event"] in ("field", "document"):
+                    first = time.perf_counter() - started
+                events.append(event)
+            entry["stream"].append((time.perf_counter() - started) * 1000)
+            entry["first"].append((first or 0.0) * 1000)
+            started = time.perf_counter()
+            buffered = extract_html(html, page_type)
+            entry["buffered"].append((time.perf_counter() - started) * 1000)
+            if run == 0 and assemble(events) != buffered:
+                entry["mismatches"] += 1
+    return {
+        page_type: {
+            "pages": entry["pages"],
+            "time_to_first_field_ms": _median(entry["first"]),
+            "stream_total_ms": _median(entry["stream"]),
+            "buffered_ms": _median(entry["buffered"]),
+            "mismatches": entry["mismatches"],
+        }
+        for page_type, entry in sorted(samples.items())
+    }
+
+def stream_page(path, url, fmt="ndjson", out=None, page_type=None):
+    """Writes the events for a saved page to `out`, flushing after each one."""
+    out = out or sys.stdout
+    page_type = page_type or detect_page_type(url)
+    if not page_type:
+        out.write(format_event({"event": "error", "error": "This page type is not supported."}, fmt))
+        return
+    from capture import capturing
+
+    with open(path, "rb") as f:
+        html = f.read()
+    try:
+        with capturing(path, page_type, url):
+            for event in iter_events(html, page_type):
+                out.write(format_event(event, fmt))
+                out.flush()
+    except Exception as exc:
+        out.write(format_event({"event": "error", "error": str(exc)}, fmt))
+        out.flush()
+
+if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    if len(sys.argv) > 2:
+        stream_page(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "ndjson")
+    else:
+        print(format_event({"event": "error", "error": "Usage: field_stream.py <page file> <url> [ndjson|sse]"}), end="")
@@ -0,0 +1,56 @@
+import re
+import codecs
+
+# Saved pages are read as bytes and decoded exactly once. The charset comes
+# from a byte order mark or the page's own <meta> declaration, falling back
+# to UTF-8. Undecodable bytes become U+FFFD instead of raising, so a page
+# saved in the wrong encoding still extracts (with replacement characters)
+# and every string handed to the scrapers is already valid Unicode.
+
+DEFAULT_CHARSET = "utf-8"
+# Browsers only look for the <meta> charset in the first 1024 bytes; saved
+# pages sometimes push it further down, so scan a little more.
+META_SCAN_BYTES = 4096
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+_META_CHARSET_RE = re.compile(
+    rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)',
+    re.I,
+)
+
+def sniff_charset(raw):
+    """Returns (charset, bom_length) for raw page bytes."""
+    for bom, charset in _BOMS:
+        if raw[:len(bom)] == bom:
+            return charset, len(bom)
+    match = _META_CHARSET_RE.search(raw[:META_SCAN_BYTES])
+    if match:
+        declared = match.group(1).decode("ascii", "replace").lower()
+        try:
+            charset = codecs.lookup(declared).name
+        except LookupError:
+            return DEFAULT_CHARSET, 0
+        # A page that reached us as bytes cannot really be UTF-16 if its meta tag
+        # was readable as ASCII; browsers treat that declaration as UTF-8 too.
+        if charset.startswith("utf-16"):
+            return DEFAULT_CHARSET, 0
+        return charset, 0
+    return DEFAULT_CHARSET, 0
+
+def decode_html(raw):
+    """Decodes page bytes once, using the sniffed charset. Strings pass through unchanged."""
+    if isinstance(raw, str):
+        return raw
+    charset, bom_length = sniff_charset(raw)
+    return codecs.decode(raw[bom_length:] if bom_length else raw, charset, "replace")
+
+def read_html(path):
+    """Reads a saved page from disk and decodes it."""
+    with open(path, "rb") as f:
+        return decode_html(f.read())
@@ -0,0 +1,39 @@
+import os
+import gzip
+import hashlib
+
+# Content-addressed store of the source HTML behind stored results, so fields
+# can be re-extracted after a selector fix without the original capture.
+# Pages are gzipped and filed by SHA-256: <root>/ab/abcdef....html.gz.
+# Identical pages are stored once.
+
+COMPRESS_LEVEL = 6
+
+class HtmlStore:
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest + ".html.gz")
+
+    def put(self, html):
+        """Stores page bytes (if not already stored) and returns their SHA-256."""
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        digest = hashlib.sha256(html).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.{os.getpid()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(gzip.compress(html, COMPRESS_LEVEL))
+            os.replace(temp, path)
+        return digest
+
+    def get(self, digest):
+        """Returns the stored page bytes, or None if the store does not have them."""
+        try:
+            with open(self._path(digest), "rb") as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,77 @@
+import os
+import sys
+import subprocess
+import statistics
+
+from page_types import PAGE_TYPES
+
+# PageController starts a fresh interpreter for every page, so whatever a
+# scraper imports at module level is paid on every request. This check runs
+# `python -X importtime -c "import <scraper>"` in clean processes and fails
+# when a scraper's cold import is over budget or pulls in a module that
+# should only load on first use.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Cold import of one scraper, median over the runs. bs4 alone costs several
+# times this, so the budget is blown as soon as it is imported eagerly again.
+DEFAULT_BUDGET_MS = 40
+# Modules the scrapers use lazily; seeing one in a scraper's import tree is a
+# regression even on a machine fast enough to stay within the time budget.
+LAZY_MODULES = ("bs4", "soupsieve", "lxml", "difflib", "datetime")
+
+def parse_importtime(stderr):
+    """Parses -X importtime output into (module, self_us, cumulative_us, depth) tuples."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def module_import_tree(entries, module):
+    """Returns (cumulative_us, imported module names) for a top-level import of `module`."""
+    for index, (name, _, cumulative_us, depth) in enumerate(entries):
+        if name == module and depth == 0:
+            # Children are printed before their parent, deeper than it.
+            children = []
+            for child, _, _, child_depth in reversed(entries[:index]):
+                if child_depth == 0:
+                    break
+                children.append(child)
+            return cumulative_us, children
+    return 0, []
+
+def measure_import(module, runs=5, python=None):
+    """Cold-imports `module` in `runs` fresh interpreters; returns (median_ms, imported modules)."""
+    timings = []
+    imported = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SCRIPTS_DIR, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1]}")
+        cumulative_us, imported = module_import_tree(parse_importtime(result.stderr), module)
+        timings.append(cumulative_us / 1000)
+    return statistics.median(timings), imported
+
+def check_import_budget(budget_ms=DEFAULT_BUDGET_MS, runs=5, modules=None):
+    """Measures every scraper module; returns (report, ok)."""
+    modules = modules or sorted({spec["module"] for spec in PAGE_TYPES.values()})
+    report = {}
+    ok = True
+    for module in modules:
+        median_ms, imported = measure_import(module, runs)
+        eager = sorted({name.split(".")[0] for name in imported} & set(LAZY_MODULES))
+        within = median_ms <= budget_ms and not eager
+        ok = ok and within
+        report[module] = {
+            "import_ms": round(median_ms, 2),
+            "budget_ms": budget_ms,
+            "eager_heavy_imports": eager,
+            "ok": within,
+        }
+    return report, ok
@@ -1,18 +1,45 @@
 import sys
-import io
 import os
 import json
 import re
-from bs4 import BeautifulSoup
+from html_decode import read_html
+from selector_registry import SelectorRegistry
 
-# Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# Field versions for `scrape.py reextract` (see page_types.field_versions).
+FIELD_VERSIONS = {
+    "company_name": 1,
+    "tagline": 1,
+    "logo_url": 1,
+    "follower_count": 1,
+    "about": 1,
+    "website": 1,
+    "industry": 1,
+    "company_size": 1,
+    "headquarters": 1,
+    "founded": 1,
+    "specialties": 1,
+}
+
+# data-testid of the About details rows.
+DETAIL_TEST_IDS = (
+    "companyInfo-industry", "companyInfo-employee", "companyInfo-headquartersLocation", "companyInfo-founded",
+)
+SELECTORS = SelectorRegistry("indeed_company", {
+    "company_name": 'div[itemprop="name"]',
+    "logo": 'div[data-testid="cmp-HeaderLayout-sticky"] img, div.css-9wofke img',
+    "about_section": 'section[data-testid="AboutSection-section"]',
+    "description": 'div[data-testid="less-text"], div.css-1qewhxk',
+    **{test_id: f"li[data-testid='{test_id}']" for test_id in DETAIL_TEST_IDS},
+})
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+JUNK_PHRASES = ["Skip to main content", "See more", "...see more", "Show more"]
+_JUNK_PHRASE_RES = [re.compile(r'\b' + re.escape(phrase) + r'\b', re.IGNORECASE) for phrase in JUNK_PHRASES]
 
 def clean(content):
     """
-    Cleans text by preserving line breaks, fixing encoding errors,
-    and normalizing whitespace.
+    Cleans text by preserving line breaks and normalizing whitespace.
+    Pages are decoded once on read, so the text is already valid Unicode.
     """
     if not content:
         return "Not available"
@@ -28,25 +55,21 @@ def clean(content):
     else:
         text = str(content)
 
-    # Fix any potential encoding errors
-    cleaned_content = text.encode('utf-8', 'replace').decode('utf-8')
-
     # Replace multiple spaces/tabs, but keep the newlines
-    text = re.sub(r'[ \t]+', ' ', cleaned_content)
+    text = _SPACES_RE.sub(' ', text)
     # Condense multiple newlines into a maximum of two
-    text = re.sub(r'\n{3,}', '\n\n', text.strip())
+    text = _BLANK_LINES_RE.sub('\n\n', text.strip())
     
-    junk_phrases = ["Skip to main content", "See more", "...see more", "Show more"]
-    for phrase in junk_phrases:
-        # Use a case-insensitive replace to catch variations
-        text = re.sub(r'\b' + re.escape(phrase) + r'\b', '', text, flags=re.IGNORECASE)
+    for pattern in _JUNK_PHRASE_RES:
+        # Case-insensitive to catch variations
+        text = pattern.sub('', text)
         
     return text.strip() if text.strip() else "Not available"
 
 def _extract_detail_with_testid(soup, test_id):
-    """Helper to find an element by its data-testid and get its value."""
+    """Helper to find a details row (one of DETAIL_TEST_IDS) and get its value."""
     try:
-        item = soup.select_one(f"li[data-testid='{test_id}']")
+        item = SELECTORS.select_one(test_id, soup)
         if item:
             # The value is usually in the last div or span inside the list item
             value_element = item.find_all(["div", "span"])[-1]
@@ -60,33 +83,37 @@ def extract_company_data(input_html_path):
     if not os.path.exists(input_html_path):
         return {"type": "indeed_company", "error": f"File not found at {input_html_path}"}
 
-    with open(input_html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = read_html(input_html_path)
+
+    from bs4 import BeautifulSoup
 
     soup = BeautifulSoup(html, "lxml")
+    return extract_company_data_from_soup(soup)
 
+def extract_company_data_from_soup(soup):
+    """Extracts Indeed company page fields from an already parsed page."""
     # --- Extract all fields safely ---
     try:
-        company_name = clean(soup.select_one('div[itemprop="name"]'))
+        company_name = clean(SELECTORS.select_one("company_name", soup))
     except Exception:
         company_name = "Not available"
 
     try:
-        logo_url = soup.select_one('div[data-testid="cmp-HeaderLayout-sticky"] img, div.css-9wofke img')['src']
+        logo_url = SELECTORS.select_one("logo", soup)['src']
     except Exception:
         logo_url = "Not available"
 
     about = "Not available"
     try:
-        about_section = soup.select_one('section[data-testid="AboutSection-section"]')
+        about_section = SELECTORS.select_one("about_section", soup)
         if about_section:
-            description_container = about_section.select_one('div[data-testid="less-text"], div.css-1qewhxk')
+            description_container = SELECTORS.select_one("description", about_section)
             if description_container:
                 about = clean(description_container)
     except Exception:
         pass
 
-    details_section = soup.select_one('section[data-testid="AboutSection-section"]')
+    details_section = SELECTORS.select_one("about_section", soup)
     if details_section:
         industry = _extract_detail_with_testid(details_section, "companyInfo-industry")
         company_size = _extract_detail_with_testid(details_section, "companyInfo-employee")
@@ -121,9 +148,16 @@ def extract_company_data(input_html_path):
     return data
 
 if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) > 1:
         html_file_path = sys.argv[1]
-        company_data = extract_company_data(html_file_path)
+        from capture import capturing
+        with capturing(html_file_path, "indeed_company"):
+            company_data = extract_company_data(html_file_path)
         print(json.dumps(company_data, indent=2, ensure_ascii=False))
     else:
         error_data = {"error": "No URL provided to the Python script."}
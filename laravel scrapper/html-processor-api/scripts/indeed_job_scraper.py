@@ -1,18 +1,63 @@
 import sys
-import io
 import os
 import json
 import re
-from bs4 import BeautifulSoup
+from html_decode import read_html
+from selector_registry import SelectorRegistry
 
-# Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+# Field versions for `scrape.py reextract` (see page_types.field_versions).
+FIELD_VERSIONS = {
+    "job_title": 1,
+    "company_name": 1,
+    "location": 1,
+    "salary": 1,
+    "job_type": 1,
+    "date_posted": 1,
+    "applicants_count": 1,
+    "experience_level": 1,
+    "job_description": 1,
+}
+
+SELECTORS = SelectorRegistry("indeed_job", {
+    "job_title": "h1.jobsearch-JobInfoHeader-title",
+    "company_name": 'div[data-company-name="true"] a',
+    "location": 'div[data-testid="inlineHeader-companyLocation"]',
+    "salary_info": "div#salaryInfoAndJobType",
+    "salary": "span:first-child",
+    "job_type": "span:last-child",
+    "description": "div#jobDescriptionText",
+})
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+def _flattened_strings(content, names):
+    """
+    Yields the strings content.get_text(strip=True) would join if every outermost
+    tag in `names` were first replaced by its own stripped text, in one walk of
+    the tree. Replacing the tags for real (replace_with) looks each one up among
+    its siblings, which is quadratic on long lists, and changes the page.
+    """
+    types = content.interesting_string_types or content.MAIN_CONTENT_STRING_TYPES
+    stack = [iter(content.contents)]
+    while stack:
+        for child in stack[-1]:
+            if getattr(child, "contents", None) is None:
+                if type(child) in types and child.strip():
+                    yield child.strip()
+            elif child.name in names:
+                text = child.get_text(strip=True)
+                if text:
+                    yield text
+            else:
+                stack.append(iter(child.contents))
+                break
+        else:
+            stack.pop()
 
 def clean(content):
     """
-    Cleans text by preserving line breaks, fixing encoding errors,
-    and normalizing whitespace.
+    Cleans text by preserving line breaks and normalizing whitespace.
+    Pages are decoded once on read, so the text is already valid Unicode.
     """
     if not content:
         return "Not available"
@@ -21,20 +66,14 @@ def clean(content):
     # If content is a BeautifulSoup tag, process it to preserve line breaks
     if hasattr(content, 'find_all'):
         # Convert <br>, <p>, and <li> tags to simple newlines
-        for tag in content.find_all(["br", "p", "li"]):
-            tag.replace_with(f"\n{tag.get_text(strip=True)}")
-        
-        text = content.get_text(strip=True)
+        text = "".join(_flattened_strings(content, ("br", "p", "li")))
     else:
         text = str(content)
 
-    # Fix any potential encoding errors
-    cleaned_content = text.encode('utf-8', 'replace').decode('utf-8')
-
     # Replace multiple spaces/tabs, but keep the newlines
-    text = re.sub(r'[ \t]+', ' ', cleaned_content)
+    text = _SPACES_RE.sub(' ', text)
     # Condense multiple newlines into a maximum of two (a paragraph break)
-    text = re.sub(r'\n\s*\n', '\n\n', text.strip())
+    text = _BLANK_LINES_RE.sub('\n\n', text.strip())
     
     junk_phrases = ["Skip to main content", "See more", "...see more"]
     for phrase in junk_phrases:
@@ -47,30 +86,34 @@ def extract_job_data(input_html_path):
     if not os.path.exists(input_html_path):
         return {"type": "indeed_job", "error": f"File not found at {input_html_path}"}
 
-    with open(input_html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = read_html(input_html_path)
+
+    from bs4 import BeautifulSoup
 
     soup = BeautifulSoup(html, "lxml")
+    return extract_job_data_from_soup(soup)
 
+def extract_job_data_from_soup(soup):
+    """Extracts Indeed job fields from an already parsed page."""
     try:
-        job_title = clean(soup.select_one("h1.jobsearch-JobInfoHeader-title"))
+        job_title = clean(SELECTORS.select_one("job_title", soup))
     except Exception:
         job_title = "Not available"
 
     try:
-        company_name = clean(soup.select_one('div[data-company-name="true"] a'))
+        company_name = clean(SELECTORS.select_one("company_name", soup))
     except Exception:
         company_name = "Not available"
 
     try:
-        location = clean(soup.select_one('div[data-testid="inlineHeader-companyLocation"]'))
+        location = clean(SELECTORS.select_one("location", soup))
     except Exception:
         location = "Not available"
         
     try:
-        salary_info_div = soup.select_one("div#salaryInfoAndJobType")
-        salary = clean(salary_info_div.select_one("span:first-child")) if salary_info_div else "Not available"
-        job_type = clean(salary_info_div.select_one("span:last-child")) if salary_info_div else "Not available"
+        salary_info_div = SELECTORS.select_one("salary_info", soup)
+        salary = clean(SELECTORS.select_one("salary", salary_info_div)) if salary_info_div else "Not available"
+        job_type = clean(SELECTORS.select_one("job_type", salary_info_div)) if salary_info_div else "Not available"
         if job_type:
             job_type = job_type.replace('-', '').strip()
     except Exception:
@@ -78,7 +121,7 @@ def extract_job_data(input_html_path):
         job_type = "Not available"
 
     try:
-        job_description = clean(soup.select_one("div#jobDescriptionText"))
+        job_description = clean(SELECTORS.select_one("description", soup))
     except Exception:
         job_description = "Not available"
 
@@ -97,9 +140,16 @@ def extract_job_data(input_html_path):
     return data
 
 if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) > 1:
         html_file_path = sys.argv[1]
-        job_data = extract_job_data(html_file_path)
+        from capture import capturing
+        with capturing(html_file_path, "indeed_job"):
+            job_data = extract_job_data(html_file_path)
         print(json.dumps(job_data, indent=2, ensure_ascii=False))
     else:
         error_data = {"error": "No file path provided to the Python script."}
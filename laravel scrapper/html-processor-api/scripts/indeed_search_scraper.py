@@ -0,0 +1,176 @@
+import sys
+import os
+import json
+import re
+from html_decode import read_html
+from selector_registry import SelectorRegistry
+
+# Version of the code behind each field of a card record; bump it when the
+# field's selectors change so `scrape.py reextract` refreshes stored results.
+FIELD_VERSIONS = {
+    "job_id": 1,
+    "job_url": 1,
+    "job_title": 1,
+    "company_name": 1,
+    "location": 1,
+    "salary": 1,
+    "job_type": 1,
+    "date_posted": 1,
+    "applicants_count": 1,
+    "experience_level": 1,
+    "job_description": 1,
+}
+
+# Every result card on an Indeed search page carries a "job_seen_beacon" block
+# with the job key on its title link (a[data-jk]).
+CARD_SELECTOR = "div.job_seen_beacon, div.cardOutline, td.resultContent"
+TITLE_SELECTOR = "h2.jobTitle span[title], h2.jobTitle a span, h2.jobTitle"
+COMPANY_SELECTOR = "span[data-testid='company-name'], span.companyName"
+LOCATION_SELECTOR = "div[data-testid='text-location'], div.companyLocation"
+SALARY_SELECTOR = "div[data-testid='attribute_snippet_testid'], div.salary-snippet-container, div.metadata.salary-snippet-container, span.estimated-salary"
+POSTED_SELECTOR = "span[data-testid='myJobsStateDate'], span.date"
+JOB_TYPE_SELECTOR = "div[data-testid='attribute_snippet_testid'], div.metadata"
+SELECTORS = SelectorRegistry("indeed_search", {
+    "card": CARD_SELECTOR,
+    "title": TITLE_SELECTOR,
+    "company": COMPANY_SELECTOR,
+    "location": LOCATION_SELECTOR,
+    "salary": SALARY_SELECTOR,
+    "posted": POSTED_SELECTOR,
+    "job_type": JOB_TYPE_SELECTOR,
+    "job_key_link": "a[data-jk]",
+    "job_key_href": "a[href*='jk=']",
+})
+
+_SALARY_RE = re.compile(r"[$€£₹]|an hour|a year|a month|per (?:year|hour|month)", re.I)
+_JOB_TYPE_RE = re.compile(r"full-time|part-time|contract|temporary|internship|permanent", re.I)
+_POSTED_LABEL_RE = re.compile(r"^(?:Posted|EmployerActive|Employer)\s*")
+_JK_RE = re.compile(r"[?&]jk=([0-9a-f]+)", re.I)
+_SITE_ROOT_RE = re.compile(r"(https?://[^/]+)")
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def clean(content):
+    """
+    Cleans text by normalizing whitespace.
+    """
+    if not content:
+        return "Not available"
+
+    if hasattr(content, 'find_all'):
+        text = content.get_text(separator=" ", strip=True)
+    else:
+        text = str(content)
+
+    text = _WHITESPACE_RE.sub(' ', text)
+    return text.strip() if text.strip() else "Not available"
+
+def _site_root(soup):
+    """Search pages are localised (uk.indeed.com, de.indeed.com...), keep the same host."""
+    canonical = soup.find("link", rel="canonical")
+    if canonical and canonical.get("href"):
+        match = _SITE_ROOT_RE.match(canonical["href"])
+        if match:
+            return match.group(1)
+    return "https://www.indeed.com"
+
+def _job_key(card):
+    link = SELECTORS.select_one("job_key_link", card)
+    if link and link.get("data-jk"):
+        return link["data-jk"]
+    link = SELECTORS.select_one("job_key_href", card)
+    if link:
+        match = _JK_RE.search(link.get("href", ""))
+        if match:
+            return match.group(1)
+    return "Not available"
+
+def _posted(card):
+    """Indeed prefixes the posted date with a screen-reader label ("Posted", "EmployerActive")."""
+    text = clean(SELECTORS.select_one("posted", card))
+    return _POSTED_LABEL_RE.sub('', text) or "Not available"
+
+def _first_matching(card, selector, pattern):
+    for element in SELECTORS.select(selector, card):
+        text = clean(element)
+        match = pattern.search(text)
+        if match:
+            return text, match
+    return "Not available", None
+
+def extract_card(card, site_root):
+    """Builds an `indeed_job` record from a single search result card."""
+    job_key = _job_key(card)
+    salary, _ = _first_matching(card, "salary", _SALARY_RE)
+    _, job_type_match = _first_matching(card, "job_type", _JOB_TYPE_RE)
+    return {
+        "type": "indeed_job",
+        "job_id": job_key,
+        "job_url": f"{site_root}/viewjob?jk={job_key}" if job_key != "Not available" else "Not available",
+        "job_title": clean(SELECTORS.select_one("title", card)),
+        "company_name": clean(SELECTORS.select_one("company", card)),
+        "location": clean(SELECTORS.select_one("location", card)),
+        "salary": salary,
+        "job_type": job_type_match.group(0).capitalize() if job_type_match else "Not available",
+        "date_posted": _posted(card),
+        "applicants_count": "Not available", # Not available on Indeed
+        "experience_level": "Not available", # Not consistently available
+        "job_description": "Not available" # Only the snippet is on the search page
+    }
+
+def iter_job_cards(soup):
+    """Yields one `indeed_job` record per result card, in page order, skipping repeated job keys."""
+    site_root = _site_root(soup)
+    seen = set()
+    for card in SELECTORS.select("card", soup):
+        # Older layouts nest td.resultContent inside the card outline; use the outer one.
+        if card.find_parent(["div", "td"], class_=["job_seen_beacon", "cardOutline"]):
+            continue
+        try:
+            record = extract_card(card, site_root)
+        except Exception:
+            continue
+        key = record["job_id"] if record["job_id"] != "Not available" else (record["job_title"], record["company_name"])
+        if record["job_title"] == "Not available" or key in seen:
+            continue
+        seen.add(key)
+        yield record
+
+def extract_search_results_from_soup(soup):
+    """Extracts every job card on an Indeed search results page."""
+    return list(iter_job_cards(soup))
+
+def extract_search_results(input_html_path):
+    """Main function to orchestrate Indeed search results extraction from a local HTML file."""
+    if not os.path.exists(input_html_path):
+        return {"type": "indeed_search", "error": f"File not found at {input_html_path}"}
+
+    html = read_html(input_html_path)
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    return extract_search_results_from_soup(soup)
+
+if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    if len(sys.argv) > 1:
+        html_file_path = sys.argv[1]
+        from capture import capturing
+        if "--ndjson" in sys.argv[2:] and os.path.exists(html_file_path):
+            # Stream one record per line as soon as each card is extracted.
+            from bs4 import BeautifulSoup
+            with capturing(html_file_path, "indeed_search"):
+                soup = BeautifulSoup(read_html(html_file_path), "lxml")
+                for record in iter_job_cards(soup):
+                    print(json.dumps(record, ensure_ascii=False), flush=True)
+        else:
+            with capturing(html_file_path, "indeed_search"):
+                jobs = extract_search_results(html_file_path)
+            print(json.dumps(jobs, indent=2, ensure_ascii=False))
+    else:
+        error_data = {"error": "No file path provided to the Python script."}
+        print(json.dumps(error_data, indent=2))
@@ -0,0 +1,182 @@
+import math
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# A local scheduler in front of the extractors. Jobs are queued FIFO per
+# priority class; a free slot always goes to the most important class that
+# has work and is under its concurrency limit. When a class with a latency
+# target misses its p99, every less important class has its limit halved, and
+# the limits grow back one slot at a time once the target is met again. A
+# class can also reserve slots that less important classes never get, so
+# interactive jobs find a free slot even while a backfill is saturating the
+# pool. Limits are re-evaluated on completions of every class (at least every
+# ADJUST_INTERVAL seconds) and only over recent latencies, so they recover
+# once interactive traffic stops instead of staying throttled.
+# Everything runs in-process on threads, so `run` can be a direct extractor
+# call (tests, benchmarks) or a hand-off to a WorkerPool.
+
+DEFAULT_CLASSES = {
+    # A recruiter waiting on the popup.
+    "interactive": {"priority": 0, "max_concurrency": None, "p99_target_ms": 2000, "reserved": 1},
+    # Nightly backfills; always keeps at least one slot so it cannot starve.
+    "bulk": {"priority": 1, "max_concurrency": None, "min_concurrency": 1},
+}
+
+LATENCY_WINDOW = 200
+# Limits are re-evaluated after this many completions of a class with a target,
+# and on any completion once this many seconds have passed since the last time.
+ADJUST_EVERY = 20
+ADJUST_INTERVAL = 1.0
+# Latencies older than this (seconds) no longer count towards a class's p99.
+LATENCY_MAX_AGE = 30.0
+# Limits grow back once p99 is comfortably below the target.
+HEADROOM = 0.8
+
+def _p99(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(0.99 * len(ordered)) - 1)]
+
+class JobScheduler:
+    """
+    Runs run(job) on `capacity` threads. submit() returns a Future with run's
+    return value; queue wait plus run time is recorded as the job's latency.
+    """
+    def __init__(self, run, capacity=4, classes=None):
+        self.run = run
+        self.capacity = capacity
+        self.classes = {}
+        for name, spec in (classes or DEFAULT_CLASSES).items():
+            spec = dict(spec)
+            spec["max_concurrency"] = min(spec.get("max_concurrency") or capacity, capacity)
+            spec.setdefault("min_concurrency", 0)
+            spec.setdefault("reserved", 0)
+            self.classes[name] = spec
+        self.order = sorted(self.classes, key=lambda name: self.classes[name]["priority"])
+        for name, spec in self.classes.items():
+            # Slots reserved by more important classes are never available to this one.
+            reserved = sum(other["reserved"] for other in self.classes.values() if other["priority"] < spec["priority"])
+            spec["max_concurrency"] = max(spec["min_concurrency"], min(spec["max_concurrency"], capacity - reserved))
+        self.limits = {name: spec["max_concurrency"] for name, spec in self.classes.items()}
+        self.queues = {name: deque() for name in self.classes}
+        self.running = {name: 0 for name in self.classes}
+        self.latencies = {name: deque(maxlen=LATENCY_WINDOW) for name in self.classes}
+        self.completed = {name: 0 for name in self.classes}
+        self.throttle_events = 0
+        self._last_adjust = time.perf_counter()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._threads = [threading.Thread(target=self._loop, daemon=True) for _ in range(capacity)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job, job_class="interactive"):
+        if job_class not in self.classes:
+            raise ValueError(f"Unknown job class: {job_class}")
+        future = Future()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("Scheduler is closed.")
+            self.queues[job_class].append((job, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def _next(self):
+        """Pops the oldest job of the most important eligible class, or returns None."""
+        for name in self.order:
+            if self.queues[name] and self.running[name] < self.limits[name]:
+                self.running[name] += 1
+                return name, self.queues[name].popleft()
+        return None
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                picked = self._next()
+                while picked is None:
+                    if self._closing and not any(self.queues.values()):
+                        return
+                    self._cond.wait()
+                    picked = self._next()
+            job_class, (job, future, queued_at) = picked
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self.run(job))
+                except BaseException as exc:
+                    future.set_exception(exc)
+            finished_at = time.perf_counter()
+            with self._cond:
+                self.running[job_class] -= 1
+                self.latencies[job_class].append((finished_at, (finished_at - queued_at) * 1000))
+                self.completed[job_class] += 1
+                due = finished_at - self._last_adjust >= ADJUST_INTERVAL
+                for name in self.order:
+                    if not self.classes[name].get("p99_target_ms"):
+                        continue
+                    if due or (name == job_class and self.completed[name] % ADJUST_EVERY == 0):
+                        self._adjust(name, finished_at)
+                self._cond.notify_all()
+
+    def _recent(self, job_class, now):
+        """Latencies (ms) of job_class that finished within LATENCY_MAX_AGE seconds."""
+        return [ms for finished_at, ms in self.latencies[job_class] if now - finished_at <= LATENCY_MAX_AGE]
+
+    def _adjust(self, job_class, now):
+        """
+        Throttles or releases the classes below job_class based on its recent
+        p99. Without recent latencies the target counts as met.
+        """
+        self._last_adjust = now
+        target = self.classes[job_class]["p99_target_ms"]
+        p99 = _p99(self._recent(job_class, now)) or 0.0
+        priority = self.classes[job_class]["priority"]
+        for name in self.order:
+            spec = self.classes[name]
+            if spec["priority"] <= priority:
+                continue
+            if p99 > target:
+                lowered = max(spec["min_concurrency"], self.limits[name] // 2)
+                if lowered < self.limits[name]:
+                    self.limits[name] = lowered
+                    self.throttle_events += 1
+            elif p99 < target * HEADROOM and self.limits[name] < spec["max_concurrency"]:
+                self.limits[name] += 1
+
+    def stats(self):
+        with self._cond:
+            latencies = {name: sorted(ms for _, ms in self.latencies[name]) for name in self.order}
+            stats = {
+                name: {
+                    "queued": len(self.queues[name]),
+                    "running": self.running[name],
+                    "completed": self.completed[name],
+                    "concurrency_limit": self.limits[name],
+                    "p50_ms": round(latencies[name][len(latencies[name]) // 2], 2) if latencies[name] else None,
+                    "p99_ms": round(_p99(latencies[name]), 2) if latencies[name] else None,
+                }
+                for name in self.order
+            }
+            stats["throttle_events"] = self.throttle_events
+            return stats
+
+    def gauge_samples(self):
+        """Queued jobs per class, as a metrics collector."""
+        with self._cond:
+            return [("scraper_queue_depth", (("queue", name),), len(self.queues[name])) for name in self.order]
+
+    def close(self):
+        """Stops accepting jobs, drains the queues and joins the threads."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,18 +1,41 @@
 import sys
-import io
 import os
 import json
 import re
-from bs4 import BeautifulSoup
-
-# Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from html_decode import read_html
+from selector_registry import SelectorRegistry
+
+# Field versions for `scrape.py reextract` (see page_types.field_versions).
+FIELD_VERSIONS = {
+    "job_title": 1,
+    "company_name": 1,
+    "location": 1,
+    "date_posted": 1,
+    "workplace_type": 1,
+    "applicants_count": 1,
+    "employment_type": 1,
+    "experience_level": 1,
+    "job_description": 1,
+}
+
+SELECTORS = SelectorRegistry("job", {
+    "job_title": "h1.t-24",
+    "company_name": ".job-details-jobs-unified-top-card__company-name a",
+    "primary_description": ".job-details-jobs-unified-top-card__primary-description-container",
+    "location": "span.tvm__text--low-emphasis",
+    "tertiary_description": ".job-details-jobs-unified-top-card__tertiary-description-container",
+    "detail_buttons": ".job-details-fit-level-preferences button strong",
+    "description": "div#job-details",
+})
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_DATE_POSTED_RE = re.compile(r"ago|Posted", re.I)
+_APPLICANTS_RE = re.compile(r"applicant|apply", re.I)
 
 def clean(content):
     """
-    Cleans text by preserving line breaks, fixing encoding errors,
-    and normalizing whitespace.
+    Cleans text by preserving line breaks and normalizing whitespace.
+    Pages are decoded once on read, so the text is already valid Unicode.
     """
     if not content:
         return "Not available"
@@ -28,14 +51,11 @@ def clean(content):
     else:
         text = str(content)
 
-    # Fix any potential encoding errors in the scraped text
-    cleaned_content = text.encode('utf-8', 'replace').decode('utf-8')
-
     # --- THIS IS THE FIX ---
     # Replace multiple spaces and tabs, but keep the newlines
-    text = re.sub(r'[ \t]+', ' ', cleaned_content)
+    text = _SPACES_RE.sub(' ', text)
     # Condense multiple newlines into a maximum of two (a paragraph break)
-    text = re.sub(r'\n{3,}', '\n\n', text.strip())
+    text = _BLANK_LINES_RE.sub('\n\n', text.strip())
     # --- END OF FIX ---
 
     # Remove common junk phrases
@@ -48,7 +68,6 @@ def clean(content):
     return text.strip() if text.strip() else "Not available"
 
 
-
 def extract_job_data(input_html_path):
     """
     Main function to orchestrate job posting extraction.
@@ -57,37 +76,41 @@ def extract_job_data(input_html_path):
     if not os.path.exists(input_html_path):
         return {"type": "job", "error": f"File not found at {input_html_path}"}
 
-    with open(input_html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = read_html(input_html_path)
+
+    from bs4 import BeautifulSoup
 
     soup = BeautifulSoup(html, "lxml")
+    return extract_job_data_from_soup(soup)
 
+def extract_job_data_from_soup(soup):
+    """Extracts job posting fields from an already parsed page."""
     # --- Extract fields safely ---
     try:
-        job_title = clean(soup.select_one("h1.t-24"))
+        job_title = clean(SELECTORS.select_one("job_title", soup))
     except Exception:
         job_title = "Not available"
 
     try:
-        company_name = clean(soup.select_one(".job-details-jobs-unified-top-card__company-name a"))
+        company_name = clean(SELECTORS.select_one("company_name", soup))
     except Exception:
         company_name = "Not available"
         
     try:
-        primary_desc_container = soup.select_one(".job-details-jobs-unified-top-card__primary-description-container")
-        location = clean(primary_desc_container.select_one("span.tvm__text--low-emphasis")) if primary_desc_container else "Not available"
+        primary_desc_container = SELECTORS.select_one("primary_description", soup)
+        location = clean(SELECTORS.select_one("location", primary_desc_container)) if primary_desc_container else "Not available"
     except Exception:
         location = "Not available"
 
     try:
-        tertiary_desc_container = soup.select_one(".job-details-jobs-unified-top-card__tertiary-description-container")
+        tertiary_desc_container = SELECTORS.select_one("tertiary_description", soup)
         date_posted = "Not available"
         applicants_count = "Not available"
         if tertiary_desc_container:
-            date_posted_span = tertiary_desc_container.find("span", string=re.compile(r"ago|Posted", re.I))
+            date_posted_span = tertiary_desc_container.find("span", string=_DATE_POSTED_RE)
             date_posted = clean(date_posted_span) if date_posted_span else "Not available"
             
-            applicants_element = tertiary_desc_container.find("strong", string=re.compile(r"applicant|apply", re.I))
+            applicants_element = tertiary_desc_container.find("strong", string=_APPLICANTS_RE)
             applicants_count = clean(applicants_element) if applicants_element else "Not available"
     except Exception:
         date_posted = "Not available"
@@ -96,7 +119,7 @@ def extract_job_data(input_html_path):
     try:
         workplace_type = "Not available"
         employment_type = "Not available"
-        detail_buttons = soup.select(".job-details-fit-level-preferences button strong")
+        detail_buttons = SELECTORS.select("detail_buttons", soup)
         if len(detail_buttons) > 0:
             workplace_type = clean(detail_buttons[0])
         if len(detail_buttons) > 1:
@@ -106,7 +129,7 @@ def extract_job_data(input_html_path):
         employment_type = "Not available"
 
     try:
-        description_element = soup.select_one("div#job-details")
+        description_element = SELECTORS.select_one("description", soup)
         job_description = clean(description_element)
     except Exception:
         job_description = "Not available"
@@ -128,9 +151,16 @@ def extract_job_data(input_html_path):
     return data
 
 if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) > 1:
         html_file_path = sys.argv[1]
-        job_data = extract_job_data(html_file_path)
+        from capture import capturing
+        with capturing(html_file_path, "job"):
+            job_data = extract_job_data(html_file_path)
         print(json.dumps(job_data, indent=2, ensure_ascii=False))
     else:
         error_data = {"error": "No file path provided to the Python script."}
@@ -0,0 +1,161 @@
+import sys
+import os
+import json
+import re
+from html_decode import read_html
+from selector_registry import SelectorRegistry
+
+# Version of the code behind each field of a card record; bump it when the
+# field's selectors change so `scrape.py reextract` refreshes stored results.
+FIELD_VERSIONS = {
+    "job_id": 1,
+    "job_url": 1,
+    "job_title": 1,
+    "company_name": 1,
+    "location": 1,
+    "salary": 1,
+    "date_posted": 1,
+    "workplace_type": 1,
+    "applicants_count": 1,
+    "employment_type": 1,
+    "experience_level": 1,
+    "job_description": 1,
+}
+
+# Job cards on LinkedIn search pages. The logged-in layout uses job-card-container
+# cards, the public (guest) layout uses base-search-card; both are handled.
+CARD_SELECTOR = "li[data-occludable-job-id], div.job-card-container[data-job-id], div.base-search-card"
+TITLE_SELECTOR = "a.job-card-list__title strong, a.job-card-list__title--link strong, a.job-card-container__link span[aria-hidden='true'], h3.base-search-card__title"
+COMPANY_SELECTOR = ".artdeco-entity-lockup__subtitle span, .job-card-container__primary-description, h4.base-search-card__subtitle"
+LOCATION_SELECTOR = ".artdeco-entity-lockup__caption li span, .job-card-container__metadata-item, span.job-search-card__location"
+SALARY_SELECTOR = ".artdeco-entity-lockup__metadata li span, .job-card-container__metadata-item--salary, span.job-search-card__salary-info"
+POSTED_SELECTOR = "time, span.job-search-card__listdate"
+LINK_SELECTOR = "a[href*='/jobs/view/']"
+SELECTORS = SelectorRegistry("job_search", {
+    "card": CARD_SELECTOR,
+    "title": TITLE_SELECTOR,
+    "company": COMPANY_SELECTOR,
+    "location": LOCATION_SELECTOR,
+    "salary": SALARY_SELECTOR,
+    "posted": POSTED_SELECTOR,
+    "link": LINK_SELECTOR,
+})
+
+_JOB_ID_RE = re.compile(r"(?:jobPosting:|/jobs/view/(?:[^/?]*-)?)(\d+)")
+_SALARY_RE = re.compile(r"[$€£₹]|/yr|/hr|per (?:year|hour)", re.I)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def clean(content):
+    """
+    Cleans text by normalizing whitespace.
+    """
+    if not content:
+        return "Not available"
+
+    if hasattr(content, 'find_all'):
+        text = content.get_text(separator=" ", strip=True)
+    else:
+        text = str(content)
+
+    text = _WHITESPACE_RE.sub(' ', text)
+    return text.strip() if text.strip() else "Not available"
+
+def _job_id(card):
+    """Reads the numeric job id from the card attributes or its link."""
+    for attr in ("data-occludable-job-id", "data-job-id"):
+        if card.has_attr(attr) and card[attr].strip().isdigit():
+            return card[attr].strip()
+    candidates = [card.get("data-entity-urn", "")]
+    link = SELECTORS.select_one("link", card)
+    if link:
+        candidates.append(link.get("href", ""))
+    for candidate in candidates:
+        match = _JOB_ID_RE.search(candidate)
+        if match:
+            return match.group(1)
+    return "Not available"
+
+def _salary(card):
+    """Salary is an optional metadata line; only accept text that looks like pay."""
+    for element in SELECTORS.select("salary", card):
+        text = clean(element)
+        if _SALARY_RE.search(text):
+            return text
+    return "Not available"
+
+def extract_card(card):
+    """Builds a `job` record from a single search result card."""
+    job_id = _job_id(card)
+    posted = SELECTORS.select_one("posted", card)
+    return {
+        "type": "job",
+        "job_id": job_id,
+        "job_url": f"https://www.linkedin.com/jobs/view/{job_id}/" if job_id != "Not available" else "Not available",
+        "job_title": clean(SELECTORS.select_one("title", card)),
+        "company_name": clean(SELECTORS.select_one("company", card)),
+        "location": clean(SELECTORS.select_one("location", card)),
+        "salary": _salary(card),
+        "date_posted": clean(posted),
+        "workplace_type": "Not available",
+        "applicants_count": "Not available",
+        "employment_type": "Not available",
+        "experience_level": "Not available",
+        "job_description": "Not available"
+    }
+
+def iter_job_cards(soup):
+    """Yields one `job` record per card, in page order, skipping repeated ids."""
+    seen = set()
+    for card in SELECTORS.select("card", soup):
+        # A logged-in <li> wraps a job-card-container div; only use the outer one.
+        if card.name == "div" and card.find_parent("li", attrs={"data-occludable-job-id": True}):
+            continue
+        try:
+            record = extract_card(card)
+        except Exception:
+            continue
+        key = record["job_id"] if record["job_id"] != "Not available" else (record["job_title"], record["company_name"])
+        if record["job_title"] == "Not available" or key in seen:
+            continue
+        seen.add(key)
+        yield record
+
+def extract_job_search_from_soup(soup):
+    """Extracts every job card on a LinkedIn job search page."""
+    return list(iter_job_cards(soup))
+
+def extract_job_search(input_html_path):
+    """Main function to orchestrate LinkedIn job search extraction from a local HTML file."""
+    if not os.path.exists(input_html_path):
+        return {"type": "job_search", "error": f"File not found at {input_html_path}"}
+
+    html = read_html(input_html_path)
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    return extract_job_search_from_soup(soup)
+
+if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+    if len(sys.argv) > 1:
+        html_file_path = sys.argv[1]
+        from capture import capturing
+        if "--ndjson" in sys.argv[2:] and os.path.exists(html_file_path):
+            # Stream one record per line as soon as each card is extracted.
+            from bs4 import BeautifulSoup
+            with capturing(html_file_path, "job_search"):
+                soup = BeautifulSoup(read_html(html_file_path), "lxml")
+                for record in iter_job_cards(soup):
+                    print(json.dumps(record, ensure_ascii=False), flush=True)
+        else:
+            with capturing(html_file_path, "job_search"):
+                jobs = extract_job_search(html_file_path)
+            print(json.dumps(jobs, indent=2, ensure_ascii=False))
+    else:
+        error_data = {"error": "No file path provided to the Python script."}
+        print(json.dumps(error_data, indent=2))
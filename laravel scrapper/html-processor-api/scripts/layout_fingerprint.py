@@ -0,0 +1,115 @@
+import os
+import re
+import importlib
+import importlib.util
+import threading
+
+import metrics
+
+# Some page types have more than one extractor because LinkedIn serves more
+# than one layout. A page's layout fingerprint is the set of marker classes and
+# attributes it contains; each fingerprint is mapped to exactly one extractor
+# variant, so a page is never run through both and a selector miss never falls
+# through every variant in turn.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LAYOUT_VARIANTS = {
+    "person": {
+        "default": "classic",
+        "variants": {
+            # scripts/person_scraper.py: the pv-* / artdeco top card and sections.
+            "classic": {
+                "module": "person_scraper",
+                "markers": ["pv-text-details__left-panel", "pv-top-card", "artdeco-list__item", "pvs-entity__sub-components"],
+            },
+            # scripts/test/person_scraper.py: the obfuscated server-driven top card.
+            "sdui": {
+                "path": os.path.join("test", "person_scraper.py"),
+                "markers": ["_140ad967", "_9cd462e2", "expandable-text-box", "entity-collection-item"],
+            },
+        },
+    },
+}
+
+_patterns = {}
+_variant_cache = {}
+_extractor_cache = {}
+_variant_counts = {}
+# The caches are shared by thread-pool workers. Filling _patterns or
+# _variant_cache twice is harmless; counting and loading a variant's module
+# are done under the lock.
+_lock = threading.Lock()
+
+def _marker_pattern(page_type, as_bytes):
+    key = (page_type, as_bytes)
+    if key not in _patterns:
+        markers = [m for v in LAYOUT_VARIANTS[page_type]["variants"].values() for m in v["markers"]]
+        alternation = "|".join(re.escape(m) for m in markers)
+        _patterns[key] = re.compile(alternation.encode("ascii") if as_bytes else alternation)
+    return _patterns[key]
+
+def fingerprint(html, page_type):
+    """
+    Returns the sorted tuple of layout markers present in the page. The scan is a
+    single precompiled regex pass that stops as soon as every marker has been seen.
+    """
+    as_bytes = isinstance(html, (bytes, bytearray, memoryview))
+    all_markers = {m for v in LAYOUT_VARIANTS[page_type]["variants"].values() for m in v["markers"]}
+    found = set()
+    for match in _marker_pattern(page_type, as_bytes).finditer(html):
+        marker = match.group(0)
+        found.add(marker.decode("ascii") if as_bytes else marker)
+        if len(found) == len(all_markers):
+            break
+    return tuple(sorted(found))
+
+def _variant_for(page_type, page_fingerprint):
+    spec = LAYOUT_VARIANTS[page_type]
+    best, best_score = spec["default"], 0
+    for name, variant in spec["variants"].items():
+        score = sum(1 for m in variant["markers"] if m in page_fingerprint)
+        if score > best_score:
+            best, best_score = name, score
+    return best
+
+def detect_variant(html, page_type):
+    """Returns the extractor variant for a page; the decision is cached per fingerprint."""
+    if page_type not in LAYOUT_VARIANTS:
+        return None
+    key = (page_type, fingerprint(html, page_type))
+    variant = _variant_cache.get(key)
+    metrics.inc("scraper_cache_requests_total", (("cache", "layout_variant"), ("result", "miss" if variant is None else "hit")))
+    if variant is None:
+        variant = _variant_cache[key] = _variant_for(page_type, key[1])
+    with _lock:
+        _variant_counts[(page_type, variant)] = _variant_counts.get((page_type, variant), 0) + 1
+    return variant
+
+def load_variant_extractor(page_type, variant, function="extract_profile_from_soup"):
+    """Imports a variant's scraper module (by name or by path) and returns its soup-level extractor."""
+    key = (page_type, variant)
+    if key in _extractor_cache:
+        return _extractor_cache[key]
+    with _lock:
+        if key in _extractor_cache:
+            return _extractor_cache[key]
+        spec = LAYOUT_VARIANTS[page_type]["variants"][variant]
+        if "module" in spec:
+            module = importlib.import_module(spec["module"])
+        else:
+            module_name = f"{page_type}_{variant}_scraper"
+            file_spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, spec["path"]))
+            module = importlib.util.module_from_spec(file_spec)
+            file_spec.loader.exec_module(module)
+        _extractor_cache[key] = getattr(module, function)
+    return _extractor_cache[key]
+
+def variant_stats():
+    """Pages routed per variant and the number of distinct fingerprints seen."""
+    with _lock:
+        counts = sorted(_variant_counts.items())
+    return {
+        "fingerprints": len(_variant_cache),
+        "routed": {f"{page_type}/{variant}": n for (page_type, variant), n in counts},
+    }
@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import bisect
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+from corpus import iter_corpus
+from html_decode import read_html
+from page_types import PAGE_TYPES, detect_page_type
+
+# Replays saved pages the way the extension sends them: a JSON POST of
+# {"html": ..., "url": ...} to /api/process-page. With target "subprocess" the
+# Laravel hop is skipped and each request runs the scraper script exactly as
+# PageController does, one Python process per page.
+
+DEFAULT_TARGET = "http://127.0.0.1:8001/api/process-page"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Histogram bucket upper bounds in milliseconds.
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, float("inf")]
+
+class LatencyHistogram:
+    """Keeps every sample for exact percentiles plus fixed buckets for a histogram view."""
+    def __init__(self):
+        self.samples = []
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.errors = {}
+
+    def record(self, latency_ms, error=None):
+        self.samples.append(latency_ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, latency_ms)] += 1
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def percentile(self, p):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        # Nearest-rank percentile.
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[index], 2)
+
+    def summary(self, elapsed):
+        count = len(self.samples)
+        error_count = sum(self.errors.values())
+        return {
+            "requests": count,
+            "errors": error_count,
+            "error_rate": round(error_count / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(max(self.samples), 2) if self.samples else None,
+            "histogram_ms": {
+                ("+Inf" if bound == float("inf") else str(bound)): n
+                for bound, n in zip(BUCKETS_MS, self.buckets) if n
+            },
+            "error_kinds": dict(self.errors),
+        }
+
+def load_fixtures(corpus_path):
+    """Reads every supported page of the corpus into memory once, before the run starts."""
+    fixtures = []
+    for page in iter_corpus(corpus_path):
+        page_type = detect_page_type(page["url"])
+        if not page_type:
+            continue
+        html = read_html(page["path"])
+        fixtures.append({"url": page["url"], "page_type": page_type, "html": html})
+    return fixtures
+
+def _send_http(target, fixture, timeout):
+    body = json.dumps({"html": fixture["html"], "url": fixture["url"]}).encode("utf-8")
+    request = urllib.request.Request(target, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as exc:
+        return f"http_{exc.code}"
+    except urllib.error.URLError as exc:
+        return f"connection: {exc.reason}"
+    except TimeoutError:
+        return "timeout"
+    except OSError as exc:
+        return f"connection: {exc.__class__.__name__}"
+    except ValueError:
+        return "invalid_json"
+    if isinstance(payload, dict) and payload.get("error"):
+        return "scraper_error"
+    return None
+
+def _send_subprocess(fixture, timeout):
+    script = os.path.join(SCRIPTS_DIR, PAGE_TYPES[fixture["page_type"]]["module"] + ".py")
+    with tempfile.NamedTemporaryFile("w", suffix=".html", encoding="utf-8", delete=False) as f:
+        f.write(fixture["html"])
+        temp_path = f.name
+    try:
+        result = subprocess.run([sys.executable, script, temp_path], capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return "timeout"
+    finally:
+        os.remove(temp_path)
+    if result.returncode != 0:
+        return f"exit_{result.returncode}"
+    try:
+        payload = json.loads(result.stdout.decode("utf-8", "replace"))
+    except ValueError:
+        return "invalid_json"
+    if isinstance(payload, dict) and payload.get("error"):
+        return "scraper_error"
+    return None
+
+def run_load_test(fixtures, target=DEFAULT_TARGET, concurrency=4, rate=None, requests=100, timeout=60.0, seed=None):
+    """
+    Sends `requests` pages, cycling through the fixtures in random order.
+
+    With `rate` (requests per second) the run is open-loop: arrivals follow a
+    Poisson process and latency is measured from the scheduled arrival time, so
+    time spent waiting for a free slot counts against the pipeline. Without it,
+    `concurrency` senders run back to back as fast as the target allows.
+    """
+    if not fixtures:
+        raise ValueError("The corpus contains no supported pages.")
+    rng = random.Random(seed)
+    overall = LatencyHistogram()
+    per_type = {}
+    lock = threading.Lock()
+
+    def send(fixture, scheduled_at):
+        if target == "subprocess":
+            error = _send_subprocess(fixture, timeout)
+        else:
+            error = _send_http(target, fixture, timeout)
+        latency_ms = (time.perf_counter() - scheduled_at) * 1000
+        with lock:
+            overall.record(latency_ms, error)
+            per_type.setdefault(fixture["page_type"], LatencyHistogram()).record(latency_ms, error)
+
+    # Shuffle the pages before cycling through them, so a run shorter than the
+    # corpus still samples every part of it rather than the first pages listed.
+    shuffled = rng.sample(fixtures, len(fixtures))
+    order = [shuffled[i % len(shuffled)] for i in range(requests)]
+    rng.shuffle(order)
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate:
+            next_arrival = started
+            for fixture in order:
+                next_arrival += rng.expovariate(rate)
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(send, fixture, next_arrival)
+        else:
+            for fixture in order:
+                pool.submit(lambda f=fixture: send(f, time.perf_counter()))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "target": target,
+        "concurrency": concurrency,
+        "arrival_rate_rps": rate,
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": overall.summary(elapsed),
+        "per_page_type": {name: hist.summary(elapsed) for name, hist in sorted(per_type.items())},
+    }
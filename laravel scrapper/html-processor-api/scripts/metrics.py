@@ -0,0 +1,248 @@
+import os
+import time
+import bisect
+import threading
+
+# Metrics for long-running extraction (worker and batch modes), exposed in
+# the Prometheus text format on a local HTTP endpoint or written to a file
+# for node_exporter's textfile collector.
+#
+# Recording is off until enable() is called, and then lock-free: each thread
+# adds to counters and histogram buckets in a shard of its own, and a scrape
+# sums the shards. A scrape may see a histogram one observation ahead in its
+# buckets compared to its _count, which Prometheus tolerates. Worker
+# processes drain() their shard after every job and send it with the result;
+# the dispatcher merge()s it, so one endpoint covers the whole pool. Gauges
+# (queue depth, worker RSS) are read from collectors when a scrape happens.
+
+METRICS = {
+    "scraper_requests_total": ("counter", "Pages extracted, by page type and outcome."),
+    "scraper_stage_seconds": ("histogram", "Time per extraction stage: decode, parse, extract, serialize."),
+    "scraper_field_seconds": ("histogram", "Time per field extractor, for scrapers that yield fields one at a time."),
+    "scraper_field_values_total": ("counter", "Field values extracted."),
+    "scraper_field_not_available_total": ("counter", "Field values that came out as \"Not available\"."),
+    "scraper_cache_requests_total": ("counter", "Cache lookups, by cache and result (hit or miss)."),
+    "scraper_queue_depth": ("gauge", "Jobs waiting, by queue."),
+    "scraper_worker_rss_bytes": ("gauge", "Resident memory of each live worker."),
+}
+# Upper bounds in seconds; a single page takes from well under a millisecond
+# (one field) to seconds (a huge profile).
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = False
+_local = threading.local()
+_shards = []
+# Only taken when a thread records its first value and when collectors change.
+_registry_lock = threading.Lock()
+_collectors = []
+
+class _Shard:
+    def __init__(self):
+        self.counters = {}
+        # key -> [bucket counts..., +Inf count, sum]
+        self.histograms = {}
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _registry_lock:
+            _shards.append(shard)
+    return shard
+
+def enable(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+def enabled():
+    return _enabled
+
+def inc(name, labels=(), value=1):
+    """Adds to a counter. Labels are a tuple of (name, value) pairs."""
+    if not _enabled:
+        return
+    counters = _shard().counters
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+def observe(name, labels, seconds):
+    """Records one observation in a histogram."""
+    if not _enabled:
+        return
+    histograms = _shard().histograms
+    key = (name, labels)
+    entry = histograms.get(key)
+    if entry is None:
+        entry = histograms[key] = [0] * (len(BUCKETS) + 2)
+    entry[bisect.bisect_left(BUCKETS, seconds)] += 1
+    entry[-1] += seconds
+
+class StageTimer:
+    """Times consecutive stages of one extraction: call lap(stage) at the end of each."""
+    def __init__(self, page_type):
+        self.labels = (("page_type", page_type),)
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        observe("scraper_stage_seconds", self.labels + (("stage", stage),), now - self.last)
+        self.last = now
+        return now
+
+def count_fields(page_type, data):
+    """Counts field values and "Not available" ones of a result (a record or a list of records)."""
+    if not _enabled:
+        return
+    for record in data if isinstance(data, list) else [data]:
+        if not isinstance(record, dict):
+            continue
+        for field, value in record.items():
+            labels = (("page_type", page_type), ("field", field))
+            inc("scraper_field_values_total", labels)
+            if value == "Not available":
+                inc("scraper_field_not_available_total", labels)
+
+def register_collector(collect):
+    """
+    Adds a callable returning gauge samples [(name, labels, value), ...],
+    called on every scrape. Returns a function that removes it again.
+    """
+    with _registry_lock:
+        _collectors.append(collect)
+    def remove():
+        with _registry_lock:
+            if collect in _collectors:
+                _collectors.remove(collect)
+    return remove
+
+def _add(snapshot, counters, histograms):
+    for key, value in counters.items():
+        snapshot["counters"][key] = snapshot["counters"].get(key, 0) + value
+    for key, entry in histograms.items():
+        total = snapshot["histograms"].get(key)
+        if total is None:
+            snapshot["histograms"][key] = list(entry)
+        else:
+            for i, value in enumerate(entry):
+                total[i] += value
+
+def snapshot():
+    """Sums every thread's shard into {"counters": {...}, "histograms": {...}}."""
+    with _registry_lock:
+        shards = list(_shards)
+    result = {"counters": {}, "histograms": {}}
+    for shard in shards:
+        # dict() copies in one step, so a writer adding a key cannot break the iteration.
+        _add(result, dict(shard.counters), {key: list(entry) for key, entry in dict(shard.histograms).items()})
+    return result
+
+def drain():
+    """
+    Returns this thread's counts since the last drain and starts over, in a
+    picklable form for merge(). Meant for worker processes, where jobs run on
+    one thread.
+    """
+    shard = _shard()
+    counters, histograms = shard.counters, shard.histograms
+    shard.counters, shard.histograms = {}, {}
+    return {"counters": list(counters.items()), "histograms": list(histograms.items())}
+
+def merge(drained):
+    """Adds counts drained in another process to this thread's shard."""
+    if not _enabled or not drained:
+        return
+    shard = _shard()
+    _add({"counters": shard.counters, "histograms": shard.histograms},
+         {tuple_key(key): value for key, value in drained["counters"]},
+         {tuple_key(key): entry for key, entry in drained["histograms"]})
+
+def tuple_key(key):
+    """Restores a (name, labels) key whose tuples became lists on the way (e.g. through JSON)."""
+    name, labels = key
+    return name, tuple(tuple(pair) for pair in labels)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    gauges = {}
+    with _registry_lock:
+        collectors = list(_collectors)
+    for collect in collectors:
+        for name, labels, value in collect():
+            gauges[(name, tuple(labels))] = value
+
+    by_name = {}
+    for key, value in data["counters"].items():
+        by_name.setdefault(key[0], []).append((key[1], value))
+    for key, value in data["histograms"].items():
+        by_name.setdefault(key[0], []).append((key[1], value))
+    for key, value in gauges.items():
+        by_name.setdefault(key[0], []).append((key[1], value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = METRICS.get(name, ("untyped", ""))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name[name]):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+def write_textfile(path):
+    """Writes render() to path atomically (node_exporter reads *.prom files whole)."""
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(temp, path)
+
+def start_textfile_writer(path, interval=15.0):
+    """Rewrites the metrics file every `interval` seconds until the returned event is set."""
+    stop = threading.Event()
+    def loop():
+        while not stop.wait(interval):
+            write_textfile(path)
+    threading.Thread(target=loop, name="metrics-file", daemon=True).start()
+    return stop
+
+def serve(port, host="127.0.0.1"):
+    """Serves GET /metrics on a daemon thread; returns the server (call shutdown() to stop)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,110 @@
+import re
+import hashlib
+from lxml import etree, html as lxml_html
+
+from corpus import canonical_url
+
+# Captures of the same page usually differ only in tracking IDs, timestamps and
+# ad slots, so an exact content hash never matches. A 64-bit SimHash over the
+# pruned visible text stays within a few bits for such captures.
+
+FINGERPRINT_BITS = 64
+DEFAULT_SIMILARITY = 0.95
+SHINGLE_SIZE = 3
+# Search pages list jobs that come and go between captures: two captures can
+# agree on all but a few bits and still list different jobs, so these are
+# never clustered and every capture is extracted.
+UNCLUSTERED_PAGE_TYPES = ("job_search", "indeed_search")
+
+# Elements that never contribute visible text.
+PRUNED_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "head")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Long runs of digits/hex are tracking IDs and timestamps, not content.
+_NOISE_TOKEN_RE = re.compile(r"^(?:\d{5,}|[0-9a-f]{12,})$")
+
+def visible_text(html):
+    """Returns the visible text of a page with scripts, styles and the head removed."""
+    if not html:
+        return ""
+    try:
+        root = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return ""
+    etree.strip_elements(root, *PRUNED_TAGS, with_tail=False)
+    etree.strip_elements(root, etree.Comment, with_tail=False)
+    return root.text_content()
+
+def _tokens(text):
+    return [t for t in _TOKEN_RE.findall(text.lower()) if not _NOISE_TOKEN_RE.match(t)]
+
+def simhash(text):
+    """Computes a 64-bit SimHash over word shingles of the given text."""
+    tokens = _tokens(text)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def page_fingerprint(html):
+    """SimHash of a page's pruned visible text."""
+    return simhash(visible_text(html))
+
+def similarity(a, b):
+    """Fraction of fingerprint bits two SimHashes agree on (1.0 = identical)."""
+    return 1 - bin(a ^ b).count("1") / FINGERPRINT_BITS
+
+class NearDuplicateIndex:
+    """
+    Clusters near-identical captures of the same URL. Only captures sharing a
+    canonical URL are compared, so each lookup scans a handful of clusters.
+    """
+    def __init__(self, threshold=DEFAULT_SIMILARITY):
+        self.threshold = threshold
+        self.clusters = {}
+        self.pages = 0
+
+    def add(self, url, fingerprint, item):
+        """Adds a capture and returns the cluster (a list of items) it joined."""
+        self.pages += 1
+        key = canonical_url(url)
+        candidates = self.clusters.setdefault(key, [])
+        for cluster in candidates:
+            if similarity(cluster["fingerprint"], fingerprint) >= self.threshold:
+                cluster["members"].append(item)
+                return cluster["members"]
+        cluster = {"fingerprint": fingerprint, "members": [item]}
+        candidates.append(cluster)
+        return cluster["members"]
+
+    def iter_clusters(self):
+        for candidates in self.clusters.values():
+            for cluster in candidates:
+                yield cluster["members"]
+
+    def stats(self):
+        cluster_count = sum(len(c) for c in self.clusters.values())
+        skipped = self.pages - cluster_count
+        return {
+            "pages": self.pages,
+            "clusters": cluster_count,
+            "extractions_skipped": skipped,
+            "skipped_ratio": round(skipped / self.pages, 4) if self.pages else 0.0,
+            "similarity_threshold": self.threshold,
+        }
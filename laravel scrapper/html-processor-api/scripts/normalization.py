@@ -0,0 +1,334 @@
+import os
+import re
+import sys
+import mmap
+import bisect
+import struct
+import hashlib
+import unicodedata
+
+# Canonical ids for the employers, skills and locations in extracted records,
+# so downstream joins compare ids instead of raw spellings ("Google",
+# "Google LLC" and "google · Full-time" are one company).
+#
+# normalize_name() reduces a spelling to a lookup key: NFKC, casefolded,
+# anything after a " · " separator dropped, punctuation collapsed and, for
+# companies, trailing legal suffixes (Inc, LLC, GmbH...) removed. An index
+# maps keys to ids; each id is the position of a canonical display string in
+# a sorted, interned string table. build_index() harvests the keys and their
+# most common spelling from batch output, plus optional curated aliases, and
+# writes one file per kind section:
+#
+#   header     MAGIC, version, section count, digest of everything after the header
+#   directory  per kind: name, string count, key count, section offsets
+#   hashes     sorted uint64 key hashes (blake2b of the key)
+#   ids        uint32 id per hash
+#   offsets    uint64 string offsets, count + 1
+#   strings    UTF-8 canonical strings, concatenated
+#
+# NormalizationIndex mmaps the file and binary-searches the hash array in
+# place, so loading costs nothing and pool workers share the pages. Keys are
+# not stored: two keys with the same 64-bit hash would share an id, which is
+# negligible at millions of names. Ids are only stable within one index file;
+# digest identifies the file a record was annotated with.
+
+KINDS = ("company", "skill", "location")
+MAGIC = b"SCNORM\x00\x01"
+VERSION = 1
+_HEADER = struct.Struct("<8sII16s")
+_SECTION = struct.Struct("<16sIIQQQQ")
+
+_SEPARATOR = re.compile(r"\s+[·•|]\s+")
+_PUNCTUATION = re.compile(r"[^\w+#]+")
+# Removed from the end of company keys, repeatedly ("Acme Holdings Co., Ltd." keeps "acme holdings").
+COMPANY_SUFFIXES = frozenset((
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co", "company", "plc",
+    "gmbh", "ag", "sa", "sas", "sarl", "srl", "spa", "bv", "nv", "oy", "ab", "as", "pty", "pvt", "kg",
+))
+
+def display_name(text):
+    """A spelling as shown: whitespace collapsed and anything after a " · " separator dropped."""
+    if not isinstance(text, str) or text == "Not available":
+        return None
+    text = _SEPARATOR.split(unicodedata.normalize("NFKC", text).strip())[0]
+    return " ".join(text.split()) or None
+
+def normalize_name(kind, text):
+    """The lookup key for a company, skill or location spelling; None for missing values."""
+    text = display_name(text)
+    if text is None:
+        return None
+    tokens = _PUNCTUATION.sub(" ", text.casefold()).split()
+    if kind == "company":
+        while len(tokens) > 1 and tokens[-1] in COMPANY_SUFFIXES:
+            tokens.pop()
+    return " ".join(tokens) or None
+
+def key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+# Where each page type's names are, as (field, kind) for the record itself and
+# for entries of its list fields. Search pages yield a list of job records.
+RECORD_FIELDS = {
+    "job": (("company_name", "company"), ("location", "location")),
+    "indeed_job": (("company_name", "company"), ("location", "location")),
+    "job_search": (("company_name", "company"), ("location", "location")),
+    "indeed_search": (("company_name", "company"), ("location", "location")),
+    "company": (("company_name", "company"), ("headquarters", "location")),
+    "indeed_company": (("company_name", "company"), ("headquarters", "location")),
+    "person": (("location", "location"),),
+}
+LIST_FIELDS = {
+    "person": {
+        "experience": (("company_name", "company"), ("company_location", "location")),
+        "skills": "skill",
+    },
+}
+
+def iter_names(page_type, data):
+    """Yields (kind, spelling) for every name in an extraction result."""
+    for item in data if isinstance(data, list) else [data]:
+        if not isinstance(item, dict):
+            continue
+        for field, kind in RECORD_FIELDS.get(page_type, ()):
+            yield kind, item.get(field)
+        for field, spec in LIST_FIELDS.get(page_type, {}).items():
+            for entry in item.get(field) or []:
+                if isinstance(spec, str):
+                    yield spec, entry
+                elif isinstance(entry, dict):
+                    for key, kind in spec:
+                        yield kind, entry.get(key)
+
+class NormalizationIndex:
+    """A built index file, memory-mapped; see lookup() and canonical_ids()."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, digest = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a normalization index (version {VERSION})")
+        if sys.byteorder != "little":
+            self._mmap.close()
+            raise ValueError("Normalization indexes are little-endian; this machine is not")
+        self.digest = digest.hex()
+        view = memoryview(self._mmap)
+        self._views = [view]
+        self.sections = {}
+        for number in range(count):
+            name, strings, keys, hashes_at, ids_at, offsets_at, blob_at = _SECTION.unpack_from(
+                self._mmap, _HEADER.size + number * _SECTION.size,
+            )
+            section = {
+                "strings": strings,
+                "keys": keys,
+                "hashes": view[hashes_at:hashes_at + 8 * keys].cast("Q"),
+                "ids": view[ids_at:ids_at + 4 * keys].cast("I"),
+                "offsets": view[offsets_at:offsets_at + 8 * (strings + 1)].cast("Q"),
+                "blob": blob_at,
+            }
+            self._views.extend((section["hashes"], section["ids"], section["offsets"]))
+            self.sections[name.rstrip(b"\x00").decode("ascii")] = section
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def name(self, kind, canonical_id):
+        """The canonical display string for an id."""
+        section = self.sections[kind]
+        offsets = section["offsets"]
+        start, end = offsets[canonical_id], offsets[canonical_id + 1]
+        return self._mmap[section["blob"] + start:section["blob"] + end].decode("utf-8")
+
+    def lookup(self, kind, spellings):
+        """Canonical ids for a batch of spellings of one kind (None where unknown)."""
+        section = self.sections.get(kind)
+        if section is None:
+            return [None] * len(spellings)
+        hashes, ids = section["hashes"], section["ids"]
+        # Each distinct key is searched once however often it repeats in the batch.
+        found = {}
+        results = []
+        for spelling in spellings:
+            key = normalize_name(kind, spelling)
+            if key is None:
+                results.append(None)
+                continue
+            if key not in found:
+                value = key_hash(key)
+                position = bisect.bisect_left(hashes, value)
+                found[key] = ids[position] if position < len(hashes) and hashes[position] == value else None
+            results.append(found[key])
+        return results
+
+    def canonical_ids_many(self, results):
+        """
+        Canonical ids for a batch of (page_type, data) extraction results, with
+        one lookup per kind for the whole batch. Each result gets the shape of
+        its data: {"company_name": id, "experience": [{"company_name": id, ...}],
+        "skills": [id, ...], ...}, or a list of those for search pages.
+        """
+        names = {kind: [] for kind in KINDS}
+        for page_type, data in results:
+            for kind, spelling in iter_names(page_type, data):
+                names[kind].append(spelling)
+        ids = {kind: iter(self.lookup(kind, spellings)) for kind, spellings in names.items()}
+
+        # Walk the results in the same order as iter_names to hand the ids back.
+        annotated = []
+        for page_type, data in results:
+            items = []
+            for item in data if isinstance(data, list) else [data]:
+                if not isinstance(item, dict):
+                    items.append(None)
+                    continue
+                entry = {field: next(ids[kind]) for field, kind in RECORD_FIELDS.get(page_type, ())}
+                for field, spec in LIST_FIELDS.get(page_type, {}).items():
+                    values = item.get(field) or []
+                    if isinstance(spec, str):
+                        entry[field] = [next(ids[spec]) for _ in values]
+                    else:
+                        entry[field] = [
+                            {key: next(ids[kind]) for key, kind in spec} if isinstance(value, dict) else None
+                            for value in values
+                        ]
+                items.append(entry)
+            annotated.append(items if isinstance(data, list) else items[0])
+        return annotated
+
+    def canonical_ids(self, page_type, data):
+        return self.canonical_ids_many([(page_type, data)])[0]
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "digest": self.digest,
+            "kinds": {kind: {"canonical": s["strings"], "keys": s["keys"]} for kind, s in sorted(self.sections.items())},
+        }
+
+def _read_aliases(path):
+    """Curated aliases, one "kind<TAB>spelling<TAB>canonical spelling" per line; # starts a comment."""
+    aliases = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            if len(parts) != 3 or parts[0] not in KINDS:
+                raise ValueError(f"{path}:{number}: expected kind, spelling and canonical spelling separated by tabs")
+            aliases.append(tuple(parts))
+    return aliases
+
+def build_index(inputs, path, aliases=None, min_count=1):
+    """
+    Builds an index from batch output (NDJSON files or segment directories):
+    every key seen at least min_count times gets its most common spelling as
+    the canonical string. Aliases (a TSV file, see _read_aliases) map further
+    spellings onto a canonical one. Returns the build statistics.
+    """
+    from columnar_export import iter_records
+
+    # kind -> key -> spelling -> count; memory grows with distinct names, not records.
+    counts = {kind: {} for kind in KINDS}
+    records = 0
+    for record in iter_records(inputs):
+        data = record.get("data")
+        if not data or (isinstance(data, dict) and "error" in data):
+            continue
+        records += 1
+        for kind, spelling in iter_names(record.get("page_type"), data):
+            key = normalize_name(kind, spelling)
+            if key is not None:
+                spellings = counts[kind].setdefault(key, {})
+                spelling = display_name(spelling)
+                spellings[spelling] = spellings.get(spelling, 0) + 1
+
+    canonical = {kind: {} for kind in KINDS}
+    for kind, keys in counts.items():
+        for key, spellings in keys.items():
+            if sum(spellings.values()) >= min_count:
+                # Most common spelling; ties go to the shorter, then the alphabetically first.
+                canonical[kind][key] = min(spellings, key=lambda s: (-spellings[s], len(s), s))
+    for kind, spelling, target in _read_aliases(aliases) if aliases else ():
+        target_key = normalize_name(kind, target)
+        key = normalize_name(kind, spelling)
+        if key is None or target_key is None:
+            continue
+        canonical[kind].setdefault(target_key, display_name(target))
+        canonical[kind][key] = canonical[kind][target_key]
+
+    sections = []
+    for kind in KINDS:
+        strings = sorted(set(canonical[kind].values()))
+        position = {string: number for number, string in enumerate(strings)}
+        entries = sorted((key_hash(key), position[string]) for key, string in canonical[kind].items())
+        sections.append((kind, strings, entries))
+    _write_index(path, sections)
+    return {
+        "path": path,
+        "records": records,
+        "kinds": {kind: {"canonical": len(strings), "keys": len(entries)} for kind, strings, entries in sections},
+    }
+
+def _write_index(path, sections):
+    def pad(size):
+        return (size + 7) // 8 * 8
+
+    header_size = pad(_HEADER.size + len(sections) * _SECTION.size)
+    directory, chunks, offset = [], [], header_size
+    for kind, strings, entries in sections:
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets, total = [0], 0
+        for string in encoded:
+            total += len(string)
+            offsets.append(total)
+        parts = [
+            struct.pack(f"<{len(entries)}Q", *(value for value, _ in entries)),
+            struct.pack(f"<{len(entries)}I", *(number for _, number in entries)),
+            struct.pack(f"<{len(offsets)}Q", *offsets),
+            b"".join(encoded),
+        ]
+        positions = []
+        for part in parts:
+            positions.append(offset)
+            chunks.append(part + b"\x00" * (pad(len(part)) - len(part)))
+            offset += pad(len(part))
+        directory.append(_SECTION.pack(kind.encode("ascii"), len(strings), len(entries), *positions))
+
+    digest = hashlib.sha256(b"".join(directory) + b"".join(chunks)).digest()[:16]
+    header = _HEADER.pack(MAGIC, VERSION, len(sections), digest) + b"".join(directory)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(header + b"\x00" * (header_size - len(header)))
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp, path)
+
+_open_indexes = {}
+
+def open_index(path):
+    """The index at path, opened once per process."""
+    index = _open_indexes.get(path)
+    if index is None:
+        index = _open_indexes[path] = NormalizationIndex(path)
+    return index
+
+def describe(index, kind, spellings):
+    """Lookup results with their canonical strings, for the CLI."""
+    return [
+        {"spelling": spelling, "key": normalize_name(kind, spelling), "id": found,
+         "canonical": None if found is None else index.name(kind, found)}
+        for spelling, found in zip(spellings, index.lookup(kind, spellings))
+    ]
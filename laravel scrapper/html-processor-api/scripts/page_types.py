@@ -0,0 +1,174 @@
+import time
+import importlib
+
+import metrics
+
+# Page types supported by the scrapers. The URL checks mirror the routing in
+# PageController so a page is handled the same way whether it comes from the
+# extension or from one of the local tools.
+#
+# "ready_markers" lists the elements that must be closed before extraction can
+# start on a partially received page: (tag, attribute, value), where attribute
+# and value are None when the tag alone is enough.
+#
+# "iter_fields" and "field_order" name a scraper's field generator and output
+# key order, used by field_stream to send fields as they become available.
+PAGE_TYPES = {
+    "person": {
+        "module": "person_scraper",
+        "extract": "extract_profile_from_soup",
+        "ready_markers": [("main", None, None)],
+        "iter_fields": "iter_profile_fields",
+        "field_order": "PROFILE_FIELDS",
+    },
+    "job": {
+        "module": "job_scraper",
+        "extract": "extract_job_data_from_soup",
+        "ready_markers": [("div", "id", "job-details")],
+    },
+    "company": {
+        "module": "company_scraper",
+        "extract": "extract_company_data_from_soup",
+        "ready_markers": [("main", None, None)],
+    },
+    "indeed_company": {
+        "module": "indeed_company_scraper",
+        "extract": "extract_company_data_from_soup",
+        "ready_markers": [("section", "data-testid", "AboutSection-section")],
+    },
+    "indeed_job": {
+        "module": "indeed_job_scraper",
+        "extract": "extract_job_data_from_soup",
+        "ready_markers": [("div", "id", "jobDescriptionText")],
+    },
+    "job_search": {
+        "module": "job_search_scraper",
+        "extract": "extract_job_search_from_soup",
+        "ready_markers": [("main", None, None)],
+    },
+    "indeed_search": {
+        "module": "indeed_search_scraper",
+        "extract": "extract_search_results_from_soup",
+        "ready_markers": [("div", "id", "mosaic-provider-jobcards")],
+    },
+}
+
+def detect_page_type(url):
+    """Returns the page type for a URL, or None if it is not supported."""
+    if not url:
+        return None
+    if "/in/" in url:
+        return "person"
+    if "/jobs/view/" in url:
+        return "job"
+    if "/company/" in url:
+        return "company"
+    if "indeed.com/cmp/" in url:
+        return "indeed_company"
+    if "indeed." in url and "viewjob" in url:
+        return "indeed_job"
+    if "linkedin.com/jobs/search" in url or "linkedin.com/jobs/collections" in url:
+        return "job_search"
+    if "indeed." in url and ("/jobs?" in url or "/q-" in url):
+        return "indeed_search"
+    return None
+
+def resolve_extractor(page_type, html=None):
+    """
+    Imports the scraper for a page type and returns (extract function, layout
+    variant). When the page HTML is given and the type has several layout
+    variants, the variant matching the page's layout fingerprint is used;
+    otherwise the variant is None.
+    """
+    if html is not None:
+        from layout_fingerprint import LAYOUT_VARIANTS, detect_variant, load_variant_extractor
+
+        if page_type in LAYOUT_VARIANTS:
+            variant = detect_variant(html, page_type)
+            return load_variant_extractor(page_type, variant), variant
+    spec = PAGE_TYPES[page_type]
+    module = importlib.import_module(spec["module"])
+    return getattr(module, spec["extract"]), None
+
+def get_extractor(page_type, html=None):
+    """Returns the soup-level extract function for a page type (see resolve_extractor)."""
+    return resolve_extractor(page_type, html)[0]
+
+def field_versions(extract):
+    """
+    The FIELD_VERSIONS stamps declared in an extract function's scraper
+    module: a number per output field for the code behind it. Bump a field's
+    number when its selectors or cleanup change; batch records carry the
+    stamps they were produced with, and `scrape.py reextract` recomputes the
+    fields whose stamp is out of date.
+    """
+    return dict(extract.__globals__.get("FIELD_VERSIONS", {}))
+
+def extract_html(html, page_type, with_versions=False):
+    """
+    Parses page HTML (str or raw bytes) and runs the extractor for its page
+    type. With with_versions, returns (data, extractor) where extractor names
+    the layout variant used and the field versions that produced the data.
+    """
+    if metrics.enabled():
+        return _extract_html_measured(html, page_type, with_versions)
+    from bs4 import BeautifulSoup
+    from html_decode import decode_html
+
+    # Decode here rather than letting bs4 guess: one sniff, one decode.
+    soup = BeautifulSoup(decode_html(html), "lxml")
+    try:
+        extract, variant = resolve_extractor(page_type, html)
+        data = extract(soup)
+        if with_versions:
+            return data, {"variant": variant, "versions": field_versions(extract)}
+        return data
+    finally:
+        # Break the tree's parent/child cycles now rather than leaving them to
+        # the garbage collector; this matters in long-running workers.
+        soup.decompose()
+
+def _extract_fields_measured(extract, soup, page_type):
+    """
+    Runs the extractor through its field generator (see "iter_fields") when it
+    has one, timing each field; the result equals extract(soup).
+    """
+    spec = PAGE_TYPES[page_type]
+    iter_fields = extract.__globals__.get(spec.get("iter_fields", ""))
+    if iter_fields is None:
+        return extract(soup)
+    fields = {}
+    last = time.perf_counter()
+    for field, value in iter_fields(soup):
+        now = time.perf_counter()
+        metrics.observe("scraper_field_seconds", (("page_type", page_type), ("field", field)), now - last)
+        fields[field] = value
+        last = now
+    return {field: fields[field] for field in extract.__globals__[spec["field_order"]]}
+
+def _extract_html_measured(html, page_type, with_versions):
+    """extract_html with per-stage and per-field timings and result counts recorded in metrics."""
+    from bs4 import BeautifulSoup
+    from html_decode import decode_html
+
+    timer = metrics.StageTimer(page_type)
+    soup = None
+    try:
+        text = decode_html(html)
+        timer.lap("decode")
+        soup = BeautifulSoup(text, "lxml")
+        timer.lap("parse")
+        extract, variant = resolve_extractor(page_type, html)
+        data = _extract_fields_measured(extract, soup, page_type)
+        timer.lap("extract")
+    except Exception:
+        metrics.inc("scraper_requests_total", (("page_type", page_type), ("outcome", "error")))
+        raise
+    finally:
+        if soup is not None:
+            soup.decompose()
+    metrics.inc("scraper_requests_total", (("page_type", page_type), ("outcome", "ok")))
+    metrics.count_fields(page_type, data)
+    if with_versions:
+        return data, {"variant": variant, "versions": field_versions(extract)}
+    return data
@@ -1,22 +1,52 @@
 import sys
-import io
-
-# --- ADD THIS BLOCK AT THE VERY TOP ---
-# Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-# --- END OF NEW BLOCK ---
-
 import os
 import json
 import re
-import difflib
-from datetime import datetime
-from bs4 import BeautifulSoup
-
+from html_decode import read_html
+from selector_stats import SelectorChain
+from selector_registry import SelectorRegistry
 
+# bs4, difflib and datetime are imported where they are first used, so
+# importing this module stays cheap for callers that never reach them.
 
+# Field versions for `scrape.py reextract` (see page_types.field_versions).
+FIELD_VERSIONS = {
+    "name": 1,
+    "headline": 1,
+    "location": 1,
+    "profile_pic_url": 1,
+    "cover_pic_url": 1,
+    "about": 1,
+    "experience": 1,
+    "education": 1,
+    "highest_education_level": 1,
+    "skills": 1,
+    "languages": 1,
+}
 
+SELECTORS = SelectorRegistry("person", {
+    "name": "h1, .pv-text-details__left-panel h1",
+    "headline": ".text-body-medium",
+    "headline_panel": ".pv-text-details__left-panel",
+    "headline_in_panel": "div",
+    "location": ".text-body-small.inline",
+    "location_panel": ".pv-top-card--list-panel",
+    "location_in_panel": "li",
+    "profile_pic": "img[class*='pv-top-card-profile-picture__image']",
+    "cover_pic": "img.profile-background-image__image",
+    "about_inline_show_more": "div.inline-show-more-text span[aria-hidden='true']",
+    "about_display_flex": "div.display-flex.ph5.pv3 span[aria-hidden='true']",
+    "details_inline_show_more": "div[class*='inline-show-more-text'] span[aria-hidden='true']",
+    "details_sub_components": "div.pvs-entity__sub-components",
+    "experience_items": "ul > li.artdeco-list__item",
+    "experience_role": "div.display-flex.mr1 span[aria-hidden='true']",
+    "experience_company": "span.t-14.t-normal:not(.t-black--light) span[aria-hidden='true']",
+    "experience_captions": "span.t-14.t-normal.t-black--light span[aria-hidden='true']",
+    "skills": "a[data-field='skill_card_skill_topic'] span[aria-hidden='true']",
+    "language_items": "ul > li",
+    "language_name": "div.t-bold span[aria-hidden='true']",
+    "language_proficiency": "span.pvs-entity__caption-wrapper[aria-hidden='true']",
+})
 
 # --- NEW: Function to determine highest education level ---
 def get_highest_education_level(education_list):
@@ -54,6 +84,11 @@ def get_highest_education_level(education_list):
     return highest_level_slug
 # --- END OF NEW FUNCTION ---
 
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+JUNK_PHRASES = ["Skip to main content", "See more", "...see more"]
+_JUNK_PHRASE_RES = [re.compile(r'\b' + re.escape(phrase) + r'\b', re.IGNORECASE) for phrase in JUNK_PHRASES]
+
 # Utility functions (Unchanged)
 def clean(content):
     if not content:
@@ -63,24 +98,35 @@ def clean(content):
         for br in content.find_all("br"):
             br.replace_with("\n")
         # --- MODIFICATION: Added <li> and <p> to preserve formatting ---
+        # Nested <p>/<li> are replaced along with their outermost ancestor;
+        # skipping them keeps deeply nested lists linear.
+        flattened = set()
         for tag in content.find_all(["p", "li"]):
+            if id(tag) in flattened:
+                continue
+            flattened.update(id(inner) for inner in tag.find_all(["p", "li"]))
             tag.replace_with(f"\n{tag.get_text(strip=True)}")
         text = content.get_text(separator="\n", strip=True)
         # --- END OF MODIFICATION ---
     else:
         text = str(content)
-    cleaned_content = text.encode('utf-8', 'replace').decode('utf-8')
-    text = re.sub(r'[ \t]+', ' ', cleaned_content)
-    text = re.sub(r'\n{3,}', '\n\n', text.strip())
-    junk_phrases = ["Skip to main content", "See more", "...see more"]
-    for phrase in junk_phrases:
-        text = re.sub(r'\b' + re.escape(phrase) + r'\b', '', text, flags=re.IGNORECASE)
+    text = _SPACES_RE.sub(' ', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text.strip())
+    for pattern in _JUNK_PHRASE_RES:
+        text = pattern.sub('', text)
     return text.strip() if text.strip() else "Not available"
 
+# Date ranges sit near the start of an entry (after the title and company or
+# degree), so only this much of its text is searched; the patterns backtrack
+# on long whitespace runs, and entry text can be arbitrarily long.
+DATE_SCAN_CHARS = 500
+_FULL_DATE_RE = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})\s*[-–]\s*(Present|(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})', re.IGNORECASE)
+_YEAR_RANGE_RE = re.compile(r'(\d{4})\s*[-–]\s*(\d{4}|Present)', re.IGNORECASE)
+
 def parse_date_range(text):
     date_from, date_to, is_current = "Not available", "Not available", False
-    full_date_pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})\s*[-–]\s*(Present|(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})'
-    full_match = re.search(full_date_pattern, text, re.IGNORECASE)
+    text = text[:DATE_SCAN_CHARS]
+    full_match = _FULL_DATE_RE.search(text)
     if full_match:
         date_from = f"{full_match.group(1)} {full_match.group(2)}"
         if "present" in full_match.group(3).lower():
@@ -89,14 +135,14 @@ def parse_date_range(text):
         else:
             date_to = full_match.group(3).strip()
     else:
-        year_pattern = r'(\d{4})\s*[-–]\s*(\d{4}|Present)'
-        year_match = re.search(year_pattern, text, re.IGNORECASE)
+        year_match = _YEAR_RANGE_RE.search(text)
         if year_match:
             date_from = year_match.group(1)
             date_to = year_match.group(2)
             if "present" in date_to.lower():
                 is_current = True
     if not is_current and date_to != "Not available":
+        from datetime import datetime
         try:
             date_to_obj = datetime.strptime(date_to, "%b %Y")
             if date_to_obj > datetime.now():
@@ -110,25 +156,32 @@ def parse_date_range(text):
                 pass
     return date_from, date_to, is_current
 
+_YEAR_RE = re.compile(r'\d{4}')
+
 def is_valid_job_entry(text, role):
     skills_indicators = ["skills", "+2 skills", "+3 skills", "+4 skills", "+5 skills", "and more", "show all", "see more"]
     text_lower = text.lower()
     for indicator in skills_indicators:
         if indicator in text_lower and len(text) < 150:
             return False
-    has_date = re.search(r'\d{4}', text) or "present" in text_lower
+    has_date = _YEAR_RE.search(text) or "present" in text_lower
     is_substantial = len(text) > 100
     if role != "Not available" and any(indicator in role.lower() for indicator in skills_indicators):
         return False
     return has_date or is_substantial
 
 SIMILARITY_THRESHOLD = 0.90
+# SequenceMatcher is quadratic in the worst case, so fuzzy comparison only
+# looks at this many characters of each text; near-duplicates already agree
+# on their opening.
+SIMILARITY_MAX_CHARS = 2000
 def is_about_duplicate(about, experiences, educations, threshold=SIMILARITY_THRESHOLD):
     if not about or about == "Not available":
         return False
     def norm(s):
         return " ".join(str(s).lower().split())
     a = norm(about)
+    a_head = a[:SIMILARITY_MAX_CHARS]
     def check_field(field_text):
         if not field_text or field_text == "Not available":
             return False
@@ -137,10 +190,12 @@ def is_about_duplicate(about, experiences, educations, threshold=SIMILARITY_THRE
             return False
         if a == f or a in f or f in a:
             return True
-        ratio = difflib.SequenceMatcher(None, a, f).ratio()
-        if ratio >= threshold:
-            return True
-        return False
+        import difflib
+        matcher = difflib.SequenceMatcher(None, a_head, f[:SIMILARITY_MAX_CHARS])
+        # The cheap upper bounds rule out most pairs before the full ratio.
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            return False
+        return matcher.ratio() >= threshold
     for e in experiences or []:
         for key in ("details", "company_name", "role", "company_location"):
             if key in e and check_field(e.get(key)):
@@ -151,72 +206,107 @@ def is_about_duplicate(about, experiences, educations, threshold=SIMILARITY_THRE
                 return True
     return False
 
+def _select_first(soup, selector, container, descendant):
+    """
+    Same result as soup.select_one(f"{selector}, {container} {descendant}") for the
+    SELECTORS keys given: whichever match comes first in the document. The
+    descendant part is searched inside the containers instead of testing every
+    candidate's ancestors, which is quadratic on deeply nested pages.
+    """
+    direct = SELECTORS.select_one(selector, soup)
+    scoped = None
+    for box in SELECTORS.select(container, soup):
+        scoped = SELECTORS.select_one(descendant, box)
+        if scoped is not None:
+            break
+    if direct is None or scoped is None or direct is scoped:
+        return direct if scoped is None else scoped
+    for element in scoped.next_elements:
+        if element is direct:
+            return scoped
+    return direct
+
 # Extraction functions (Unchanged)
 def extract_basic_info(soup):
-    name = clean(soup.select_one("h1, .pv-text-details__left-panel h1"))
-    headline = clean(soup.select_one(".text-body-medium, .pv-text-details__left-panel div"))
-    location = clean(soup.select_one(".text-body-small.inline, .pv-top-card--list-panel li"))
-    profile_pic_element = soup.select_one("img[class*='pv-top-card-profile-picture__image']")
+    name = clean(SELECTORS.select_one("name", soup))
+    headline = clean(_select_first(soup, "headline", "headline_panel", "headline_in_panel"))
+    location = clean(_select_first(soup, "location", "location_panel", "location_in_panel"))
+    profile_pic_element = SELECTORS.select_one("profile_pic", soup)
     profile_pic_url = profile_pic_element['src'] if profile_pic_element else "Not available"
-    cover_pic_element = soup.select_one("img.profile-background-image__image")
+    cover_pic_element = SELECTORS.select_one("cover_pic", soup)
     cover_pic_url = cover_pic_element['src'] if cover_pic_element else "Not available"
     return name, headline, location, profile_pic_url, cover_pic_url
 
+def _anchored_section(soup, anchor_id):
+    """The <section> holding a profile card's <div id=...> anchor, or None."""
+    anchor = soup.find("div", id=anchor_id)
+    return anchor.find_parent("section") if anchor else None
+
+def _about_section(soup):
+    return _anchored_section(soup, "about")
+
 def extract_about(soup):
-    about_anchor = soup.find("div", id="about")
-    if not about_anchor:
-        return "Not available"
-    about_section = about_anchor.find_parent("section")
+    about_section = _about_section(soup)
     if not about_section:
         return "Not available"
-    text_container = about_section.select_one("div.inline-show-more-text span[aria-hidden='true']")
-    if text_container:
-        text = text_container.get_text(separator=" ", strip=True)
-        if len(text) > 20:
-            return clean(text_container)
-    alt_container = about_section.select_one("div.display-flex.ph5.pv3 span[aria-hidden='true']")
-    if alt_container:
-        text = alt_container.get_text(separator=" ", strip=True)
-        if len(text) > 20:
-            return clean(alt_container)
-    return "Not available"
+    return ABOUT_CHAIN.resolve(about_section) or "Not available"
+
+def _about_text(selector):
+    """Builds an About resolver: the SELECTORS entry must match a container with real text."""
+    def resolve(about_section):
+        text_container = SELECTORS.select_one(selector, about_section)
+        if text_container:
+            text = text_container.get_text(separator=" ", strip=True)
+            if len(text) > 20:
+                return clean(text_container)
+        return None
+    return resolve
+
+def _details_inline_show_more(item):
+    details_element = SELECTORS.select_one("details_inline_show_more", item)
+    return clean(details_element) if details_element else None
+
+def _details_longest_sub_component(item):
+    sub_components = SELECTORS.select_one("details_sub_components", item)
+    if not sub_components:
+        return None
+    potential_details = sub_components.find_all("span", {"aria-hidden": "true"})
+    longest_text = ""
+    for span in potential_details:
+        text = clean(span)
+        if len(text) > len(longest_text) and "skills" not in text.lower():
+            longest_text = text
+    return longest_text or None
+
+# Fallback chains; batch and worker modes reorder them by observed hit rate.
+ABOUT_CHAIN = SelectorChain("person.about", [
+    ("div.inline-show-more-text", _about_text("about_inline_show_more")),
+    ("div.display-flex.ph5.pv3", _about_text("about_display_flex")),
+])
+EXPERIENCE_DETAILS_CHAIN = SelectorChain("person.experience.details", [
+    ("inline-show-more-text", _details_inline_show_more),
+    ("pvs-entity__sub-components", _details_longest_sub_component),
+])
 
 def extract_experience(soup):
     experiences = []
     seen = set()
-    experience_anchor = soup.find("div", id="experience")
-    if not experience_anchor:
-        return []
-    experience_section = experience_anchor.find_parent("section")
+    experience_section = _anchored_section(soup, "experience")
     if not experience_section:
         return []
-    job_items = experience_section.select("ul > li.artdeco-list__item")
+    job_items = SELECTORS.select("experience_items", experience_section)
     for item in job_items:
-        role_element = item.select_one("div.display-flex.mr1 span[aria-hidden='true']")
+        role_element = SELECTORS.select_one("experience_role", item)
         role = clean(role_element) if role_element else "Not available"
-        company_element = item.select_one("span.t-14.t-normal:not(.t-black--light) span[aria-hidden='true']")
+        company_element = SELECTORS.select_one("experience_company", item)
         company_parts = clean(company_element).split('·')
         company_name = company_parts[0].strip() if company_parts else "Not available"
         job_type = company_parts[1].strip() if len(company_parts) > 1 else "Not available"
-        sub_captions = item.select("span.t-14.t-normal.t-black--light span[aria-hidden='true']")
+        sub_captions = SELECTORS.select("experience_captions", item)
         date_text = clean(sub_captions[0]) if sub_captions else ""
         location = clean(sub_captions[1]) if len(sub_captions) > 1 else "Not available"
         date_from, date_to, is_current = parse_date_range(date_text)
-        details = "Not available"
-        details_element = item.select_one("div[class*='inline-show-more-text'] span[aria-hidden='true']")
-        if details_element:
-            details = clean(details_element)
-        else:
-            sub_components = item.select_one("div.pvs-entity__sub-components")
-            if sub_components:
-                potential_details = sub_components.find_all("span", {"aria-hidden": "true"})
-                longest_text = ""
-                for span in potential_details:
-                    text = clean(span)
-                    if len(text) > len(longest_text) and "skills" not in text.lower():
-                        longest_text = text
-                if longest_text:
-                    details = longest_text
+        details = EXPERIENCE_DETAILS_CHAIN.resolve(item) or "Not available"
         identifier = (role, company_name, date_from)
         if role == "Not available" or company_name == "Not available" or identifier in seen:
             continue
@@ -224,10 +314,43 @@ def extract_experience(soup):
         experiences.append({ "company_name": company_name, "company_location": location, "job_type": job_type, "role": role, "date_from": date_from, "date_to": date_to, "details": details, "is_current": is_current })
     return experiences
 
+_EDUCATION_RE = re.compile("education", re.I)
+EDUCATION_HEADING_MAX_CHARS = 50
+
+def _find_education_heading(soup):
+    """
+    Finds the first h2/h3/div whose text mentions "education" and is shorter than
+    EDUCATION_HEADING_MAX_CHARS. Works upwards from the matching strings, growing
+    the text length one ancestor at a time, so every element's text is measured
+    once instead of once per enclosing element (quadratic on nested divs).
+    """
+    visited = set()
+    for string in soup.find_all(string=_EDUCATION_RE):
+        parent = string.parent
+        if parent is None or type(string) not in parent.interesting_string_types:
+            continue
+        node, length, heading = string, len(string.strip()), None
+        while parent is not None and parent is not soup and id(parent) not in visited:
+            visited.add(id(parent))
+            types = parent.interesting_string_types
+            length += sum(len(child.get_text(strip=True, types=types)) for child in parent.children if child is not node)
+            if length >= EDUCATION_HEADING_MAX_CHARS:
+                break
+            if parent.name in ("h2", "h3", "div"):
+                heading = parent
+            node, parent = parent, parent.parent
+        # Everything above a visited element was already ruled out by an earlier string.
+        if heading is not None:
+            return heading
+    return None
+
+def _education_section(soup):
+    edu_heading = _find_education_heading(soup)
+    return edu_heading.find_parent(["section", "div"]) if edu_heading else soup.find("section", id="education")
+
 def extract_education(soup):
     educations, seen = [], set()
-    edu_heading = soup.find(lambda tag: tag.name in ["h2", "h3", "div"] and "education" in tag.get_text(strip=True).lower() and len(tag.get_text(strip=True)) < 50)
-    edu_section = edu_heading.find_parent(["section", "div"]) if edu_heading else soup.find("section", id="education")
+    edu_section = _education_section(soup)
     if not edu_section: return []
     main_ul = edu_section.find("ul")
     if not main_ul: return []
@@ -244,7 +367,7 @@ def extract_education(soup):
             if any(keyword in degree_text for keyword in ['Bachelor', 'Master', 'Diploma', 'degree', 'Intermediate']):
                 degree = degree_text
         date_from, date_to, is_current = parse_date_range(full_text)
-        details_divs = edu.select("div[class*='inline-show-more-text'] span[aria-hidden='true']")
+        details_divs = SELECTORS.select("details_inline_show_more", edu)
         details_list = [clean(div.get_text(separator=' ', strip=True)) for div in details_divs]
         details = ' '.join(details_list) if details_list else "Not available"
         identifier = (institution, degree, date_from)
@@ -260,15 +383,11 @@ def extract_skills(soup):
     """
     skills = []
     try:
-        skills_anchor = soup.find("div", id="skills")
-        if not skills_anchor:
-            return []
-        
-        skills_section = skills_anchor.find_parent("section")
+        skills_section = _anchored_section(soup, "skills")
         if not skills_section:
             return []
             
-        skill_elements = skills_section.select("a[data-field='skill_card_skill_topic'] span[aria-hidden='true']")
+        skill_elements = SELECTORS.select("skills", skills_section)
         for el in skill_elements:
             skill_name = clean(el)
             if skill_name != "Not available":
@@ -285,18 +404,14 @@ def extract_languages(soup):
     """
     languages = []
     try:
-        languages_anchor = soup.find("div", id="languages")
-        if not languages_anchor:
-            return []
-
-        languages_section = languages_anchor.find_parent("section")
+        languages_section = _anchored_section(soup, "languages")
         if not languages_section:
             return []
 
-        lang_items = languages_section.select("ul > li")
+        lang_items = SELECTORS.select("language_items", languages_section)
         for item in lang_items:
-            name_el = item.select_one("div.t-bold span[aria-hidden='true']")
-            prof_el = item.select_one("span.pvs-entity__caption-wrapper[aria-hidden='true']")
+            name_el = SELECTORS.select_one("language_name", item)
+            prof_el = SELECTORS.select_one("language_proficiency", item)
             
             name = clean(name_el)
             proficiency = clean(prof_el)
@@ -314,48 +429,94 @@ def extract_profile(input_html_path):
     if not os.path.exists(input_html_path):
         print(f"Error: The file path does not exist on the server.", file=sys.stderr)
         return {"error": f"File not found at {input_html_path}"}
-    with open(input_html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = read_html(input_html_path)
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "lxml")
-    
-    name, headline, location, profile_pic_url, cover_pic_url = extract_basic_info(soup)
-    about = extract_about(soup)
-    experience = extract_experience(soup)
-    education = extract_education(soup)
-    
-    # --- MODIFICATION: Call new functions ---
-    skills = extract_skills(soup)
-    languages = extract_languages(soup)
-    
-    if is_about_duplicate(about, experience, education, threshold=SIMILARITY_THRESHOLD):
-        about = "Not available"
-
-    highest_education = get_highest_education_level(education)
-
-    data = {
-        "type": "person", 
-        "name": name,
-        "headline": headline,
-        "location": location,
-        "profile_pic_url": profile_pic_url,
-        "cover_pic_url": cover_pic_url,
-        "about": about,
-        "experience": experience,
-        "education": education,
-        "highest_education_level": highest_education,
-        # --- MODIFICATION: Add new data to the final JSON ---
-        "skills": skills,
-        "languages": languages
-    }
-    
+
+    # Route the page to the extractor for its layout up front instead of
+    # trying each layout's selectors in turn.
+    from layout_fingerprint import detect_variant, load_variant_extractor
+    variant = detect_variant(html, "person")
+    print(f"Detected profile layout: {variant}", file=sys.stderr)
+    if variant == "classic":
+        data = extract_profile_from_soup(soup)
+    else:
+        data = load_variant_extractor("person", variant)(soup)
     print("Python script finished. Returning JSON data.", file=sys.stderr)
     return data
 
+# Profile sections that section_delta can carry over from an earlier scrape of
+# the same profile when their content is unchanged: name -> (find the section
+# element, extract its value from the page).
+SECTIONS = {
+    "about": (_about_section, extract_about),
+    "experience": (lambda soup: _anchored_section(soup, "experience"), extract_experience),
+    "education": (_education_section, extract_education),
+    "skills": (lambda soup: _anchored_section(soup, "skills"), extract_skills),
+    "languages": (lambda soup: _anchored_section(soup, "languages"), extract_languages),
+}
+# Values computed from several sections, reusable while all of them are unchanged.
+DERIVED_SECTIONS = {
+    "about_duplicate": ("about", "experience", "education"),
+}
+
+# Output keys in document order.
+PROFILE_FIELDS = [
+    "type", "name", "headline", "location", "profile_pic_url", "cover_pic_url", "about",
+    "experience", "education", "highest_education_level", "skills", "languages",
+]
+
+def iter_profile_fields(soup, reuse=None, values=None):
+    """
+    Yields (field, value) pairs of the profile cheapest first: the top card
+    right away, then each section as it is extracted, and About last because
+    the duplicate check needs experience and education. `reuse` maps section
+    names (SECTIONS and DERIVED_SECTIONS) to values already known for this
+    page, which are used instead of extracting them again; the values this
+    call used are stored in `values` when a dict is given.
+    """
+    reuse = reuse or {}
+    values = {} if values is None else values
+    yield "type", "person"
+    name, headline, location, profile_pic_url, cover_pic_url = extract_basic_info(soup)
+    yield "name", name
+    yield "headline", headline
+    yield "location", location
+    yield "profile_pic_url", profile_pic_url
+    yield "cover_pic_url", cover_pic_url
+
+    for section, (_, extract) in SECTIONS.items():
+        values[section] = reuse[section] if section in reuse else extract(soup)
+        if section == "education":
+            yield "education", values["education"]
+            yield "highest_education_level", get_highest_education_level(values["education"])
+        elif section != "about":
+            yield section, values[section]
+
+    about = values["about"]
+    if "about_duplicate" in reuse:
+        values["about_duplicate"] = reuse["about_duplicate"]
+    else:
+        values["about_duplicate"] = is_about_duplicate(about, values["experience"], values["education"], threshold=SIMILARITY_THRESHOLD)
+    yield "about", "Not available" if values["about_duplicate"] else about
+
+def extract_profile_from_soup(soup, reuse=None, values=None):
+    """Runs every profile extractor over an already parsed page (see iter_profile_fields)."""
+    fields = dict(iter_profile_fields(soup, reuse, values))
+    return {field: fields[field] for field in PROFILE_FIELDS}
+
 # Script Entry Point (Unchanged)
 if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) > 1:
         html_file_path = sys.argv[1]
-        profile_data = extract_profile(html_file_path)
+        from capture import capturing
+        with capturing(html_file_path, "person"):
+            profile_data = extract_profile(html_file_path)
         print(json.dumps(profile_data, indent=2, ensure_ascii=False))
     else:
         error_data = {"error": "No file path provided to the Python script."}
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import platform
+
+from corpus import iter_corpus
+from page_types import detect_page_type
+from worker_pool import WorkerPool, ThreadWorkerPool, current_rss, gil_enabled
+
+# Compares the two concurrent extraction models on the same saved pages, per
+# page type: a WorkerPool of processes and a ThreadWorkerPool in this
+# process. Threads only run in parallel where the GIL is released (inside
+# lxml's C parsing, or on a free-threaded build), while every worker process
+# pays for its own interpreter and extractor imports. Throughput per worker
+# and resident memory per worker show which model is cheaper on a host.
+#
+# Memory: the process model counts the RSS of every worker plus this
+# process's RSS before any extractor was loaded (a dispatcher that only hands
+# out jobs); the thread model counts this process's RSS after the run.
+
+MODES = ("process", "thread")
+DEFAULT_JOBS = 200
+
+def _jobs_by_type(corpus_path):
+    by_type = {}
+    for page in iter_corpus(corpus_path):
+        page_type = detect_page_type(page["url"])
+        if page_type:
+            by_type.setdefault(page_type, []).append({"url": page["url"], "path": page["path"], "page_type": page_type})
+    return by_type
+
+def _make_pool(mode, workers, jobs):
+    if mode == "thread":
+        return ThreadWorkerPool(workers)
+    # No recycling during a measurement.
+    return WorkerPool(workers, max_jobs=jobs + 2 * workers + 1, max_rss_mb=0)
+
+def _run_mode(mode, pages, jobs, workers, dispatcher_rss):
+    batch = [pages[i % len(pages)] for i in range(jobs)]
+    with _make_pool(mode, workers, jobs) as pool:
+        # Warm-up: worker start-up and extractor imports are not part of throughput.
+        for future in [pool.submit(job) for job in batch[:2 * workers]]:
+            future.result()
+        started = time.perf_counter()
+        results = [future.result() for future in [pool.submit(job) for job in batch]]
+        elapsed = time.perf_counter() - started
+        if mode == "thread":
+            rss = current_rss()
+        else:
+            latest = {}
+            for _, _, memory in results:
+                if memory:
+                    latest[memory["pid"]] = memory["rss_mb_after"] * 2**20
+            rss = dispatcher_rss + sum(latest.values())
+    errors = sum(1 for _, error, _ in results if error)
+    throughput = jobs / elapsed if elapsed else 0.0
+    return {
+        "pages_per_second": round(throughput, 2),
+        "pages_per_second_per_worker": round(throughput / workers, 2),
+        "rss_mb": round(rss / 2**20, 1),
+        "rss_mb_per_worker": round(rss / 2**20 / workers, 1),
+        "errors": errors,
+    }
+
+def run_pool_benchmark(corpus_path, workers=None, jobs=DEFAULT_JOBS, page_types=None, modes=MODES):
+    """
+    Runs `jobs` extractions per page type through each pool model with the
+    same number of workers and returns the per-type comparison.
+    """
+    dispatcher_rss = current_rss()
+    workers = workers or os.cpu_count() or 1
+    by_type = _jobs_by_type(corpus_path)
+    report = {
+        "python": platform.python_version(),
+        "gil_enabled": gil_enabled(),
+        "workers": workers,
+        "jobs_per_type": jobs,
+        "page_types": {},
+    }
+    for page_type in sorted(by_type):
+        if page_types and page_type not in page_types:
+            continue
+        results = {mode: _run_mode(mode, by_type[page_type], jobs, workers, dispatcher_rss) for mode in modes}
+        if "process" in results and "thread" in results:
+            process, thread = results["process"], results["thread"]
+            # Pages per second per MB of RSS: which model gets more done with the memory it holds.
+            efficiency = {
+                mode: r["pages_per_second"] / r["rss_mb"] if r["rss_mb"] else 0.0 for mode, r in results.items()
+            }
+            results["cheaper"] = max(efficiency, key=efficiency.get)
+            results["thread_vs_process_throughput"] = (
+                round(thread["pages_per_second"] / process["pages_per_second"], 2) if process["pages_per_second"] else None
+            )
+        report["page_types"][page_type] = results
+        print(f"{page_type}: {results}", file=sys.stderr)
+    return report
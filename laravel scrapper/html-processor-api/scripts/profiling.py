@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+from corpus import iter_corpus
+from page_types import detect_page_type, extract_html
+
+# Profiles extraction of saved pages and reports in two shapes: collapsed
+# stacks ("frame;frame;frame value" per line, the input format of
+# flamegraph.pl, speedscope and inferno) and a top-N table of the functions
+# that matter here - our own scraper functions and the soupsieve/bs4 select
+# entry points they spend their time in.
+#
+# "deterministic" mode traces every Python and C call with sys.setprofile, so
+# values are exact microseconds (with tracing overhead). "sampling" mode
+# samples the extracting thread's stack every interval, so overhead stays low
+# and values are sample counts.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Library functions worth listing next to our own, matched on the label prefix.
+FOCUS_PREFIXES = ("soupsieve.select", "soupsieve.compile", "soupsieve.css_match.CSSMatch.select", "bs4.element.Tag.select")
+
+def _code_label(code, module_name):
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{module_name or os.path.basename(code.co_filename)}.{name}"
+
+def _frame_label(frame):
+    return _code_label(frame.f_code, frame.f_globals.get("__name__"))
+
+def _c_label(func):
+    module = getattr(func, "__module__", None) or type(getattr(func, "__self__", None)).__name__
+    return f"{module}.{getattr(func, '__qualname__', repr(func))}"
+
+class _StackTracer:
+    """sys.setprofile hook that attributes exact self time to full call stacks."""
+    def __init__(self):
+        self.stack = []
+        self.active = Counter()
+        self.collapsed = Counter()
+        self.self_time = Counter()
+        self.total_time = Counter()
+        self.calls = Counter()
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == "call":
+            self._push(_frame_label(frame), now)
+        elif event == "c_call":
+            self._push(_c_label(arg), now)
+        elif event in ("return", "c_return", "c_exception") and self.stack:
+            label, started, child_time = self.stack.pop()
+            elapsed = now - started
+            own = elapsed - child_time
+            path = ";".join(entry[0] for entry in self.stack) + (";" if self.stack else "") + label
+            self.collapsed[path] += own
+            self.self_time[label] += own
+            self.active[label] -= 1
+            # Recursive calls only count once towards inclusive time.
+            if not self.active[label]:
+                self.total_time[label] += elapsed
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+    def _push(self, label, now):
+        self.stack.append([label, now, 0.0])
+        self.active[label] += 1
+        self.calls[label] += 1
+
+class _Sampler(threading.Thread):
+    """Samples another thread's Python stack at a fixed interval."""
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.collapsed = Counter()
+        self.self_time = Counter()
+        self.total_time = Counter()
+        self.calls = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if not labels:
+                continue
+            labels.reverse()
+            self.samples += 1
+            self.collapsed[";".join(labels)] += 1
+            self.self_time[labels[-1]] += 1
+            for label in set(labels):
+                self.total_time[label] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+def _load_pages(path, page_type=None, url=None):
+    pages = []
+    for page in iter_corpus(path):
+        kind = page_type or detect_page_type(url or page["url"])
+        if not kind:
+            print(f"Skipping {page['path']}: page type not supported.", file=sys.stderr)
+            continue
+        with open(page["path"], "rb") as f:
+            pages.append((kind, f.read()))
+    return pages
+
+def profile_extraction(path, page_type=None, url=None, repeat=10, mode="deterministic", interval=0.001):
+    """
+    Runs every page under `path` through its extractor `repeat` times under the
+    chosen profiler. Returns a result dict with collapsed stacks and per-function totals.
+    """
+    pages = _load_pages(path, page_type, url)
+    if not pages:
+        raise ValueError("No supported pages to profile.")
+    # Import the extractors before profiling so import time is not attributed.
+    for kind, html in pages:
+        extract_html(html, kind)
+
+    started = time.perf_counter()
+    if mode == "sampling":
+        previous_switch = sys.getswitchinterval()
+        # The sampler needs the GIL to look; hand it over at least as often as we sample.
+        sys.setswitchinterval(min(previous_switch, interval / 2))
+        profiler = _Sampler(threading.get_ident(), interval)
+        profiler.start()
+        try:
+            for _ in range(repeat):
+                for kind, html in pages:
+                    extract_html(html, kind)
+        finally:
+            profiler.stop()
+            sys.setswitchinterval(previous_switch)
+        unit, scale = "samples", 1
+    else:
+        profiler = _StackTracer()
+        sys.setprofile(profiler)
+        try:
+            for _ in range(repeat):
+                for kind, html in pages:
+                    extract_html(html, kind)
+        finally:
+            sys.setprofile(None)
+        unit, scale = "us", 1_000_000
+
+    return {
+        "mode": mode,
+        "unit": unit,
+        "pages": len(pages),
+        "repeat": repeat,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "collapsed": {stack: value * scale for stack, value in profiler.collapsed.items()},
+        "self": {label: value * scale for label, value in profiler.self_time.items()},
+        "total": {label: value * scale for label, value in profiler.total_time.items()},
+        "calls": dict(profiler.calls),
+    }
+
+def write_collapsed(result, out):
+    """Writes collapsed stacks, one "stack value" line each, heaviest first."""
+    for stack, value in sorted(result["collapsed"].items(), key=lambda item: -item[1]):
+        rounded = int(round(value))
+        if rounded > 0:
+            out.write(f"{stack} {rounded}\n")
+
+def _our_modules():
+    names = set()
+    for _, _, filenames in os.walk(SCRIPTS_DIR):
+        for name in filenames:
+            if name.endswith(".py"):
+                names.add(name[:-3])
+    return names
+
+def format_top_table(result, top=25, ours_only=True):
+    """Formats the top-N functions by self time as a text table."""
+    modules = _our_modules()
+
+    def ours(label):
+        return label.split(".", 1)[0] in modules or label.startswith(FOCUS_PREFIXES)
+
+    rows = [label for label in result["self"] if not ours_only or ours(label)]
+    rows.sort(key=lambda label: -result["self"][label])
+    unit = result["unit"]
+    header = f"{'self ' + unit:>14} {'total ' + unit:>14} {'calls':>9}  function"
+    lines = [
+        f"{result['mode']} profile: {result['pages']} page(s) x {result['repeat']} run(s), {result['wall_seconds']}s wall",
+        header,
+        "-" * len(header),
+    ]
+    for label in rows[:top]:
+        calls = result["calls"].get(label, "")
+        lines.append(f"{result['self'][label]:>14.0f} {result['total'].get(label, 0):>14.0f} {calls:>9}  {label}")
+    return "\n".join(lines)
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+from collections import Counter, OrderedDict
+
+from page_types import PAGE_TYPES, extract_html, field_versions, get_extractor
+from segments import content_hash, refresh_manifest
+
+# Brings stored batch results up to date after an extractor change. Every
+# record carries the field versions of the extractor that produced it
+# ("extractor": {"variant", "versions"}). Comparing those with the
+# FIELD_VERSIONS now declared in the scrapers shows which records are stale
+# without parsing anything, so only pages of the affected types with an
+# outdated field are parsed again (from the HTML store, or the original
+# capture if it is still there). Only the stale fields are patched into the
+# record; every other field keeps its stored value.
+#
+# The scrapers compute all fields in one pass over the parsed page, so an
+# affected page is extracted in full and the stale fields are taken from the
+# result. The saving is in the pages that are never parsed.
+
+# Pages whose re-extraction result is kept, so the fanned-out copies of one
+# capture (adjacent in batch output) are parsed once.
+RESULT_CACHE_SIZE = 256
+
+def current_versions(page_type, variant=None):
+    """FIELD_VERSIONS of the extractor that would handle a page of this type and layout."""
+    if variant:
+        from layout_fingerprint import load_variant_extractor
+        return field_versions(load_variant_extractor(page_type, variant))
+    return field_versions(get_extractor(page_type))
+
+def stale_fields(record, versions):
+    """Fields whose stored version differs from `versions` (all of them for unstamped records)."""
+    stored = (record.get("extractor") or {}).get("versions") or {}
+    return sorted(field for field, version in versions.items() if stored.get(field) != version)
+
+def _load_html(record, store):
+    if store is not None and record.get("html_sha256"):
+        html = store.get(record["html_sha256"])
+        if html is not None:
+            return html
+    for path in (record.get("representative"), record.get("source")):
+        if path and os.path.isfile(path):
+            with open(path, "rb") as f:
+                return f.read()
+    return None
+
+def patch_record(record, stale, data, extractor):
+    """Copies the stale fields of a fresh extraction into a stored record."""
+    stored_extractor = record.get("extractor") or {}
+    stored_data = record.get("data")
+    if (not isinstance(stored_data, dict) or not isinstance(data, dict)
+            or stored_extractor.get("variant") != extractor["variant"] or "error" in stored_data):
+        # Card lists, failed extractions and pages now routed to another layout
+        # have no stored fields worth keeping.
+        record["data"] = data
+        record["extractor"] = extractor
+        return list(extractor["versions"])
+    versions = dict(stored_extractor.get("versions") or {})
+    for field in stale:
+        if field in data:
+            stored_data[field] = data[field]
+        versions[field] = extractor["versions"][field]
+    record["extractor"] = {"variant": extractor["variant"], "versions": versions}
+    return stale
+
+def reextract_file(path, store=None, page_types=None, dry_run=False):
+    """
+    Re-extracts the stale fields of the records in one NDJSON results file and
+    rewrites it in place (batch segments get a refreshed manifest).
+    Returns the run statistics.
+    """
+    started = time.perf_counter()
+    stats = {"records": 0, "other_types": 0, "current": 0, "stale": 0, "patched": 0,
+             "pages_parsed": 0, "missing_html": 0, "errors": 0, "fields": Counter()}
+    versions_cache = {}
+    results = OrderedDict()
+    temp = path + ".reextract.tmp"
+    with open(path, "r", encoding="utf-8") as src, open(temp, "w", encoding="utf-8") as out:
+        for line in src:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            stats["records"] += 1
+            page_type = record.get("page_type")
+            if page_type not in PAGE_TYPES or (page_types and page_type not in page_types) or "data" not in record:
+                stats["other_types"] += 1
+                out.write(line)
+                continue
+            variant = (record.get("extractor") or {}).get("variant")
+            key = (page_type, variant)
+            if key not in versions_cache:
+                versions_cache[key] = current_versions(page_type, variant)
+            stale = stale_fields(record, versions_cache[key])
+            if not stale:
+                stats["current"] += 1
+                out.write(line)
+                continue
+            stats["stale"] += 1
+            if dry_run:
+                stats["fields"].update(stale)
+                out.write(line)
+                continue
+
+            html = _load_html(record, store)
+            if html is None:
+                stats["missing_html"] += 1
+                out.write(line)
+                continue
+            cache_key = record.get("html_sha256") or record.get("representative") or record.get("source")
+            if cache_key in results:
+                data, extractor = results[cache_key]
+            else:
+                try:
+                    data, extractor = extract_html(html, page_type, with_versions=True)
+                except Exception as exc:
+                    print(f"Re-extraction failed for {record.get('url')}: {exc}", file=sys.stderr)
+                    stats["errors"] += 1
+                    out.write(line)
+                    continue
+                stats["pages_parsed"] += 1
+                results[cache_key] = (data, extractor)
+                if len(results) > RESULT_CACHE_SIZE:
+                    results.popitem(last=False)
+            # Fan-out copies share one result; patch a private copy of it.
+            patched = patch_record(record, stale, json.loads(json.dumps(data)), extractor)
+            record["content_hash"] = content_hash(record["data"])
+            stats["patched"] += 1
+            stats["fields"].update(patched)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if dry_run or not stats["patched"]:
+        os.remove(temp)
+    else:
+        os.replace(temp, path)
+        refresh_manifest(path)
+    stats["fields"] = dict(stats["fields"])
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return stats
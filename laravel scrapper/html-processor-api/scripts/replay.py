@@ -0,0 +1,183 @@
+import io
+import os
+import sys
+import json
+import tarfile
+import tempfile
+import subprocess
+
+# Replays a corpus of saved pages (usually one written by capture.py) through
+# two versions of the extractors and reports, per page, the change in
+# extraction time and the output fields that differ, so slowdowns and
+# changed results show up on real pages before a release. A version is a
+# scripts directory or a git revision, which is exported to a temporary
+# directory. Every version runs in an interpreter of its own so the modules
+# of the two never mix; both get the same page list, in corpus order.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPEAT = 5
+# A page counts as slower (or faster) only past both margins, so timer noise
+# on small pages is not reported.
+SLOWDOWN_RATIO = 1.25
+SLOWDOWN_MIN_MS = 2.0
+
+def export_revision(revision, dest):
+    """Extracts the scripts directory as of a git revision into dest."""
+    toplevel, prefix = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel", "--show-prefix"], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", f"{revision}:{prefix}"], cwd=toplevel, capture_output=True,
+    )
+    if archive.returncode != 0:
+        raise ValueError(f"Cannot export revision {revision!r}: {archive.stderr.decode(errors='replace').strip()}")
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(dest, filter="data")
+    return dest
+
+def resolve_version(version, workdir):
+    """A scripts directory for `version`: the directory itself, or an export of the git revision."""
+    if os.path.isdir(version):
+        return os.path.abspath(version)
+    return export_revision(version, tempfile.mkdtemp(prefix="replay-", dir=workdir))
+
+def _time_page(extract_html, html, page_type, repeat):
+    import time
+
+    best, data = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = extract_html(html, page_type)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, data
+
+def _run_pages(scripts_dir, repeat):
+    """Child side: reads the page list on stdin, writes one result line per page."""
+    sys.path.insert(0, scripts_dir)
+    from page_types import extract_html
+
+    pages = json.load(sys.stdin)
+    warmed = set()
+    for page in pages:
+        with open(page["path"], "rb") as f:
+            html = f.read()
+        result = {"path": page["path"]}
+        try:
+            if page["page_type"] not in warmed:
+                # Imports and selector compilation are not part of a page's time.
+                extract_html(html, page["page_type"])
+                warmed.add(page["page_type"])
+            seconds, data = _time_page(extract_html, html, page["page_type"], repeat)
+            result.update(ms=round(seconds * 1000, 3), output=data)
+        except Exception as exc:
+            result.update(ms=None, error=f"{exc.__class__.__name__}: {exc}")
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+def run_version(scripts_dir, pages, repeat=DEFAULT_REPEAT):
+    """Extracts `pages` with the extractors in scripts_dir; returns results keyed by path."""
+    child = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run", scripts_dir, str(repeat)],
+        input=json.dumps(pages), capture_output=True, text=True, encoding="utf-8", cwd=scripts_dir,
+    )
+    if child.returncode != 0:
+        raise RuntimeError(f"Replay with {scripts_dir} failed: {child.stderr.strip()[-2000:]}")
+    results = {}
+    for line in child.stdout.splitlines():
+        if line.strip():
+            result = json.loads(line)
+            results[result["path"]] = result
+    return results
+
+def changed_fields(baseline, candidate):
+    """Output keys whose values differ; ["error"] or ["records"] for errors and list outputs."""
+    if ("error" in baseline) != ("error" in candidate) or baseline.get("error") != candidate.get("error"):
+        return ["error"]
+    a, b = baseline.get("output"), candidate.get("output")
+    if isinstance(a, dict) and isinstance(b, dict):
+        return sorted(key for key in set(a) | set(b) if a.get(key) != b.get(key))
+    return [] if a == b else ["records"]
+
+def _list_pages(corpus_path, page_types=None):
+    from corpus import iter_corpus
+    from page_types import detect_page_type
+
+    pages = []
+    for page in iter_corpus(corpus_path):
+        page_type = page.get("page_type") or detect_page_type(page["url"])
+        if page_type and (not page_types or page_type in page_types):
+            # Absolute, since every version runs from its own directory.
+            pages.append({"path": os.path.abspath(page["path"]), "url": page["url"], "page_type": page_type})
+    return pages
+
+def _captured_ms(path):
+    try:
+        with open(os.path.splitext(path)[0] + ".json", "r", encoding="utf-8") as f:
+            return json.load(f).get("extract_ms")
+    except (OSError, ValueError):
+        return None
+
+def replay(corpus_path, baseline="HEAD", candidate=None, repeat=DEFAULT_REPEAT, page_types=None):
+    """
+    Runs every page of the corpus through both versions and returns the report.
+    Pages whose output changed or whose time moved past the SLOWDOWN margins
+    are listed individually; the rest only count towards the totals.
+    """
+    pages = _list_pages(corpus_path, page_types)
+    with tempfile.TemporaryDirectory(prefix="replay-") as workdir:
+        versions = {
+            "baseline": resolve_version(baseline, workdir),
+            "candidate": resolve_version(candidate or SCRIPTS_DIR, workdir),
+        }
+        results = {label: run_version(path, pages, repeat) for label, path in versions.items()}
+
+    report = {
+        "baseline": baseline,
+        "candidate": candidate or "working tree",
+        "pages": len(pages),
+        "changed_pages": 0,
+        "slower_pages": 0,
+        "faster_pages": 0,
+        "by_page_type": {},
+        "flagged": [],
+    }
+    for page in pages:
+        before, after = results["baseline"][page["path"]], results["candidate"][page["path"]]
+        fields = changed_fields(before, after)
+        entry = report["by_page_type"].setdefault(page["page_type"], {"pages": 0, "changed": 0, "baseline_ms": 0.0, "candidate_ms": 0.0})
+        entry["pages"] += 1
+        entry["changed"] += bool(fields)
+        slower = faster = False
+        if before["ms"] is not None and after["ms"] is not None:
+            entry["baseline_ms"] += before["ms"]
+            entry["candidate_ms"] += after["ms"]
+            delta = after["ms"] - before["ms"]
+            slower = delta >= SLOWDOWN_MIN_MS and after["ms"] >= before["ms"] * SLOWDOWN_RATIO
+            faster = -delta >= SLOWDOWN_MIN_MS and before["ms"] >= after["ms"] * SLOWDOWN_RATIO
+        report["changed_pages"] += bool(fields)
+        report["slower_pages"] += slower
+        report["faster_pages"] += faster
+        if fields or slower:
+            report["flagged"].append({
+                "path": page["path"],
+                "url": page["url"],
+                "page_type": page["page_type"],
+                "baseline_ms": before["ms"],
+                "candidate_ms": after["ms"],
+                "captured_ms": _captured_ms(page["path"]),
+                "changed_fields": fields,
+                "slower": slower,
+            })
+    for entry in report["by_page_type"].values():
+        entry["delta_pct"] = (
+            round((entry["candidate_ms"] / entry["baseline_ms"] - 1) * 100, 1) if entry["baseline_ms"] else None
+        )
+        entry["baseline_ms"] = round(entry["baseline_ms"], 2)
+        entry["candidate_ms"] = round(entry["candidate_ms"], 2)
+    return report
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--run"]:
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    _run_pages(sys.argv[2], int(sys.argv[3]))
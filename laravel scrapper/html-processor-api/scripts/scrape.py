@@ -0,0 +1,555 @@
+import sys
+import io
+import json
+import argparse
+
+from page_types import PAGE_TYPES, detect_page_type
+
+# Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+def _resolve_page_type(args):
+    page_type = args.type or detect_page_type(args.url)
+    if not page_type:
+        print(json.dumps({"error": "This page type is not supported."}, indent=2))
+        sys.exit(1)
+    return page_type
+
+def cmd_stream(args):
+    """Extracts a page from stdin or a file while it is still being received."""
+    import stream_parser
+
+    page_type = _resolve_page_type(args)
+    if args.compare:
+        if args.path == "-":
+            print(json.dumps({"error": "--compare needs a saved page, not stdin."}, indent=2))
+            sys.exit(1)
+        report = stream_parser.compare_with_buffered(args.path, page_type, args.chunk_size, args.delay_ms / 1000)
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    source = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        chunks = stream_parser.iter_chunks(source, args.chunk_size)
+        if args.gzip:
+            chunks = stream_parser.iter_decompressed(chunks)
+        data, stats = stream_parser.stream_extract(chunks, page_type)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+    print(f"Stream stats: {json.dumps(stats)}", file=sys.stderr)
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+
+def cmd_fields(args):
+    """Streams a saved page's fields as NDJSON or server-sent events, cheapest first."""
+    import field_stream
+
+    field_stream.stream_page(args.path, args.url, args.format, page_type=args.type)
+
+def cmd_fields_bench(args):
+    """Measures time to the first streamed field against buffered extraction, per page type."""
+    import field_stream
+
+    report = field_stream.benchmark(args.corpus, repeat=args.repeat, page_types=set(args.type or []))
+    print(json.dumps(report, indent=2))
+    if any(entry["mismatches"] for entry in report.values()):
+        sys.exit(1)
+
+def cmd_selector_bench(args):
+    """Compares string selectors with the precompiled SELECTORS registries, per page type."""
+    import selector_registry
+
+    report = selector_registry.benchmark(args.corpus, repeat=args.repeat, page_types=set(args.type or []))
+    print(json.dumps(report, indent=2))
+
+def cmd_batch(args):
+    """Extracts every saved page in a corpus directory into NDJSON."""
+    import batch_extract
+    import selector_stats
+    import segments
+    from html_store import HtmlStore
+    from section_delta import SectionStore
+
+    # Batch runs reorder fallback selectors by hit rate, carrying stats across runs.
+    selector_stats.enable_adaptive()
+    selector_stats.load_stats(args.selector_stats)
+
+    shard = None
+    if args.shard:
+        try:
+            shard = segments.parse_shard(args.shard)
+        except ValueError as exc:
+            print(json.dumps({"error": str(exc)}, indent=2))
+            sys.exit(1)
+    if args.segment_dir:
+        out = segments.SegmentWriter(args.segment_dir, shard, max_records=args.segment_records, corpus=args.corpus)
+    else:
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    stats = None
+    try:
+        store = HtmlStore(args.html_store) if args.html_store else None
+        section_store = SectionStore(args.section_store) if args.section_store else None
+        normalization = None
+        if args.normalization_index:
+            from normalization import open_index
+            normalization = open_index(args.normalization_index)
+        stats = batch_extract.run_batch(
+            args.corpus, out, dedupe=not args.no_dedupe, threshold=args.similarity, shard=shard, html_store=store,
+            section_store=section_store, normalization=normalization, join_companies=args.join_companies,
+            spill_dir=args.spill_dir,
+        )
+    finally:
+        if args.segment_dir:
+            # Only a finished run gets its last manifest; an interrupted segment stays incomplete.
+            if stats is not None:
+                out.close(stats)
+        elif out is not sys.stdout:
+            out.close()
+        if args.selector_stats:
+            selector_stats.save_stats(args.selector_stats)
+    print(f"Batch stats: {json.dumps(stats)}", file=sys.stderr)
+
+def cmd_reextract(args):
+    """Recomputes fields whose extractor version changed in stored batch results."""
+    import reextract
+    import segments
+    from html_store import HtmlStore
+
+    store = HtmlStore(args.html_store) if args.html_store else None
+    totals = {}
+    for path in segments.find_segments(args.results):
+        stats = reextract.reextract_file(path, store, page_types=set(args.type or []), dry_run=args.dry_run)
+        print(f"{path}: {json.dumps(stats)}", file=sys.stderr)
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                for field, count in value.items():
+                    totals.setdefault(key, {})[field] = totals.get(key, {}).get(field, 0) + count
+            else:
+                totals[key] = round(totals.get(key, 0) + value, 3)
+    print(json.dumps(totals, indent=2))
+
+def cmd_merge(args):
+    """Combines batch segments from several shards or nodes into one result set."""
+    import segments
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = segments.merge_segments(args.segments, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Merge stats: {json.dumps(stats)}", file=sys.stderr)
+    if stats["invalid_segments"] or stats.get("missing_shards"):
+        sys.exit(1)
+
+def cmd_export(args):
+    """Exports batch output into columnar tables (Parquet, or CSV without pyarrow)."""
+    import columnar_export
+
+    try:
+        stats = columnar_export.export(
+            args.inputs, args.output, fmt=args.format, row_group_rows=args.row_group_rows,
+            keep_not_available=args.keep_not_available,
+        )
+    except ValueError as exc:
+        print(json.dumps({"error": str(exc)}, indent=2))
+        sys.exit(1)
+    print(f"Export stats: {json.dumps(stats)}", file=sys.stderr)
+
+def cmd_normalize_index(args):
+    """Builds a normalization index of companies, skills and locations from batch output."""
+    import normalization
+
+    try:
+        stats = normalization.build_index(args.inputs, args.output, aliases=args.aliases, min_count=args.min_count)
+    except ValueError as exc:
+        print(json.dumps({"error": str(exc)}, indent=2))
+        sys.exit(1)
+    print(json.dumps(stats, indent=2))
+
+def cmd_normalize_lookup(args):
+    """Looks spellings up in a normalization index."""
+    import normalization
+
+    with normalization.NormalizationIndex(args.index) as index:
+        print(json.dumps(normalization.describe(index, args.kind, args.names), indent=2, ensure_ascii=False))
+
+def cmd_join_companies(args):
+    """Links job records to company records in stored batch output."""
+    import company_join
+    from columnar_export import iter_records
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = company_join.join_records(iter_records(args.inputs), out, spill_dir=args.spill_dir)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Join stats: {json.dumps(stats)}", file=sys.stderr)
+
+def cmd_loadtest(args):
+    """Replays a corpus against /process-page (or the scraper scripts) under load."""
+    import load_test
+
+    fixtures = load_test.load_fixtures(args.corpus)
+    report = load_test.run_load_test(
+        fixtures, target=args.target, concurrency=args.concurrency, rate=args.rate,
+        requests=args.requests, timeout=args.timeout, seed=args.seed,
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+def cmd_selector_stats(args):
+    """Prints the selector hit/miss counts saved by batch runs."""
+    try:
+        with open(args.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        print(json.dumps({"error": f"No selector stats at {args.path}"}, indent=2))
+        sys.exit(1)
+    print(json.dumps(saved, indent=2, ensure_ascii=False))
+
+def cmd_worker(args):
+    """
+    Long-running worker mode: reads NDJSON jobs ({"id", "url", "path"} or
+    {"id", "url", "html"}) from stdin and writes one NDJSON result per job,
+    with per-job memory stats, in completion order. A job's optional
+    "priority" ("interactive", the default, or "bulk") picks its queue.
+    With --mode thread the jobs run on threads of this process instead.
+    --metrics-port / --metrics-file expose Prometheus metrics (see metrics.py).
+    """
+    import threading
+    import metrics
+    import worker_pool
+    import job_scheduler
+    from page_types import detect_page_type
+
+    collect_metrics = bool(args.metrics_port or args.metrics_file)
+    metrics.enable(collect_metrics)
+    write_lock = threading.Lock()
+
+    def emit(job, future):
+        data, error, memory = future.result()
+        timer = metrics.StageTimer(job.get("page_type") or detect_page_type(job.get("url", "")) or "unknown")
+        line = json.dumps({"id": job.get("id"), "data": data, "error": error, "worker": memory}, ensure_ascii=False)
+        timer.lap("serialize")
+        with write_lock:
+            print(line, flush=True)
+
+    classes = {name: dict(spec) for name, spec in job_scheduler.DEFAULT_CLASSES.items()}
+    classes["interactive"]["p99_target_ms"] = args.interactive_p99_ms
+
+    if args.mode == "thread":
+        pool = worker_pool.ThreadWorkerPool(args.workers)
+    else:
+        pool = worker_pool.WorkerPool(
+            args.workers, max_jobs=args.max_jobs, max_rss_mb=args.max_rss_mb,
+            shared_memory=args.shared_memory, slot_bytes=int(args.slot_mb * 2**20),
+            collect_metrics=collect_metrics,
+        )
+    server = stop_writer = None
+    with pool:
+        run = lambda job: pool.submit(job).result()
+        with job_scheduler.JobScheduler(run, capacity=pool.size, classes=classes) as scheduler:
+            if collect_metrics:
+                metrics.register_collector(pool.gauge_samples)
+                metrics.register_collector(scheduler.gauge_samples)
+            if args.metrics_port:
+                server = metrics.serve(args.metrics_port, args.metrics_host)
+                print(f"Metrics on http://{args.metrics_host}:{server.server_port}/metrics", file=sys.stderr)
+            if args.metrics_file:
+                stop_writer = metrics.start_textfile_writer(args.metrics_file, args.metrics_interval)
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                job = json.loads(line)
+                future = scheduler.submit(job, job.get("priority", "interactive"))
+                future.add_done_callback(lambda f, job=job: emit(job, f))
+        print(f"Scheduler stats: {json.dumps(scheduler.stats())}", file=sys.stderr)
+        if args.metrics_file:
+            stop_writer.set()
+            metrics.write_textfile(args.metrics_file)
+    if server is not None:
+        server.shutdown()
+    print(f"Worker pool stats: {json.dumps(pool.stats())}", file=sys.stderr)
+
+def cmd_profile(args):
+    """Profiles extraction of a page (or a corpus directory) over repeated runs."""
+    import profiling
+
+    try:
+        result = profiling.profile_extraction(
+            args.path, page_type=args.type, url=args.url, repeat=args.repeat,
+            mode=args.mode, interval=args.interval_ms / 1000,
+        )
+    except ValueError as exc:
+        print(json.dumps({"error": str(exc)}, indent=2))
+        sys.exit(1)
+    if args.collapsed:
+        with open(args.collapsed, "w", encoding="utf-8") as f:
+            profiling.write_collapsed(result, f)
+        print(f"Collapsed stacks written to {args.collapsed}", file=sys.stderr)
+    print(profiling.format_top_table(result, top=args.top, ours_only=not args.all))
+
+def cmd_archive(args):
+    """Extracts the pages stored in a WARC or MHTML archive into NDJSON."""
+    import archive_reader
+
+    if args.list:
+        for number, entry in enumerate(archive_reader.load_index(args.archive, rebuild=args.reindex)):
+            print(json.dumps(dict(entry, record=number), ensure_ascii=False))
+        return
+    start, _, stop = (args.range or "").partition(":")
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = archive_reader.process_archive(
+            args.archive, out, workers=args.workers, start=int(start or 0),
+            stop=int(stop) if stop else None, rebuild_index=args.reindex,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Archive stats: {json.dumps(stats)}", file=sys.stderr)
+
+def cmd_import_budget(args):
+    """Fails when a scraper's cold import is over budget or loads bs4 and friends eagerly."""
+    import import_budget
+
+    report, ok = import_budget.check_import_budget(budget_ms=args.budget_ms, runs=args.runs)
+    print(json.dumps(report, indent=2))
+    if not ok:
+        sys.exit(1)
+
+def cmd_stress(args):
+    """Fails when extraction time grows faster than near-linearly on pathological pages."""
+    import stress_test
+
+    sizes = tuple(int(size) for size in args.sizes.split(","))
+    report, ok = stress_test.run_stress(
+        page_types=args.type, scenarios=args.scenario or stress_test.SCENARIOS, sizes=sizes,
+        max_exponent=args.max_exponent, repeats=args.repeats,
+    )
+    print(json.dumps(report, indent=2))
+    if not ok:
+        sys.exit(1)
+
+def cmd_replay(args):
+    """Replays a corpus through two extractor versions; fails on changed output or slower pages."""
+    import replay
+
+    report = replay.replay(args.corpus, baseline=args.baseline, candidate=args.candidate,
+                           repeat=args.repeat, page_types=set(args.type or []))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    if report["changed_pages"] or report["slower_pages"]:
+        sys.exit(1)
+
+def cmd_handoff_bench(args):
+    """Times handing pages of several sizes to a worker process: queue pickling vs. shared memory."""
+    import shm_ring
+
+    sizes = [int(float(size.rstrip("kKmM")) * (2**20 if size[-1] in "mM" else 2**10 if size[-1] in "kK" else 1))
+             for size in args.sizes.split(",")]
+    print(json.dumps(shm_ring.handoff_benchmark(sizes, rounds=args.rounds), indent=2))
+
+def cmd_pool_bench(args):
+    """Compares process-pool and thread-pool extraction throughput and memory per page type."""
+    import pool_benchmark
+
+    report = pool_benchmark.run_pool_benchmark(
+        args.corpus, workers=args.workers, jobs=args.jobs, page_types=set(args.type or []),
+    )
+    print(json.dumps(report, indent=2))
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Command line tools for the page scrapers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stream = commands.add_parser("stream", help="extract a page as soon as the sections it needs have arrived")
+    stream.add_argument("path", nargs="?", default="-", help="saved page, or - for stdin (default)")
+    stream.add_argument("--url", help="page URL, used to pick the extractor")
+    stream.add_argument("--type", choices=sorted(PAGE_TYPES), help="page type, overrides --url detection")
+    stream.add_argument("--gzip", action="store_true", help="input is gzip or zlib compressed")
+    stream.add_argument("--chunk-size", type=int, default=64 * 1024)
+    stream.add_argument("--compare", action="store_true", help="compare against the buffered path instead")
+    stream.add_argument("--delay-ms", type=float, default=0.0, help="simulated delay per chunk for --compare")
+    stream.set_defaults(func=cmd_stream)
+
+    fields = commands.add_parser("fields", help="stream a saved page's fields as they are extracted")
+    fields.add_argument("path", help="saved page")
+    fields.add_argument("--url", help="page URL, used to pick the extractor")
+    fields.add_argument("--type", choices=sorted(PAGE_TYPES), help="page type, overrides --url detection")
+    fields.add_argument("--format", choices=("ndjson", "sse"), default="ndjson")
+    fields.set_defaults(func=cmd_fields)
+
+    fields_bench = commands.add_parser("fields-bench", help="time to first streamed field vs. buffered extraction")
+    fields_bench.add_argument("corpus", help="directory of saved pages")
+    fields_bench.add_argument("-n", "--repeat", type=int, default=3, help="runs per page (median is reported)")
+    fields_bench.add_argument("--type", action="append", choices=sorted(PAGE_TYPES), help="only these page types (repeatable)")
+    fields_bench.set_defaults(func=cmd_fields_bench)
+
+    selector_bench = commands.add_parser("selector-bench", help="string vs. precompiled selectors per page type")
+    selector_bench.add_argument("corpus", help="directory of saved pages")
+    selector_bench.add_argument("-n", "--repeat", type=int, default=20, help="runs of each selector per page")
+    selector_bench.add_argument("--type", action="append", choices=sorted(PAGE_TYPES), help="only these page types (repeatable)")
+    selector_bench.set_defaults(func=cmd_selector_bench)
+
+    batch = commands.add_parser("batch", help="extract a whole corpus of saved pages")
+    batch.add_argument("corpus", help="directory of saved pages (or a single page)")
+    batch.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    batch.add_argument("--no-dedupe", action="store_true", help="extract every capture, even near-duplicates")
+    batch.add_argument("--similarity", type=float, default=0.95,
+                       help="SimHash similarity at which captures of one URL count as duplicates")
+    batch.add_argument("--selector-stats", default="selector_stats.json",
+                       help="file to load and save fallback selector hit rates (default: selector_stats.json)")
+    batch.add_argument("--shard", help="only process shard i of N (\"i/N\"), partitioned by canonical URL")
+    batch.add_argument("--segment-dir", help="write checksummed output segments with manifests here instead of -o")
+    batch.add_argument("--segment-records", type=int, default=50000, help="records per output segment")
+    batch.set_defaults(func=cmd_batch)
+
+    batch.add_argument("--html-store", help="keep the gzipped source of every extracted page here, for reextract")
+    batch.add_argument("--section-store",
+                       help="keep per-section hashes and values per URL here; re-scrapes only re-extract changed sections")
+    batch.add_argument("--normalization-index",
+                       help="index built by normalize-index; adds canonical company, skill and location ids to records")
+    batch.add_argument("--join-companies", action="store_true",
+                       help="add a company_ref to job records, pointing at the company records of this run")
+    batch.add_argument("--spill-dir", help="directory for job records waiting on their company (default: system temp)")
+
+    reextract = commands.add_parser("reextract", help="refresh stored results whose field extractor versions changed")
+    reextract.add_argument("results", nargs="+", help="batch NDJSON files or segment directories, patched in place")
+    reextract.add_argument("--html-store", help="store written by batch --html-store (falls back to the original captures)")
+    reextract.add_argument("--type", action="append", choices=sorted(PAGE_TYPES), help="only these page types (repeatable)")
+    reextract.add_argument("--dry-run", action="store_true", help="only count stale records and fields")
+    reextract.set_defaults(func=cmd_reextract)
+
+    merge = commands.add_parser("merge", help="combine batch segments from several shards into one result set")
+    merge.add_argument("segments", nargs="+", help="segment files or directories of segments")
+    merge.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    merge.set_defaults(func=cmd_merge)
+
+    export = commands.add_parser("export", help="export batch output into columnar tables for spreadsheets and warehouses")
+    export.add_argument("inputs", nargs="+", help="NDJSON batch output files, segment directories, or - for stdin")
+    export.add_argument("-o", "--output", required=True, help="directory for the table files")
+    export.add_argument("--format", choices=("parquet", "csv"),
+                        help="default: parquet when pyarrow is installed, csv otherwise")
+    export.add_argument("--row-group-rows", type=int, default=50000, help="rows buffered per table before a write")
+    export.add_argument("--keep-not-available", action="store_true", help="keep \"Not available\" instead of empty values")
+    export.set_defaults(func=cmd_export)
+
+    norm_index = commands.add_parser("normalize-index", help="build a normalization index of companies, skills and locations")
+    norm_index.add_argument("inputs", nargs="+", help="NDJSON batch output files, segment directories, or - for stdin")
+    norm_index.add_argument("-o", "--output", required=True, help="index file to write")
+    norm_index.add_argument("--aliases", help="TSV of curated aliases: kind, spelling, canonical spelling")
+    norm_index.add_argument("--min-count", type=int, default=1, help="leave out names seen fewer times than this")
+    norm_index.set_defaults(func=cmd_normalize_index)
+
+    norm_lookup = commands.add_parser("normalize-lookup", help="look spellings up in a normalization index")
+    norm_lookup.add_argument("index", help="index file built by normalize-index")
+    norm_lookup.add_argument("kind", choices=("company", "skill", "location"))
+    norm_lookup.add_argument("names", nargs="+")
+    norm_lookup.set_defaults(func=cmd_normalize_lookup)
+
+    join = commands.add_parser("join-companies", help="link job records to company records in batch output")
+    join.add_argument("inputs", nargs="+", help="NDJSON batch output files, segment directories, or - for stdin")
+    join.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    join.add_argument("--spill-dir", help="directory for job records waiting on their company (default: system temp)")
+    join.set_defaults(func=cmd_join_companies)
+
+    stats = commands.add_parser("selector-stats", help="show fallback selector hit rates from earlier batch runs")
+    stats.add_argument("path", nargs="?", default="selector_stats.json")
+    stats.set_defaults(func=cmd_selector_stats)
+
+    loadtest = commands.add_parser("loadtest", help="replay saved pages as concurrent extension requests")
+    loadtest.add_argument("corpus", help="directory of saved pages to replay")
+    loadtest.add_argument("--target", default="http://127.0.0.1:8001/api/process-page",
+                          help="process-page URL, or 'subprocess' to run the scraper scripts directly")
+    loadtest.add_argument("--concurrency", type=int, default=4)
+    loadtest.add_argument("--rate", type=float, help="open-loop arrival rate in requests/second")
+    loadtest.add_argument("--requests", type=int, default=100, help="total requests to send")
+    loadtest.add_argument("--timeout", type=float, default=60.0)
+    loadtest.add_argument("--seed", type=int)
+    loadtest.set_defaults(func=cmd_loadtest)
+
+    worker = commands.add_parser("worker", help="long-running worker pool fed with NDJSON jobs on stdin")
+    worker.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    worker.add_argument("--max-jobs", type=int, default=500, help="recycle a worker after this many jobs")
+    worker.add_argument("--max-rss-mb", type=float, default=512, help="recycle a worker once its RSS exceeds this")
+    worker.add_argument("--interactive-p99-ms", type=float, default=2000,
+                        help="throttle bulk jobs while interactive p99 latency is above this")
+    worker.add_argument("--mode", choices=("process", "thread"), default="process",
+                        help="worker processes, or threads in this process (no recycling)")
+    worker.add_argument("--shared-memory", action="store_true",
+                        help="hand job HTML to worker processes through shared memory instead of pickling it")
+    worker.add_argument("--slot-mb", type=float, default=4, help="shared-memory slot size; larger pages get their own segment")
+    worker.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port at /metrics")
+    worker.add_argument("--metrics-host", default="127.0.0.1", help="address for --metrics-port")
+    worker.add_argument("--metrics-file", help="write Prometheus metrics to this file (node_exporter textfile collector)")
+    worker.add_argument("--metrics-interval", type=float, default=15.0, help="seconds between --metrics-file rewrites")
+    worker.set_defaults(func=cmd_worker)
+
+    pool_bench = commands.add_parser("pool-bench", help="compare process-pool and thread-pool extraction per page type")
+    pool_bench.add_argument("corpus", help="directory of saved pages")
+    pool_bench.add_argument("--workers", type=int, help="processes or threads per pool (default: CPU count)")
+    pool_bench.add_argument("--jobs", type=int, default=200, help="extractions per page type and pool model")
+    pool_bench.add_argument("--type", action="append", choices=sorted(PAGE_TYPES), help="only these page types (repeatable)")
+    pool_bench.set_defaults(func=cmd_pool_bench)
+
+    handoff = commands.add_parser("handoff-bench", help="time page handoff to a worker: pickled queue vs. shared memory")
+    handoff.add_argument("--sizes", default="64k,512k,2m,8m", help="comma-separated page sizes (k/m suffixes)")
+    handoff.add_argument("--rounds", type=int, default=20, help="round trips per size (median is reported)")
+    handoff.set_defaults(func=cmd_handoff_bench)
+
+    profile = commands.add_parser("profile", help="profile extraction and write flamegraph-ready collapsed stacks")
+    profile.add_argument("path", help="saved page or corpus directory")
+    profile.add_argument("--url", help="URL the page was saved from (picks the extractor)")
+    profile.add_argument("--type", choices=sorted(PAGE_TYPES), help="page type, overriding URL detection")
+    profile.add_argument("-n", "--repeat", type=int, default=10, help="runs per page")
+    profile.add_argument("--mode", choices=("deterministic", "sampling"), default="deterministic",
+                         help="trace every call (exact, slower) or sample the stack (low overhead)")
+    profile.add_argument("--interval-ms", type=float, default=1.0, help="sampling interval")
+    profile.add_argument("--collapsed", help="write collapsed stacks here (flamegraph.pl / speedscope input)")
+    profile.add_argument("--top", type=int, default=25, help="rows in the function table")
+    profile.add_argument("--all", action="store_true", help="include library functions in the table")
+    profile.set_defaults(func=cmd_profile)
+
+    archive = commands.add_parser("archive", help="extract the pages stored in a WARC (.warc, .warc.gz) or MHTML archive")
+    archive.add_argument("archive", help="archive file")
+    archive.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    archive.add_argument("--workers", type=int, default=1, help="processes extracting index ranges in parallel")
+    archive.add_argument("--range", help="only records START:STOP of the archive index (e.g. 0:5000)")
+    archive.add_argument("--list", action="store_true", help="print the record index instead of extracting")
+    archive.add_argument("--reindex", action="store_true", help="rescan the archive even if a cached index matches")
+    archive.set_defaults(func=cmd_archive)
+
+    budget = commands.add_parser("import-budget", help="check each scraper's cold import time (python -X importtime)")
+    budget.add_argument("--budget-ms", type=float, default=40, help="allowed cold import time per scraper")
+    budget.add_argument("--runs", type=int, default=5, help="fresh interpreters per scraper (median is used)")
+    budget.set_defaults(func=cmd_import_budget)
+
+    stress = commands.add_parser("stress", help="check extraction scales near-linearly on generated pathological pages")
+    stress.add_argument("--type", action="append", choices=sorted(PAGE_TYPES), help="only these page types (repeatable)")
+    stress.add_argument("--scenario", action="append", choices=("nesting", "text", "items"),
+                        help="deep nesting, huge text nodes or many list items (repeatable, default: all)")
+    stress.add_argument("--sizes", default="500,1000,2000,4000", help="comma-separated input sizes to fit the curve on")
+    stress.add_argument("--max-exponent", type=float, default=1.35, help="largest allowed exponent k in time ~ size^k")
+    stress.add_argument("--repeats", type=int, default=3, help="runs per size (best is used)")
+    stress.set_defaults(func=cmd_stress)
+
+    replay_parser = commands.add_parser("replay", help="diff output and timing of two extractor versions over a corpus")
+    replay_parser.add_argument("corpus", help="directory of saved pages, e.g. the SCRAPER_CAPTURE_DIR corpus")
+    replay_parser.add_argument("--baseline", default="HEAD", help="scripts directory or git revision (default: HEAD)")
+    replay_parser.add_argument("--candidate", help="scripts directory or git revision (default: the working tree)")
+    replay_parser.add_argument("-n", "--repeat", type=int, default=5, help="runs per page (best is used)")
+    replay_parser.add_argument("--type", action="append", choices=sorted(PAGE_TYPES), help="only these page types (repeatable)")
+    replay_parser.add_argument("-o", "--output", help="also write the report to this file")
+    replay_parser.set_defaults(func=cmd_replay)
+
+    return parser
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    args.func(args)
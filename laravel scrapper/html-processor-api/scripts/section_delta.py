@@ -0,0 +1,126 @@
+import os
+import json
+import hashlib
+
+import metrics
+from corpus import canonical_url
+from page_types import field_versions, resolve_extractor
+
+# Section-level delta extraction for re-scraped pages. A re-scrape of a
+# profile usually changes one section (a new experience entry), but tracking
+# attributes make every capture's page hash differ, so the whole profile was
+# extracted again. Scrapers that declare SECTIONS (see person_scraper) get a
+# content hash per section: the text and tag structure of the section
+# element with only the attributes selectors match on, which leaves out ids
+# and tracking attributes. The hashes and section values of the last
+# extraction are stored per canonical URL; on the next scrape only sections
+# whose hash changed are extracted again, and the others are taken from the
+# stored state. Derived values (the About duplicate check) are reused while
+# every section they depend on is.
+#
+# Stored state is only used while the extractor's FIELD_VERSIONS and layout
+# variant are the ones that produced it.
+
+STATE_VERSION = 1
+# Attributes the section selectors match on; all others are treated as noise.
+HASHED_ATTRIBUTES = ("class", "aria-hidden", "data-field")
+
+def section_hash(element):
+    """Hash of a section's text and tag structure, or None when the section is missing."""
+    if element is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    types = element.interesting_string_types or element.MAIN_CONTENT_STRING_TYPES
+    for node in element.descendants:
+        if getattr(node, "contents", None) is None:
+            if type(node) in types:
+                text = node.strip()
+                if text:
+                    digest.update(b"\x00" + text.encode("utf-8"))
+        else:
+            attributes = [(name, node.get(name)) for name in HASHED_ATTRIBUTES if node.has_attr(name)]
+            digest.update(b"\x01" + f"{node.name}{attributes}".encode("utf-8"))
+    return digest.hexdigest()
+
+class SectionStore:
+    """Last extraction state per canonical URL, as JSON files under root."""
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, url):
+        digest = hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, url, state):
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp, path)
+
+def supports_sections(extract):
+    return "SECTIONS" in extract.__globals__
+
+def extract_delta(html, page_type, url, store):
+    """
+    Parses and extracts a page like page_types.extract_html, reusing the
+    unchanged sections of the last extraction of the same URL from `store`,
+    and saves the new state. Returns (data, extractor, stats) where stats
+    lists the sections reused and recomputed; pages of scrapers without
+    SECTIONS are extracted in full.
+    """
+    from bs4 import BeautifulSoup
+    from html_decode import decode_html
+
+    soup = BeautifulSoup(decode_html(html), "lxml")
+    try:
+        return _extract_delta(soup, html, page_type, url, store)
+    finally:
+        soup.decompose()
+
+def _extract_delta(soup, html, page_type, url, store):
+    extract, variant = resolve_extractor(page_type, html)
+    extractor = {"variant": variant, "versions": field_versions(extract)}
+    if not supports_sections(extract):
+        return extract(soup), extractor, {"reused": [], "recomputed": [], "full": True}
+
+    sections = extract.__globals__["SECTIONS"]
+    derived = extract.__globals__.get("DERIVED_SECTIONS", {})
+    hashes = {name: section_hash(locate(soup)) for name, (locate, _) in sections.items()}
+    for name, depends_on in derived.items():
+        hashes[name] = hashlib.blake2b("|".join(str(hashes[d]) for d in depends_on).encode("utf-8"), digest_size=16).hexdigest()
+
+    previous = store.get(url)
+    reuse = {}
+    if (previous and previous.get("version") == STATE_VERSION and previous.get("page_type") == page_type
+            and previous.get("extractor") == extractor):
+        for name, digest in hashes.items():
+            stored = previous["sections"].get(name)
+            if stored is not None and stored["hash"] == digest:
+                reuse[name] = stored["value"]
+
+    values = {}
+    data = extract(soup, reuse=reuse, values=values)
+    store.put(url, {
+        "version": STATE_VERSION,
+        "url": canonical_url(url),
+        "page_type": page_type,
+        "extractor": extractor,
+        "sections": {name: {"hash": hashes[name], "value": values[name]} for name in hashes},
+    })
+    metrics.inc("scraper_cache_requests_total", (("cache", "sections"), ("result", "hit")), len(reuse))
+    metrics.inc("scraper_cache_requests_total", (("cache", "sections"), ("result", "miss")), len(hashes) - len(reuse))
+    stats = {
+        "reused": sorted(reuse),
+        "recomputed": sorted(name for name in hashes if name not in reuse),
+        "full": False,
+    }
+    return data, extractor, stats
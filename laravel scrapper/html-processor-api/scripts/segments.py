@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import hashlib
+from datetime import datetime
+
+from corpus import canonical_url
+
+# Multi-node batch runs. Every node runs `scrape.py batch --shard i/N` over
+# the same corpus and keeps only the pages whose canonical URL hashes to its
+# shard, so no coordinator is needed and re-running a shard anywhere gives
+# the same partition. Output goes to NDJSON segments, each with a manifest
+# holding its record count and SHA-256. The manifest is written last, so a
+# segment without one is incomplete. merge_segments() checks every segment
+# against its manifest and combines them into one result set with one record
+# per URL, the newest capture.
+
+SEGMENT_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+DEFAULT_SEGMENT_RECORDS = 50000
+
+def parse_shard(text):
+    """Parses "i/N" into (i, N) with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {text!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..{count - 1}, got {text!r}")
+    return index, count
+
+def shard_key(page):
+    """The value a page is sharded on: its canonical URL, or its path when it has none."""
+    return canonical_url(page.get("url")) or page.get("path", "")
+
+def shard_of(key, count):
+    """Stable shard number for a key; the same on every machine and Python version."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+def content_hash(data):
+    """Hash of an extraction result, independent of key order."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+
+def _segment_name(shard, sequence):
+    index, count = shard or (0, 1)
+    return f"shard-{index:04d}-of-{count:04d}-{sequence:05d}.ndjson"
+
+class SegmentWriter:
+    """
+    File-like writer that splits NDJSON lines into segments of at most
+    `max_records` lines under `directory`, each completed with a manifest.
+    """
+    def __init__(self, directory, shard=None, max_records=DEFAULT_SEGMENT_RECORDS, corpus=None):
+        self.directory = directory
+        self.shard = shard
+        self.max_records = max_records
+        self.corpus = corpus
+        self.sequence = 0
+        self.segments = []
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        self._path = os.path.join(self.directory, _segment_name(self.shard, self.sequence))
+        self._file = open(self._path + ".tmp", "wb")
+        self._hash = hashlib.sha256()
+        self._records = 0
+        self._bytes = 0
+
+    def write(self, line):
+        if self._file is None:
+            self._open()
+        raw = line.encode("utf-8")
+        self._file.write(raw)
+        self._hash.update(raw)
+        self._bytes += len(raw)
+        self._records += line.count("\n")
+        if self._records >= self.max_records:
+            self._finish()
+
+    def _finish(self, stats=None):
+        self._file.close()
+        os.replace(self._path + ".tmp", self._path)
+        index, count = self.shard or (0, 1)
+        manifest = {
+            "format": "batch-segment",
+            "version": SEGMENT_VERSION,
+            "segment": os.path.basename(self._path),
+            "shard": index,
+            "shards": count,
+            "sequence": self.sequence,
+            "records": self._records,
+            "bytes": self._bytes,
+            "sha256": self._hash.hexdigest(),
+            "corpus": self.corpus,
+            "created_at": time.time(),
+        }
+        if stats is not None:
+            manifest["run_stats"] = stats
+        with open(self._path + MANIFEST_SUFFIX + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self._path + MANIFEST_SUFFIX + ".tmp", self._path + MANIFEST_SUFFIX)
+        self.segments.append(manifest)
+        self.sequence += 1
+        self._file = None
+
+    def close(self, stats=None):
+        """Completes the open segment. A shard with no records still gets an empty one."""
+        if self._file is None and not self.segments:
+            self._open()
+        if self._file is not None:
+            self._finish(stats)
+
+def read_manifest(segment_path):
+    with open(segment_path + MANIFEST_SUFFIX, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def verify_segment(segment_path):
+    """Returns the segment's manifest, or raises ValueError if the file does not match it."""
+    try:
+        manifest = read_manifest(segment_path)
+    except (OSError, ValueError):
+        raise ValueError(f"{segment_path}: missing or unreadable manifest (incomplete segment?)")
+    digest = hashlib.sha256()
+    records = 0
+    with open(segment_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+            records += block.count(b"\n")
+    if digest.hexdigest() != manifest["sha256"] or records != manifest["records"]:
+        raise ValueError(f"{segment_path}: checksum or record count does not match its manifest")
+    return manifest
+
+def refresh_manifest(segment_path):
+    """Updates a segment's manifest after the segment was rewritten (no-op without one)."""
+    try:
+        manifest = read_manifest(segment_path)
+    except (OSError, ValueError):
+        return
+    digest = hashlib.sha256()
+    records = size = 0
+    with open(segment_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+            records += block.count(b"\n")
+            size += len(block)
+    manifest.update(sha256=digest.hexdigest(), records=records, bytes=size, updated_at=time.time())
+    with open(segment_path + MANIFEST_SUFFIX + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(segment_path + MANIFEST_SUFFIX + ".tmp", segment_path + MANIFEST_SUFFIX)
+
+def find_segments(paths):
+    """Expands directories into the segment files they contain, in name order."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(".ndjson") and name.startswith("shard-")
+            )
+        else:
+            found.append(path)
+    return found
+
+def _capture_time(value):
+    """captured_at is an mtime from disk or an ISO date from a sidecar/archive; compare as seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return 0.0
+
+def _record_key(record):
+    return canonical_url(record.get("url")) or record.get("source", "")
+
+def merge_segments(paths, out):
+    """
+    Verifies the given segments (files or directories) and writes one record
+    per URL to `out`: the newest capture, with identical copies of a record
+    (same URL and content hash, e.g. a shard that ran twice) collapsed.
+    Returns the merge statistics, including any missing shards.
+    """
+    stats = {"segments": 0, "invalid_segments": [], "records_in": 0, "records_out": 0, "identical_dropped": 0, "superseded": 0}
+    shards_seen = set()
+    shard_counts = set()
+    # Only the winning position per URL is kept in memory; records are re-read on output.
+    best = {}
+    valid = []
+    for path in find_segments(paths):
+        try:
+            manifest = verify_segment(path)
+        except ValueError as exc:
+            stats["invalid_segments"].append(str(exc))
+            continue
+        valid.append(path)
+        stats["segments"] += 1
+        shards_seen.add(manifest["shard"])
+        shard_counts.add(manifest["shards"])
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                position = (len(valid) - 1, offset)
+                offset += len(line)
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                stats["records_in"] += 1
+                key = _record_key(record)
+                rank = (_capture_time(record.get("captured_at")), record.get("content_hash") or "")
+                current = best.get(key)
+                if current is None:
+                    best[key] = (rank, position)
+                elif rank == current[0]:
+                    stats["identical_dropped"] += 1
+                else:
+                    stats["superseded"] += 1
+                    if rank > current[0]:
+                        best[key] = (rank, position)
+
+    by_segment = {}
+    for rank, (segment, offset) in best.values():
+        by_segment.setdefault(segment, []).append(offset)
+    for segment, offsets in sorted(by_segment.items()):
+        with open(valid[segment], "rb") as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                out.write(f.readline().decode("utf-8"))
+                stats["records_out"] += 1
+
+    if len(shard_counts) == 1:
+        stats["shards"] = shard_counts.pop()
+        stats["missing_shards"] = sorted(set(range(stats["shards"])) - shards_seen)
+    elif shard_counts:
+        stats["shards"] = sorted(shard_counts)
+        stats["missing_shards"] = "segments come from runs with different shard counts"
+    return stats
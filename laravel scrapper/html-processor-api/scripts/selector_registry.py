@@ -0,0 +1,133 @@
+import time
+import threading
+
+# CSS selectors of the BeautifulSoup scrapers, declared once per page type.
+# soup.select_one("...") with a string goes through bs4's CSS wrapper and
+# soupsieve.compile on every call: a namespace and custom-selector copy and
+# a cache lookup before any matching happens, paid for every selector on
+# every page. A scraper declares its selectors in a SelectorRegistry and
+# selects with the compiled patterns instead.
+#
+# A registry compiles all of its selectors the first time one is used, not at
+# import: compiling needs soupsieve (and bs4 with it), which the scrapers
+# must not import eagerly (see import_budget). Long-running modes compile
+# up front with compile_all() so no job pays for it.
+
+_registries = {}
+
+class SelectorRegistry:
+    """Named CSS selectors of one scraper, compiled together on first use."""
+    def __init__(self, name, selectors):
+        self.name = name
+        self.selectors = dict(selectors)
+        self.compile_seconds = None
+        self._compiled = None
+        self._lock = threading.Lock()
+        _registries[name] = self
+
+    def compile(self):
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    import soupsieve
+                    started = time.perf_counter()
+                    self._compiled = {key: soupsieve.compile(selector) for key, selector in self.selectors.items()}
+                    self.compile_seconds = time.perf_counter() - started
+                compiled = self._compiled
+        return compiled
+
+    def __getitem__(self, key):
+        return (self._compiled or self.compile())[key]
+
+    def select_one(self, key, node):
+        return (self._compiled or self.compile())[key].select_one(node)
+
+    def select(self, key, node):
+        return (self._compiled or self.compile())[key].select(node)
+
+def compile_all():
+    """Compiles every registry of the scrapers imported so far."""
+    for registry in list(_registries.values()):
+        registry.compile()
+
+def registry_stats():
+    return {
+        name: {
+            "selectors": len(registry.selectors),
+            "compile_ms": None if registry.compile_seconds is None else round(registry.compile_seconds * 1000, 3),
+        }
+        for name, registry in sorted(_registries.items())
+    }
+
+def _count_compiles():
+    """Wraps soupsieve.compile to count calls; returns (counter, restore)."""
+    import soupsieve
+    original = soupsieve.compile
+    counter = {"calls": 0}
+    def counting(*args, **kwargs):
+        counter["calls"] += 1
+        return original(*args, **kwargs)
+    soupsieve.compile = counting
+    def restore():
+        soupsieve.compile = original
+    return counter, restore
+
+def benchmark(corpus_path, repeat=20, page_types=None):
+    """
+    Per page type: soupsieve.compile calls per extraction (string selectors
+    compile on every call, registered ones never do), and the time to run
+    every registered selector of the type's scrapers over its pages as
+    strings vs. compiled patterns, the per-call overhead the registry removes.
+    """
+    from bs4 import BeautifulSoup
+    from corpus import iter_corpus
+    from html_decode import decode_html
+    from page_types import detect_page_type, extract_html, get_extractor
+
+    pages = {}
+    for page in iter_corpus(corpus_path):
+        page_type = detect_page_type(page["url"])
+        if page_type and (not page_types or page_type in page_types):
+            with open(page["path"], "rb") as f:
+                pages.setdefault(page_type, []).append(f.read())
+
+    report = {}
+    for page_type, htmls in sorted(pages.items()):
+        get_extractor(page_type)
+        # Warm-up: layout variants import (and register) on first use.
+        for html in htmls:
+            extract_html(html, page_type)
+        compile_all()
+        counter, restore = _count_compiles()
+        try:
+            for html in htmls:
+                extract_html(html, page_type)
+        finally:
+            restore()
+        registries = [r for name, r in sorted(_registries.items()) if name.split(".")[0] == page_type]
+        timings = {"string": 0.0, "compiled": 0.0}
+        soups = [BeautifulSoup(decode_html(html), "lxml") for html in htmls]
+        for soup in soups:
+            for registry in registries:
+                for key, selector in registry.selectors.items():
+                    pattern = registry[key]
+                    started = time.perf_counter()
+                    for _ in range(repeat):
+                        soup.select(selector)
+                    timings["string"] += time.perf_counter() - started
+                    started = time.perf_counter()
+                    for _ in range(repeat):
+                        pattern.select(soup)
+                    timings["compiled"] += time.perf_counter() - started
+            soup.decompose()
+        calls = sum(len(r.selectors) for r in registries) * repeat * len(soups)
+        report[page_type] = {
+            "pages": len(htmls),
+            "selectors": sum(len(r.selectors) for r in registries),
+            "compile_calls_per_page": round(counter["calls"] / len(htmls), 2),
+            "string_us_per_select": round(timings["string"] / calls * 1e6, 2) if calls else None,
+            "compiled_us_per_select": round(timings["compiled"] / calls * 1e6, 2) if calls else None,
+        }
+    report["registries"] = registry_stats()
+    return report
@@ -0,0 +1,191 @@
+import os
+import json
+import threading
+
+# Fields that are resolved through a fallback chain record which alternative
+# produced the value. In adaptive mode (batch runs, long-running workers) the
+# chain is periodically re-sorted so the alternative that currently wins is
+# tried first. One-shot runs keep the declared order.
+#
+# The alternatives are not always interchangeable: on one page two of them
+# can match and give different values (both About containers, the cover
+# <img> and its style...). The declared order decides which value is right,
+# so reordering must never change a result. Every PROBE_EVERY-th resolve runs
+# all alternatives in declared order; those probes are the only source of
+# hit/miss counts (so every alternative is counted the same way) and record
+# each pair of alternatives that matched with different values as a conflict.
+# Reordering only moves an alternative ahead of ones it has never conflicted
+# with, and only after MIN_PROBES probes; conflicting pairs keep their
+# declared order, so the first hit is the declared-order value.
+#
+# Chains are shared by every thread of a thread-pool worker: counts are
+# updated under the chain's lock, and reordering swaps in a new list rather
+# than sorting the one another thread may be iterating.
+
+REORDER_EVERY = 50
+PROBE_EVERY = 10
+MIN_PROBES = 20
+# Counts are halved past this many probes so the order follows layout drift.
+# Conflicts are never forgotten.
+DECAY_AFTER = 10000
+
+_chains = {}
+# Saved stats for chains whose scraper has not been imported yet.
+_pending = {}
+_adaptive = False
+
+class SelectorChain:
+    """
+    An ordered list of (label, resolver) alternatives. A resolver takes a node
+    and returns the field value, or None when its selector misses.
+    """
+    def __init__(self, name, alternatives):
+        self.name = name
+        self.declared = [label for label, _ in alternatives]
+        self.declared_alternatives = list(alternatives)
+        self.alternatives = list(alternatives)
+        self.hits = {label: 0 for label in self.declared}
+        self.misses = {label: 0 for label in self.declared}
+        # Pairs of labels (in declared order) that matched with different values on one node.
+        self.conflicts = set()
+        self.probes = 0
+        self.resolves = 0
+        self._lock = threading.Lock()
+        _chains[name] = self
+        if name in _pending:
+            _merge(self, _pending.pop(name))
+
+    def resolve(self, node):
+        with self._lock:
+            self.resolves += 1
+            probe = (self.resolves - 1) % PROBE_EVERY == 0
+            alternatives = self.alternatives
+        if probe:
+            return self._probe(node)
+        for _, resolver in alternatives:
+            value = resolver(node)
+            if value is not None:
+                return value
+        return None
+
+    def _probe(self, node):
+        """Runs every alternative, records hits, misses and conflicts, returns the declared-order value."""
+        values = [(label, resolver(node)) for label, resolver in self.declared_alternatives]
+        with self._lock:
+            self.probes += 1
+            conflicts = len(self.conflicts)
+            for i, (label, value) in enumerate(values):
+                if value is None:
+                    self.misses[label] += 1
+                    continue
+                self.hits[label] += 1
+                for later, other in values[i + 1:]:
+                    if other is not None and other != value:
+                        self.conflicts.add((label, later))
+            # A new conflict may invalidate the current order, so it is fixed at once.
+            if _adaptive and (len(self.conflicts) > conflicts or self.probes % (REORDER_EVERY // PROBE_EVERY or 1) == 0):
+                self._reorder()
+        return next((value for _, value in values if value is not None), None)
+
+    def hit_rate(self, label):
+        attempts = self.hits[label] + self.misses[label]
+        return self.hits[label] / attempts if attempts else 0.0
+
+    def reorder(self):
+        """Sorts alternatives by hit rate as far as conflicts allow, falling back to the declared order on ties."""
+        with self._lock:
+            self._reorder()
+
+    def _reorder(self):
+        if self.probes > DECAY_AFTER:
+            for label in self.declared:
+                self.hits[label] //= 2
+                self.misses[label] //= 2
+            self.probes //= 2
+        if self.probes < MIN_PROBES:
+            self.alternatives = list(self.declared_alternatives)
+            return
+        rank = {label: i for i, label in enumerate(self.declared)}
+        key = lambda alt: (-self.hit_rate(alt[0]), rank[alt[0]])
+        # Insertion sort by adjacent swaps that never swap a conflicting pair,
+        # so those keep their declared relative order.
+        order = list(self.declared_alternatives)
+        for i in range(1, len(order)):
+            j = i
+            while j > 0 and key(order[j]) < key(order[j - 1]) and (order[j - 1][0], order[j][0]) not in self.conflicts:
+                order[j - 1], order[j] = order[j], order[j - 1]
+                j -= 1
+        self.alternatives = order
+
+    def stats(self):
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        return {
+            "order": [label for label, _ in self.alternatives],
+            "probes": self.probes,
+            "conflicts": sorted(list(pair) for pair in self.conflicts),
+            "selectors": {
+                label: {"hits": self.hits[label], "misses": self.misses[label], "hit_rate": round(self.hit_rate(label), 4)}
+                for label in self.declared
+            },
+        }
+
+def enable_adaptive(enabled=True):
+    """Turns on reordering of every chain, e.g. for batch or worker modes."""
+    global _adaptive
+    _adaptive = enabled
+    if enabled:
+        for chain in _chains.values():
+            chain.reorder()
+
+def all_stats():
+    return {name: chain.stats() for name, chain in sorted(_chains.items())}
+
+def _merge(chain, entry):
+    with chain._lock:
+        if "probes" not in entry:
+            # Counts saved before probing only counted alternatives that were tried; they are biased.
+            return
+        for label, counts in entry.get("selectors", {}).items():
+            if label in chain.hits:
+                chain.hits[label] += counts.get("hits", 0)
+                chain.misses[label] += counts.get("misses", 0)
+        chain.probes += entry["probes"]
+        for first, second in entry.get("conflicts", []):
+            if first in chain.hits and second in chain.hits:
+                chain.conflicts.add((first, second))
+        if _adaptive:
+            chain._reorder()
+
+def load_stats(path):
+    """
+    Merges counts saved by an earlier run into the chains. Chains that are not
+    registered yet pick their counts up when their scraper is imported.
+    """
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    for name, entry in saved.items():
+        chain = _chains.get(name)
+        if chain is None:
+            _pending[name] = entry
+        else:
+            _merge(chain, entry)
+
+def save_stats(path):
+    """
+    Writes the current counts to `path`. Stats for chains not loaded in this
+    process (e.g. a scraper the run never imported) are kept from the old file.
+    """
+    saved = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    saved.update(all_stats())
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(saved, f, indent=2)
+    os.replace(temp_path, path)
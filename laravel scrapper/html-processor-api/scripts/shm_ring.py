@@ -0,0 +1,175 @@
+import time
+import queue
+import threading
+from multiprocessing import shared_memory
+
+# Hands page HTML to pool workers through shared memory instead of the task
+# queue. Sending the page in the job pickles it, pushes it through a pipe and
+# unpickles it in the worker, copying it along the way. With a PageRing the
+# dispatcher copies the page once into a free slot of a shared segment and
+# the job carries only a handle; the worker parses straight from a
+# memoryview of the slot, and the slot is reused once the job is done.
+# Pages larger than a slot get a segment of their own, removed after the job.
+#
+# Create the ring before starting the workers: they must inherit the
+# dispatcher's resource tracker, or the tracker of the first worker to exit
+# "cleans up" segments that are still in use.
+
+DEFAULT_SLOT_BYTES = 4 * 2**20
+
+class PageRing:
+    """Dispatcher side: `slots` fixed-size slots in one shared segment."""
+    def __init__(self, slots, slot_bytes=DEFAULT_SLOT_BYTES):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._segment = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._oversize = {}
+        self._lock = threading.Lock()
+        self.stats = {"pages": 0, "oversize": 0, "bytes": 0, "copy_seconds": 0.0, "slot_wait_seconds": 0.0}
+
+    def put(self, html):
+        """
+        Copies page bytes (str is sent as UTF-8) into shared memory and returns
+        the handle a worker opens with open_page(). Blocks while every slot is in use.
+        """
+        encoding = None
+        if isinstance(html, str):
+            html, encoding = html.encode("utf-8"), "utf-8"
+        size = len(html)
+        if size > self.slot_bytes:
+            segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            started = time.perf_counter()
+            segment.buf[:size] = html
+            handle = {"shm": segment.name, "offset": 0, "size": size, "slot": None, "encoding": encoding}
+            with self._lock:
+                self._oversize[segment.name] = segment
+                self.stats["oversize"] += 1
+        else:
+            waited = time.perf_counter()
+            slot = self._free.get()
+            started = time.perf_counter()
+            offset = slot * self.slot_bytes
+            self._segment.buf[offset:offset + size] = html
+            handle = {"shm": self._segment.name, "offset": offset, "size": size, "slot": slot, "encoding": encoding}
+            with self._lock:
+                self.stats["slot_wait_seconds"] += started - waited
+        copy_seconds = time.perf_counter() - started
+        with self._lock:
+            self.stats["pages"] += 1
+            self.stats["bytes"] += size
+            self.stats["copy_seconds"] += copy_seconds
+        handle["copy_ms"] = round(copy_seconds * 1000, 3)
+        return handle
+
+    def release(self, handle):
+        """Returns a handle's slot to the ring (or removes its own segment) once the job is done."""
+        if handle["slot"] is not None:
+            self._free.put(handle["slot"])
+            return
+        with self._lock:
+            segment = self._oversize.pop(handle["shm"], None)
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["copy_seconds"] = round(stats["copy_seconds"], 4)
+        stats["slot_wait_seconds"] = round(stats["slot_wait_seconds"], 4)
+        return stats
+
+    def close(self):
+        with self._lock:
+            oversize, self._oversize = list(self._oversize.values()), {}
+        for segment in oversize:
+            segment.close()
+            segment.unlink()
+        self._segment.close()
+        self._segment.unlink()
+
+# Worker side: segments stay attached for the life of the worker.
+_attached = {}
+
+def open_page(handle):
+    """
+    Returns (page, attach_seconds) for a handle: a memoryview of the page bytes,
+    or the decoded text when the dispatcher was given a str. Call close_page()
+    with the same handle after extraction.
+    """
+    started = time.perf_counter()
+    segment = _attached.get(handle["shm"])
+    if segment is None:
+        segment = _attached[handle["shm"]] = shared_memory.SharedMemory(name=handle["shm"])
+    view = segment.buf[handle["offset"]:handle["offset"] + handle["size"]]
+    attach_seconds = time.perf_counter() - started
+    if handle["encoding"]:
+        try:
+            return str(view, handle["encoding"]), attach_seconds
+        finally:
+            view.release()
+    return view, attach_seconds
+
+def close_page(handle, page):
+    """Drops the worker's view of a page; one-off segments are detached."""
+    if isinstance(page, memoryview):
+        page.release()
+    if handle["slot"] is None:
+        segment = _attached.pop(handle["shm"], None)
+        if segment is not None:
+            segment.close()
+
+def _echo_worker(tasks, results):
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        if isinstance(task, dict):
+            page, _ = open_page(task)
+            size = len(page)
+            close_page(task, page)
+        else:
+            size = len(task)
+        results.put(size)
+
+def handoff_benchmark(sizes, rounds=20, slot_bytes=None):
+    """
+    Round-trip time of handing one page of each size to a worker process and
+    getting its length back: pickled through the queue vs. a PageRing handle
+    (including the copy into the slot). Returns per-size milliseconds.
+    """
+    import multiprocessing
+
+    ring = PageRing(1, slot_bytes or max(max(sizes), 1))
+    tasks, results = multiprocessing.Queue(), multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_echo_worker, args=(tasks, results), daemon=True)
+    worker.start()
+    report = {}
+    try:
+        for size in sizes:
+            page = b"<p>" + b"x" * max(size - 7, 0) + b"</p>"
+            timings = {"queue": [], "shm": []}
+            for _ in range(rounds + 1):
+                started = time.perf_counter()
+                tasks.put(page)
+                results.get()
+                timings["queue"].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                handle = ring.put(page)
+                tasks.put(handle)
+                results.get()
+                ring.release(handle)
+                timings["shm"].append(time.perf_counter() - started)
+            # The first round includes attaching the segment; report the median of the rest.
+            report[size] = {
+                f"{mode}_ms": round(sorted(samples[1:])[len(samples[1:]) // 2] * 1000, 3)
+                for mode, samples in timings.items()
+            }
+    finally:
+        tasks.put(None)
+        worker.join()
+        ring.close()
+    return report
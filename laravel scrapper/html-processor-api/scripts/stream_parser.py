@@ -0,0 +1,179 @@
+import time
+import zlib
+import tracemalloc
+from lxml import etree
+from bs4 import BeautifulSoup
+from html_decode import decode_html
+
+from page_types import PAGE_TYPES, get_extractor
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+class _ReadyTarget:
+    """
+    lxml parser target that builds no tree at all. It only keeps a stack of
+    open elements so it can tell when every ready marker has been closed.
+    """
+    def __init__(self, markers):
+        self.pending = list(markers)
+        self.stack = []
+
+    def _match(self, tag, attrib):
+        for marker in self.pending:
+            marker_tag, marker_attr, marker_value = marker
+            if tag != marker_tag:
+                continue
+            if marker_attr is None or attrib.get(marker_attr) == marker_value:
+                return marker
+        return None
+
+    def start(self, tag, attrib):
+        self.stack.append(self._match(tag, attrib))
+
+    def end(self, tag):
+        if not self.stack:
+            return
+        marker = self.stack.pop()
+        if marker is not None and marker in self.pending:
+            self.pending.remove(marker)
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return None
+
+    @property
+    def ready(self):
+        return not self.pending
+
+def iter_chunks(fileobj, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields byte chunks from a binary file, pipe or socket file as they land."""
+    read = getattr(fileobj, "read1", fileobj.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def iter_decompressed(chunks):
+    """Decompresses a gzip or zlib stream chunk by chunk."""
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+def stream_extract(chunks, page_type):
+    """
+    Feeds chunks to lxml's incremental HTML parser as they arrive and runs the
+    page type's extractor as soon as the sections it needs have been closed.
+    Anything after that point (trailing scripts, footers) is never read.
+
+    The incremental parse builds no tree; it only finds the point where the
+    page is ready. The bytes received up to then are parsed a second time by
+    BeautifulSoup for the extractor, so every page is parsed twice and
+    time_to_result_ms covers both parses plus the full extraction.
+    Returns (data, stats).
+    """
+    target = _ReadyTarget(PAGE_TYPES[page_type]["ready_markers"])
+    parser = etree.HTMLParser(target=target)
+    received = []
+    chunk_count = 0
+    bytes_received = 0
+    started = None
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if started is None:
+            started = time.perf_counter()
+        received.append(chunk)
+        chunk_count += 1
+        bytes_received += len(chunk)
+        parser.feed(chunk)
+        if target.ready:
+            break
+
+    if started is None:
+        started = time.perf_counter()
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass
+    ready_at = time.perf_counter()
+
+    html = b"".join(received)
+    received = None
+    soup = BeautifulSoup(decode_html(html), "lxml")
+    data = get_extractor(page_type, html)(soup)
+    soup.decompose()
+    done_at = time.perf_counter()
+
+    stats = {
+        "chunks_received": chunk_count,
+        "bytes_received": bytes_received,
+        "ready_early": target.ready,
+        "time_to_ready_ms": round((ready_at - started) * 1000, 2),
+        "time_to_result_ms": round((done_at - started) * 1000, 2),
+    }
+    return data, stats
+
+def _arriving_chunks(path, chunk_size, delay):
+    """Replays a saved page as if it were arriving over the network."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+def _measure(run):
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        data = run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return data, round(elapsed * 1000, 2), peak
+
+def compare_with_buffered(path, page_type, chunk_size=DEFAULT_CHUNK_SIZE, delay=0.0):
+    """
+    Runs the same saved page through the buffered path (read everything, then
+    parse) and the streaming path, replaying it in chunks with an optional delay
+    per chunk. Reports the time to the extracted result and peak traced Python
+    memory for both.
+    """
+    def buffered():
+        html = b"".join(_arriving_chunks(path, chunk_size, delay))
+        return get_extractor(page_type, html)(BeautifulSoup(decode_html(html), "lxml"))
+
+    def streamed():
+        return stream_extract(_arriving_chunks(path, chunk_size, delay), page_type)
+
+    buffered_data, buffered_ms, buffered_peak = _measure(buffered)
+    (streamed_data, stream_stats), streamed_ms, streamed_peak = _measure(streamed)
+
+    return {
+        "page_type": page_type,
+        "chunk_size": chunk_size,
+        "delay_per_chunk_ms": round(delay * 1000, 2),
+        "buffered": {
+            "time_to_result_ms": buffered_ms,
+            "peak_memory_kb": round(buffered_peak / 1024, 1),
+        },
+        "streaming": {
+            "time_to_result_ms": streamed_ms,
+            "peak_memory_kb": round(streamed_peak / 1024, 1),
+            "bytes_received": stream_stats["bytes_received"],
+            "ready_early": stream_stats["ready_early"],
+        },
+        "identical_output": buffered_data == streamed_data,
+    }
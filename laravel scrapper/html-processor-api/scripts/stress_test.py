@@ -0,0 +1,236 @@
+import gc
+import math
+import time
+
+from page_types import PAGE_TYPES, extract_html
+
+# Pathological-input stress suite. For every page type it generates pages
+# that grow along one axis at a time: deeply nested markup, huge text nodes
+# (with the whitespace runs and near-miss date text that make regexes
+# backtrack), and thousands of repeated list items. Each page is extracted at
+# increasing sizes, and the growth of time with size is fitted as an exponent
+# (time ~ size^k). A path that stays near-linear has k close to 1; anything
+# well above means some step is quadratic in the input.
+
+DEFAULT_SIZES = (500, 1000, 2000, 4000)
+# Allowed fitted exponent. Above 1 to leave room for timer noise and the
+# n*log(n) parts of parsing.
+MAX_EXPONENT = 1.35
+REPEATS = 3
+SCENARIOS = ("nesting", "text", "items")
+
+def _nest(depth, inner, tag="div"):
+    return f"<{tag}>" * depth + inner + f"</{tag}>" * depth
+
+def _nested_list(depth):
+    """A description with lists nested `depth` levels deep (what clean() flattens)."""
+    return "<ul>" + "<li>point<ul>" * depth + "<li>leaf</li>" + "</ul></li>" * depth + "</ul>"
+
+def _hostile_text(n):
+    """~n*10 characters of text: long whitespace runs after month names and bare years."""
+    return "Jan " + ("May" + " " * 6 + "1") * n + " 2020" + " " * n + "-"
+
+def _page(body, head=""):
+    return f"<html><head><meta charset='utf-8'>{head}</head><body>{body}</body></html>"
+
+# --- Templates: (scenario, n) -> page HTML. Markup mirrors what the selectors expect. ---
+
+def _person(scenario, n):
+    about = "I build scalable systems and love distributed computing."
+    experience_item = (
+        "<li class='artdeco-list__item'><div class='display-flex mr1'><span aria-hidden='true'>Engineer {i}</span></div>"
+        "<span class='t-14 t-normal'><span aria-hidden='true'>Acme {i} · Full-time</span></span>"
+        "<span class='t-14 t-normal t-black--light'><span aria-hidden='true'>{dates}</span></span>"
+        "<span class='t-14 t-normal t-black--light'><span aria-hidden='true'>Berlin</span></span>"
+        "<div class='pvs-entity__sub-components'><span aria-hidden='true'>{details}</span></div></li>"
+    )
+    education_item = (
+        "<li><span aria-hidden='true'>University {i}</span><span aria-hidden='true'>Master of Science</span>"
+        " <span>{dates} and some more filler text here</span></li>"
+    )
+    experiences, educations, skills = 1, 1, 1
+    dates, details, heading = "Jan 2020 - Present · 4 yrs", "Led the platform team.", "<h2>Education</h2>"
+    if scenario == "items":
+        experiences = educations = skills = n
+    elif scenario == "text":
+        about = "About me " * n
+        dates = _hostile_text(n)
+        details = "word " * n
+    elif scenario == "nesting":
+        heading = _nest(n, "<h2>Education</h2>")
+        details = _nested_list(n)
+    body = (
+        "<main><div class='pv-text-details__left-panel'><h1>Jane Doe</h1><div class='text-body-medium'>Engineer</div></div>"
+        f"<section><div id='about'></div><div class='display-flex ph5 pv3'><span aria-hidden='true'>{about}</span></div></section>"
+        "<section><div id='experience'></div><ul>"
+        + "".join(experience_item.format(i=i, dates=dates, details=details) for i in range(experiences))
+        + f"</ul></section><section id='education'>{heading}<ul>"
+        + "".join(education_item.format(i=i, dates=dates) for i in range(educations))
+        + "</ul></section><section><div id='skills'></div>"
+        + "".join(f"<a data-field='skill_card_skill_topic'><span aria-hidden='true'>Skill {i}</span></a>" for i in range(skills))
+        + "</section></main>"
+    )
+    if scenario == "nesting":
+        body = _nest(n, body)
+    return _page(body)
+
+def _job(scenario, n):
+    description = "<p>We want you.</p><ul><li>Python</li></ul>"
+    if scenario == "items":
+        description = "<ul>" + "".join(f"<li>Requirement {i}</li>" for i in range(n)) + "</ul>"
+    elif scenario == "text":
+        description = "<p>" + "word " * n + " " * n + "</p>"
+    elif scenario == "nesting":
+        description = _nested_list(n)
+    body = (
+        "<h1 class='t-24'>Backend Engineer</h1><div class='job-details-jobs-unified-top-card__company-name'><a>Acme</a></div>"
+        "<div class='job-details-jobs-unified-top-card__primary-description-container'><span class='tvm__text--low-emphasis'>Berlin</span></div>"
+        "<div class='job-details-jobs-unified-top-card__tertiary-description-container'><span>2 weeks ago</span><strong>100 applicants</strong></div>"
+        f"<div id='job-details'>{description}</div>"
+    )
+    return _page(_nest(n, body) if scenario == "nesting" else body)
+
+def _company(scenario, n):
+    about, details = "Acme is a company.", 1
+    if scenario == "items":
+        details = n
+    elif scenario == "text":
+        about = "Acme " * n + "\n" * n
+    headings = ["Website", "Industry", "Company size", "Headquarters", "Founded", "Specialties"]
+    items = "".join(f"<dt><h3>{headings[i % 6]} {i}</h3></dt><dd>value {i}</dd>" for i in range(details * 6))
+    body = (
+        "<main><h1 class='org-top-card-summary__title'>Acme</h1><p class='org-top-card-summary__tagline'>We make things</p>"
+        f"<section><h2>Overview</h2><p class='break-words'>{about}</p><dl>{items}</dl></section></main>"
+    )
+    return _page(_nest(n, body) if scenario == "nesting" else body)
+
+def _indeed_job(scenario, n):
+    description = "<p>Analyse data.</p>"
+    if scenario == "items":
+        description = "<ul>" + "".join(f"<li>Duty {i}</li>" for i in range(n)) + "</ul>"
+    elif scenario == "text":
+        description = "<p>" + "data " * n + "\n \n" * n + "</p>"
+    elif scenario == "nesting":
+        description = _nested_list(n)
+    body = (
+        "<h1 class='jobsearch-JobInfoHeader-title'>Data Analyst</h1><div data-company-name='true'><a>Globex</a></div>"
+        "<div data-testid='inlineHeader-companyLocation'>Remote</div>"
+        "<div id='salaryInfoAndJobType'><span>$50,000 a year</span><span>- Full-time</span></div>"
+        f"<div id='jobDescriptionText'>{description}</div>"
+    )
+    return _page(_nest(n, body) if scenario == "nesting" else body)
+
+def _indeed_company(scenario, n):
+    about, rows = "<p>Globex corp.</p>", 1
+    if scenario == "items":
+        rows = n
+    elif scenario == "text":
+        about = "<p>" + "Globex " * n + "</p>"
+    info = "".join(
+        f"<li data-testid='companyInfo-{key}'><div>{key}</div><div>value {i}</div></li>"
+        for i in range(rows) for key in ("industry", "founded", "employee", "headquartersLocation")
+    )
+    body = (
+        "<div itemprop='name'>Globex</div><section data-testid='AboutSection-section'>"
+        f"<div data-testid='less-text'>{about}</div><ul>{info}</ul>"
+        "<a data-testid='companyLink[]' href='https://globex.com'>site</a></section>"
+    )
+    return _page(_nest(n, body) if scenario == "nesting" else body)
+
+def _job_search(scenario, n):
+    title, cards = "Backend Engineer", 1
+    if scenario == "items":
+        cards = n
+    elif scenario == "text":
+        title = "Engineer " * n
+    card = (
+        "<li><div class='base-card base-search-card' data-entity-urn='urn:li:jobPosting:{i}'>"
+        "<a class='base-card__full-link' href='https://www.linkedin.com/jobs/view/x-{i}'></a>"
+        "<h3 class='base-search-card__title'>{title}</h3><h4 class='base-search-card__subtitle'><a>Acme</a></h4>"
+        "<span class='job-search-card__location'>Berlin</span><span class='job-search-card__salary-info'>$120K/yr</span>"
+        "<time class='job-search-card__listdate'>2 days ago</time></div></li>"
+    )
+    body = "<main><ul>" + "".join(card.format(i=i + 1, title=title) for i in range(cards)) + "</ul></main>"
+    head = "<link rel='canonical' href='https://www.linkedin.com/jobs/search/'>"
+    return _page(_nest(n, body) if scenario == "nesting" else body, head)
+
+def _indeed_search(scenario, n):
+    title, cards = "Python Developer", 1
+    if scenario == "items":
+        cards = n
+    elif scenario == "text":
+        title = "Python " * n
+    card = (
+        "<li><div class='cardOutline'><div class='job_seen_beacon'><h2 class='jobTitle'><a data-jk='{i:x}'>"
+        "<span title='t'>{title}</span></a></h2><span data-testid='company-name'>Foo</span>"
+        "<div data-testid='text-location'>London</div><div data-testid='attribute_snippet_testid'>£50,000 a year</div>"
+        "<span data-testid='myJobsStateDate'>Posted 3 days ago</span></div></div></li>"
+    )
+    body = "<div id='mosaic-provider-jobcards'><ul>" + "".join(card.format(i=i + 1, title=title) for i in range(cards)) + "</ul></div>"
+    head = "<link rel='canonical' href='https://uk.indeed.com/jobs?q=python'>"
+    return _page(_nest(n, body) if scenario == "nesting" else body, head)
+
+TEMPLATES = {
+    "person": _person,
+    "job": _job,
+    "company": _company,
+    "indeed_job": _indeed_job,
+    "indeed_company": _indeed_company,
+    "job_search": _job_search,
+    "indeed_search": _indeed_search,
+}
+
+def generate(page_type, scenario, n):
+    """Returns a generated stress page as UTF-8 bytes."""
+    return TEMPLATES[page_type](scenario, n).encode("utf-8")
+
+def time_extraction(html, page_type, repeats=REPEATS):
+    """Best-of-`repeats` wall time of one extraction, in seconds."""
+    best = None
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        extract_html(html, page_type)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def fit_exponent(sizes, timings):
+    """Least-squares slope of log(time) against log(size)."""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in timings]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+def run_stress(page_types=None, scenarios=SCENARIOS, sizes=DEFAULT_SIZES, max_exponent=MAX_EXPONENT, repeats=REPEATS):
+    """
+    Extracts generated pages of increasing size and checks every scaling curve
+    against max_exponent. Returns (report, ok).
+    """
+    report = {}
+    ok = True
+    for page_type in page_types or sorted(TEMPLATES):
+        if page_type not in PAGE_TYPES:
+            raise ValueError(f"Unknown page type: {page_type}")
+        for scenario in scenarios:
+            timings, page_bytes = [], []
+            # Untimed first run, so lazy imports and selector compilation don't
+            # inflate the smallest size and flatten the fitted curve.
+            extract_html(generate(page_type, scenario, sizes[0]), page_type)
+            for n in sizes:
+                html = generate(page_type, scenario, n)
+                page_bytes.append(len(html))
+                timings.append(time_extraction(html, page_type, repeats))
+            # Fit against the page size: that is what a caller controls.
+            exponent = fit_exponent(page_bytes, timings)
+            within = exponent <= max_exponent
+            ok = ok and within
+            report[f"{page_type}/{scenario}"] = {
+                "sizes": list(sizes),
+                "page_kb": [round(b / 1024, 1) for b in page_bytes],
+                "ms": [round(t * 1000, 2) for t in timings],
+                "exponent": round(exponent, 2),
+                "ok": within,
+            }
+    return report, ok
@@ -1,18 +1,38 @@
 import sys
-import io
-
-# --- ADD THIS BLOCK AT THE VERY TOP ---
-# Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-# --- END OF NEW BLOCK ---
-
 import os
 import json
 import re
-import difflib
-from datetime import datetime
-from bs4 import BeautifulSoup
+
+try:
+    from html_decode import read_html
+except ImportError:
+    # Run directly from scripts/test; the shared helpers live one level up.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from html_decode import read_html
+from selector_registry import SelectorRegistry
+
+# Field versions for `scrape.py reextract` (see page_types.field_versions).
+FIELD_VERSIONS = {
+    "name": 1,
+    "headline": 1,
+    "location": 1,
+    "profile_pic_url": 1,
+    "cover_pic_url": 1,
+    "about": 1,
+    "experience": 1,
+    "education": 1,
+    "highest_education_level": 1,
+    "skills": 1,
+    "languages": 1,
+}
+
+SELECTORS = SelectorRegistry("person.sdui", {
+    "name": "p._9cd462e2._58b9cc0a",
+    "headline": "p.a256db30.ba57d3d2",
+    "locations": 'p[class*="d89f4058"]',
+    "experience_items": "div[componentkey*='entity-collection-item']",
+    "skills": "div[componentkey*='com.linkedin.sdui.profile.skill'] p[class*='a256db30']",
+})
 
 # --- NEW: Helper function to find a section by its <h2> title ---
 def find_section(soup, title_text):
@@ -54,6 +74,9 @@ def get_highest_education_level(education_list):
                     highest_level_slug = slug
     return highest_level_slug
 
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
 # --- Utility functions (Your existing versions) ---
 def clean(content):
     if not content:
@@ -63,15 +86,20 @@ def clean(content):
         for br in content.find_all("br"):
             br.replace_with("\n")
         # --- MODIFICATION: Added <li> and <p> to preserve formatting ---
+        # Nested <p>/<li> are replaced along with their outermost ancestor;
+        # skipping them keeps deeply nested lists linear.
+        flattened = set()
         for tag in content.find_all(["p", "li"]):
+            if id(tag) in flattened:
+                continue
+            flattened.update(id(inner) for inner in tag.find_all(["p", "li"]))
             tag.replace_with(f"\n{tag.get_text(strip=True)}")
         text = content.get_text(separator="\n", strip=True)
         # --- END OF MODIFICATION ---
     else:
         text = str(content)
-    cleaned_content = text.encode('utf-8', 'replace').decode('utf-8')
-    text = re.sub(r'[ \t]+', ' ', cleaned_content)
-    text = re.sub(r'\n{3,}', '\n\n', text.strip())
+    text = _SPACES_RE.sub(' ', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text.strip())
     # --- THIS IS THE FIX ---
     junk_phrases = ["Skip to main content", "See more", "...see more", "… more"]
     for phrase in junk_phrases:
@@ -80,10 +108,17 @@ def clean(content):
     # --- END OF FIX ---
     return text.strip() if text.strip() else "Not available"
 
+# Date ranges sit near the start of an entry (after the title and company or
+# degree), so only this much of its text is searched; the patterns backtrack
+# on long whitespace runs, and entry text can be arbitrarily long.
+DATE_SCAN_CHARS = 500
+_FULL_DATE_RE = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})\s*[-–]\s*(Present|(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})', re.IGNORECASE)
+_YEAR_RANGE_RE = re.compile(r'(\d{4})\s*[-–]\s*(\d{4}|Present)', re.IGNORECASE)
+
 def parse_date_range(text):
     date_from, date_to, is_current = "Not available", "Not available", False
-    full_date_pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})\s*[-–]\s*(Present|(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})'
-    full_match = re.search(full_date_pattern, text, re.IGNORECASE)
+    text = text[:DATE_SCAN_CHARS]
+    full_match = _FULL_DATE_RE.search(text)
     if full_match:
         date_from = f"{full_match.group(1)} {full_match.group(2)}"
         if "present" in full_match.group(3).lower():
@@ -92,14 +127,14 @@ def parse_date_range(text):
         else:
             date_to = full_match.group(3).strip()
     else:
-        year_pattern = r'(\d{4})\s*[-–]\s*(\d{4}|Present)'
-        year_match = re.search(year_pattern, text, re.IGNORECASE)
+        year_match = _YEAR_RANGE_RE.search(text)
         if year_match:
             date_from = year_match.group(1)
             date_to = year_match.group(2)
             if "present" in date_to.lower():
                 is_current = True
     if not is_current and date_to != "Not available":
+        from datetime import datetime
         try:
             date_to_obj = datetime.strptime(date_to, "%b %Y")
             if date_to_obj > datetime.now():
@@ -113,25 +148,32 @@ def parse_date_range(text):
                 pass
     return date_from, date_to, is_current
 
+_YEAR_RE = re.compile(r'\d{4}')
+
 def is_valid_job_entry(text, role):
     skills_indicators = ["skills", "+2 skills", "+3 skills", "+4 skills", "+5 skills", "and more", "show all", "see more"]
     text_lower = text.lower()
     for indicator in skills_indicators:
         if indicator in text_lower and len(text) < 150:
             return False
-    has_date = re.search(r'\d{4}', text) or "present" in text_lower
+    has_date = _YEAR_RE.search(text) or "present" in text_lower
     is_substantial = len(text) > 100
     if role != "Not available" and any(indicator in role.lower() for indicator in skills_indicators):
         return False
     return has_date or is_substantial
 
 SIMILARITY_THRESHOLD = 0.90
+# SequenceMatcher is quadratic in the worst case, so fuzzy comparison only
+# looks at this many characters of each text; near-duplicates already agree
+# on their opening.
+SIMILARITY_MAX_CHARS = 2000
 def is_about_duplicate(about, experiences, educations, threshold=SIMILARITY_THRESHOLD):
     if not about or about == "Not available":
         return False
     def norm(s):
         return " ".join(str(s).lower().split())
     a = norm(about)
+    a_head = a[:SIMILARITY_MAX_CHARS]
     def check_field(field_text):
         if not field_text or field_text == "Not available":
             return False
@@ -140,10 +182,12 @@ def is_about_duplicate(about, experiences, educations, threshold=SIMILARITY_THRE
             return False
         if a == f or a in f or f in a:
             return True
-        ratio = difflib.SequenceMatcher(None, a, f).ratio()
-        if ratio >= threshold:
-            return True
-        return False
+        import difflib
+        matcher = difflib.SequenceMatcher(None, a_head, f[:SIMILARITY_MAX_CHARS])
+        # The cheap upper bounds rule out most pairs before the full ratio.
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            return False
+        return matcher.ratio() >= threshold
     for e in experiences or []:
         for key in ("details", "company_name", "role", "company_location"):
             if key in e and check_field(e.get(key)):
@@ -163,13 +207,13 @@ def extract_basic_info(soup):
     try:
         top_card = soup.find("section", class_="_140ad967")
         if top_card:
-            name = clean(top_card.select_one('p._9cd462e2._58b9cc0a'))
-            headline = clean(top_card.select_one('p.a256db30.ba57d3d2'))
+            name = clean(SELECTORS.select_one("name", top_card))
+            headline = clean(SELECTORS.select_one("headline", top_card))
             
             # --- FIX 2: Location ---
             # Find all <p> tags with this class and take the first one
             # that is NOT "Contact info".
-            all_locations = top_card.select('p[class*="d89f4058"]')
+            all_locations = SELECTORS.select("locations", top_card)
             for loc in all_locations:
                 if "Contact info" not in loc.get_text():
                     location = clean(loc)
@@ -221,7 +265,7 @@ def extract_experience(soup):
         if not experience_section:
             return []
         
-        job_items = experience_section.select("div[componentkey*='entity-collection-item']")
+        job_items = SELECTORS.select("experience_items", experience_section)
         
         for item in job_items:
             texts = item.find_all("p", class_="_9cd462e2")
@@ -328,7 +372,7 @@ def extract_skills(soup):
         if not skills_section:
             return []
             
-        skill_elements = skills_section.select("div[componentkey*='com.linkedin.sdui.profile.skill'] p[class*='a256db30']")
+        skill_elements = SELECTORS.select("skills", skills_section)
         for el in skill_elements:
             skill_name = clean(el)
             if skill_name != "Not available":
@@ -366,10 +410,15 @@ def extract_profile(input_html_path):
     if not os.path.exists(input_html_path):
         print(f"Error: The file path does not exist on the server.", file=sys.stderr)
         return {"error": f"File not found at {input_html_path}"}
-    with open(input_html_path, "r", encoding="utf-8") as f:
-        html = f.read()
+    html = read_html(input_html_path)
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "lxml")
-    
+    data = extract_profile_from_soup(soup)
+    print("Python script finished. Returning JSON data.", file=sys.stderr)
+    return data
+
+def extract_profile_from_soup(soup):
+    """Runs every profile extractor over an already parsed page."""
     name, headline, location, profile_pic_url, cover_pic_url = extract_basic_info(soup)
     about = extract_about(soup)
     experience = extract_experience(soup)
@@ -396,12 +445,15 @@ def extract_profile(input_html_path):
         "skills": skills,
         "languages": languages
     }
-    
-    print("Python script finished. Returning JSON data.", file=sys.stderr)
     return data
 
 # Script Entry Point (Unchanged)
 if __name__ == "__main__":
+    import io
+    # Reconfigure stdout to ensure UTF-8 output, solving encoding errors.
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
     if len(sys.argv) > 1:
         html_file_path = sys.argv[1]
         profile_data = extract_profile(html_file_path)
@@ -0,0 +1,454 @@
+import os
+import sys
+import gc
+import time
+import threading
+import itertools
+import multiprocessing
+import multiprocessing.connection
+from collections import deque
+from concurrent.futures import Future
+
+import metrics
+from page_types import PAGE_TYPES, detect_page_type, get_extractor, extract_html
+
+# Long-running extraction workers. The scrapers were written for a process
+# that exits after one page, so a worker that stays up must clean up after
+# itself: every soup is decomposed after extraction (see extract_html), the
+# objects created at import time are moved out of the collector's way with
+# gc.freeze(), and a worker is replaced once it has handled too many jobs or
+# its RSS has grown past a limit.
+
+DEFAULT_MAX_JOBS = 500
+DEFAULT_MAX_RSS_MB = 512
+# bs4 creates a lot of short-lived objects; a higher gen0 threshold means far
+# fewer young collections per page without letting garbage pile up.
+GC_THRESHOLDS = (10000, 20, 20)
+# Full collection every this many jobs, while the worker is idle between pages.
+FULL_GC_EVERY = 50
+
+def current_rss():
+    """Resident set size of this process in bytes (0 if it cannot be read)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+def prepare_worker():
+    """
+    Imports every extractor and compiles its selectors, then freezes what that
+    created so gc never rescans it.
+    """
+    import selector_registry
+
+    for page_type in PAGE_TYPES:
+        get_extractor(page_type)
+    selector_registry.compile_all()
+    gc.collect()
+    gc.freeze()
+    gc.set_threshold(*GC_THRESHOLDS)
+
+def execute_job(job, handoff=None):
+    """
+    Runs one job: {"url", "html"}, {"url", "path"} or {"url", "shm"} (a
+    shm_ring handle), with an optional "page_type". Transport stats for
+    shared-memory pages are added to `handoff` when a dict is given.
+    """
+    page_type = job.get("page_type") or detect_page_type(job.get("url"))
+    if not page_type:
+        return {"error": "This page type is not supported."}
+    if "shm" in job:
+        import shm_ring
+
+        html, attach_seconds = shm_ring.open_page(job["shm"])
+        try:
+            return extract_html(html, page_type)
+        finally:
+            shm_ring.close_page(job["shm"], html)
+            if handoff is not None:
+                handoff.update(transport="shm", copy_ms=job["shm"]["copy_ms"], attach_ms=round(attach_seconds * 1000, 3))
+    html = job.get("html")
+    if html is None:
+        with open(job["path"], "rb") as f:
+            html = f.read()
+    elif handoff is not None:
+        handoff.update(transport="queue")
+    return extract_html(html, page_type)
+
+def _worker_main(tasks, results, max_jobs, max_rss, collect_metrics=False):
+    prepare_worker()
+    metrics.enable(collect_metrics)
+    pid = os.getpid()
+    jobs_done = 0
+    reason = "stopped"
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, job = task
+        results.send(("start", job_id))
+        rss_before = current_rss()
+        started = time.perf_counter()
+        handoff = {}
+        try:
+            data, error = execute_job(job, handoff), None
+        except Exception as exc:
+            data, error = None, f"{exc.__class__.__name__}: {exc}"
+        elapsed = time.perf_counter() - started
+        jobs_done += 1
+        if jobs_done % FULL_GC_EVERY == 0:
+            gc.collect()
+        rss_after = current_rss()
+        recycle = jobs_done >= max_jobs or (max_rss and rss_after > max_rss)
+        memory = {
+            "pid": pid,
+            "jobs_done": jobs_done,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "rss_mb_before": round(rss_before / 2**20, 1),
+            "rss_mb_after": round(rss_after / 2**20, 1),
+            "rss_mb_delta": round((rss_after - rss_before) / 2**20, 2),
+            "recycled": bool(recycle),
+        }
+        if handoff:
+            memory["handoff"] = handoff
+        drained = metrics.drain() if collect_metrics else None
+        results.send(("done", (job_id, data, error, memory, drained)))
+        if recycle:
+            reason = "recycled"
+            break
+    results.send(("exit", reason))
+
+# Jobs handed to one worker ahead of time, so it never waits on the dispatcher.
+DISPATCH_AHEAD = 2
+# How often the collector wakes up when no worker has anything to say.
+REAP_INTERVAL = 0.5
+
+class WorkerPool:
+    """
+    A pool of extraction processes. submit() returns a Future resolving to
+    (data, error, memory_stats). Workers that reach max_jobs or max_rss_mb
+    exit after their current job and are replaced.
+
+    Every worker has a task queue of its own and the dispatcher assigns jobs
+    to it (DISPATCH_AHEAD at a time), so it always knows which jobs a worker
+    holds. Results come back over a pipe per worker, which the worker alone
+    writes to, so a worker killed mid-send cannot take the others down with it
+    and its death shows up at once as the end of its pipe. When a worker dies
+    without saying so, the jobs it had not started go back to the
+    front of the queue; the one it was running (or, if its start never came
+    through, its oldest) is retried once on another worker and fails if it
+    kills that one too.
+
+    With shared_memory, page HTML goes to the workers through a shm_ring
+    PageRing (two slots per worker) instead of being pickled into the queue.
+    With collect_metrics, workers record metrics and send them with every
+    result; they are merged into this process's metrics.
+    """
+    def __init__(self, workers=None, max_jobs=DEFAULT_MAX_JOBS, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 shared_memory=False, slot_bytes=None, collect_metrics=False):
+        self.size = workers or os.cpu_count() or 1
+        self.max_jobs = max_jobs
+        self.max_rss = int(max_rss_mb * 2**20) if max_rss_mb else 0
+        self._futures = {}
+        self._jobs = {}
+        self._pending = deque()
+        self._retried = set()
+        # worker_id -> job ids sent to its queue and not yet done, oldest first
+        self._assigned = {}
+        self._queues = {}
+        # worker_id -> read end of its result pipe
+        self._results = {}
+        self._in_flight = {}
+        self._processes = {}
+        self._ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._closing = False
+        self.recycled = 0
+        self.crashed = 0
+        self.collect_metrics = collect_metrics
+        # Latest RSS reported by each live worker.
+        self._rss = {}
+        self._ring = None
+        self._handles = {}
+        if shared_memory:
+            import shm_ring
+
+            self._ring = shm_ring.PageRing(2 * self.size, slot_bytes or shm_ring.DEFAULT_SLOT_BYTES)
+        for _ in range(self.size):
+            self._spawn()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def _spawn(self):
+        worker_id = next(self._worker_ids)
+        tasks = multiprocessing.Queue()
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(tasks, writer, self.max_jobs, self.max_rss, self.collect_metrics),
+            daemon=True,
+        )
+        process.start()
+        # Only the worker may hold the write end, or its pipe never reaches EOF.
+        writer.close()
+        self._results[worker_id] = reader
+        self._processes[worker_id] = process
+        self._queues[worker_id] = tasks
+        self._assigned[worker_id] = []
+
+    def submit(self, job):
+        future = Future()
+        handle = None
+        if self._ring is not None and job.get("html") is not None:
+            handle = self._ring.put(job["html"])
+            job = {key: value for key, value in job.items() if key != "html"}
+            job["shm"] = handle
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("Worker pool is closed.")
+            job_id = next(self._ids)
+            self._futures[job_id] = future
+            self._jobs[job_id] = job
+            if handle is not None:
+                self._handles[job_id] = handle
+            self._pending.append(job_id)
+            self._dispatch()
+        return future
+
+    def _dispatch(self):
+        """Hands pending jobs to workers with room. Called with the lock held."""
+        for worker_id, assigned in self._assigned.items():
+            while len(assigned) < DISPATCH_AHEAD and self._pending:
+                job_id = self._pending.popleft()
+                if job_id not in self._jobs:
+                    continue
+                assigned.append(job_id)
+                self._queues[worker_id].put((job_id, self._jobs[job_id]))
+
+    def _finish(self, job_id, result):
+        """Resolves a job's future (once). Called with the lock held."""
+        self._jobs.pop(job_id, None)
+        self._retried.discard(job_id)
+        self._release(job_id)
+        future = self._futures.pop(job_id, None)
+        if future is not None:
+            future.set_result(result)
+        if not self._futures:
+            self._idle.notify_all()
+
+    def _release(self, job_id):
+        handle = self._handles.pop(job_id, None)
+        if handle is not None:
+            self._ring.release(handle)
+
+    def _remove_worker(self, worker_id):
+        """Forgets a worker; returns the jobs it still held. Called with the lock held."""
+        self._processes.pop(worker_id, None)
+        self._rss.pop(worker_id, None)
+        self._in_flight.pop(worker_id, None)
+        tasks = self._queues.pop(worker_id, None)
+        if tasks is not None:
+            # Jobs it never read are handed out again; don't block on flushing them.
+            tasks.cancel_join_thread()
+            tasks.close()
+        results = self._results.pop(worker_id, None)
+        if results is not None:
+            results.close()
+        return [job_id for job_id in self._assigned.pop(worker_id, []) if job_id in self._jobs]
+
+    def _collect(self):
+        while True:
+            with self._lock:
+                if self._closing and not self._processes:
+                    return
+                readers = {conn: worker_id for worker_id, conn in self._results.items()}
+            for conn in multiprocessing.connection.wait(list(readers), timeout=REAP_INTERVAL):
+                try:
+                    kind, payload = conn.recv()
+                except (EOFError, OSError):
+                    kind, payload = "lost", None
+                with self._lock:
+                    self._handle(readers[conn], kind, payload)
+
+    def _handle(self, worker_id, kind, payload):
+        """Acts on one message from a worker. Called with the lock held."""
+        if worker_id not in self._processes:
+            return
+        if kind == "start":
+            self._in_flight[worker_id] = payload
+        elif kind == "done":
+            job_id, data, error, memory, drained = payload
+            metrics.merge(drained)
+            self._rss[worker_id] = int(memory["rss_mb_after"] * 2**20)
+            self._in_flight.pop(worker_id, None)
+            if job_id in self._assigned[worker_id]:
+                self._assigned[worker_id].remove(job_id)
+            self._finish(job_id, (data, error, memory))
+            self._dispatch()
+        elif kind == "exit":
+            process = self._processes[worker_id]
+            # A recycled worker leaves the jobs queued behind its last one.
+            self._pending.extendleft(reversed(self._remove_worker(worker_id)))
+            process.join()
+            if payload == "recycled":
+                self.recycled += 1
+            if payload == "recycled" and (not self._closing or self._pending):
+                self._spawn()
+            self._dispatch()
+        else:
+            self._reap(worker_id)
+
+    def _reap(self, worker_id):
+        """
+        Replaces a worker whose pipe closed before its "exit" and hands its
+        jobs on (see the class docstring). Called with the lock held.
+        """
+        process = self._processes[worker_id]
+        process.join()
+        running = self._in_flight.get(worker_id)
+        held = self._remove_worker(worker_id)
+        self.crashed += 1
+        if held:
+            suspect = running if running in held else held[0]
+            requeue = [job_id for job_id in held if job_id != suspect]
+            if suspect in self._retried:
+                self._finish(suspect, (None, f"Worker exited with code {process.exitcode} (twice)", None))
+            else:
+                self._retried.add(suspect)
+                requeue.insert(0, suspect)
+            self._pending.extendleft(reversed(requeue))
+        if not self._closing or self._pending:
+            self._spawn()
+        self._dispatch()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "workers": len(self._processes),
+                "pending": len(self._futures),
+                "recycled": self.recycled,
+                "crashed": self.crashed,
+            }
+        if self._ring is not None:
+            stats["shared_memory"] = self._ring.summary()
+        return stats
+
+    def gauge_samples(self):
+        """Pool queue depth and worker RSS, as a metrics collector."""
+        with self._lock:
+            pending = len(self._pending)
+            rss = sorted(self._rss.items())
+        samples = [("scraper_queue_depth", (("queue", "pool"),), pending)]
+        samples.extend(("scraper_worker_rss_bytes", (("worker", str(worker_id)),), value) for worker_id, value in rss)
+        return samples
+
+    def close(self):
+        """Lets submitted jobs finish, then stops every worker."""
+        with self._lock:
+            self._closing = True
+            while self._futures:
+                self._idle.wait()
+            for tasks in self._queues.values():
+                tasks.put(None)
+        self._collector.join()
+        for process in list(self._processes.values()):
+            process.join()
+        if self._ring is not None:
+            self._ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def gil_enabled():
+    """False on a free-threaded build running without the GIL."""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check() if check is not None else True
+
+class ThreadWorkerPool:
+    """
+    Thread-based counterpart of WorkerPool for hosts where forking worker
+    processes is too expensive or memory-bound: the same submit() interface,
+    with every job run on one of `workers` threads in this process. Each
+    parse builds its own lxml parser, so threads share only the extractor
+    modules, whose mutable state (selector stats, layout caches) is locked.
+    Threads are not recycled: max_jobs and RSS limits need a process pool.
+    """
+    def __init__(self, workers=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.size = workers or os.cpu_count() or 1
+        prepare_worker()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="extract")
+
+    def _run(self, job):
+        local = self._local
+        local.jobs_done = getattr(local, "jobs_done", 0) + 1
+        started = time.perf_counter()
+        try:
+            data, error = execute_job(job), None
+        except Exception as exc:
+            data, error = None, f"{exc.__class__.__name__}: {exc}"
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._pending -= 1
+        memory = {
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "jobs_done": local.jobs_done,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "rss_mb_after": round(current_rss() / 2**20, 1),
+        }
+        return data, error, memory
+
+    def submit(self, job):
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._run, job)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.size,
+                "pending": self._pending,
+                "mode": "thread",
+                "gil_enabled": gil_enabled(),
+            }
+
+    def gauge_samples(self):
+        """Jobs not yet started and this process's RSS, as a metrics collector."""
+        with self._lock:
+            pending = self._pending
+        return [
+            ("scraper_queue_depth", (("queue", "pool"),), max(pending - self.size, 0)),
+            ("scraper_worker_rss_bytes", (("worker", "threads"),), current_rss()),
+        ]
+
+    def close(self):
+        """Lets queued jobs finish, then stops the threads."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
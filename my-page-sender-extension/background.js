@@ -4,7 +4,12 @@ const enabledUrlPatterns = [
   "linkedin.com/jobs/view/",
   "linkedin.com/company/",
   ["indeed.", "/cmp/"],
-  ["indeed.", "/viewjob"]
+  ["indeed.", "/viewjob"],
+  // Search result pages: every job card on the page is scraped in one request.
+  "linkedin.com/jobs/search",
+  "linkedin.com/jobs/collections",
+  ["indeed.", "/jobs?"],
+  ["indeed.", "/q-"]
 ];
 
 // A list of URL patterns on your site that can be filled
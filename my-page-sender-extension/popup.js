@@ -61,6 +61,56 @@ document.addEventListener('DOMContentLoaded', () => {
         return await response.json();
     };
 
+    // --- Streaming variant: fields arrive as NDJSON events, cheapest first ---
+    // onPartial is called with the fields received so far; the returned document
+    // is assembled in the server's key order, identical to processPage's result.
+    const processPageStreaming = async (pageHTML, pageUrl, onPartial) => {
+        const apiUrl = 'http://127.0.0.1:8001/api/process-page/stream';
+        const response = await fetch(apiUrl, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Accept': 'application/x-ndjson' },
+            body: JSON.stringify({ html: pageHTML, url: pageUrl }),
+        });
+        if (response.status === 404 || response.status === 405) {
+            // Older server without the streaming route.
+            return processPage(pageHTML, pageUrl);
+        }
+        if (!response.ok || !response.body) { throw new Error(`Server Error: ${response.status}`); }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const fields = {};
+        let buffer = '';
+        let result = null;
+        const handleEvent = (event) => {
+            if (event.event === 'field') {
+                fields[event.field] = event.value;
+                onPartial({ ...fields });
+            } else if (event.event === 'document') {
+                result = event.value;
+            } else if (event.event === 'error') {
+                result = { error: event.error };
+            } else if (event.event === 'done' && result === null) {
+                result = {};
+                event.fields.forEach(field => { result[field] = fields[field]; });
+            }
+        };
+        while (true) {
+            const { value, done } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+            let newline;
+            while ((newline = buffer.indexOf('\n')) !== -1) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) { handleEvent(JSON.parse(line)); }
+            }
+            if (done) { break; }
+        }
+        if (buffer.trim()) { handleEvent(JSON.parse(buffer)); }
+        if (result === null) { throw new Error("The result stream ended early."); }
+        return result;
+    };
+
     const handleScrapeCurrentPage = async () => {
         showLoading(false); 
         try {
@@ -73,7 +123,10 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error("Could not access page content.");
             }
             const pageHTML = injectionResults[0].result;
-            const data = await processPage(pageHTML, tab.url);
+            // Profiles render section by section while the rest is still being extracted.
+            const data = await processPageStreaming(pageHTML, tab.url, (partial) => {
+                if (partial.type === 'person') { displayPersonProfile(partial); }
+            });
             if (data) {
                 await chrome.storage.local.set({ profileData: data, lastScrapeMethod: 'currentPage' });
                 displayRouter(data, 'currentPage');
@@ -158,7 +211,8 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
         
-        if (data.type === "person") { displayPersonProfile(data); }
+        if (Array.isArray(data)) { displayJobList(data); }
+        else if (data.type === "person") { displayPersonProfile(data); }
         else if (data.type === "job" || data.type === "indeed_job") { displayJobData(data); }
         else if (data.type === "company" || data.type === "indeed_company") { displayCompanyData(data); }
         else { showError(`Unknown data type received: ${data.type || 'N/A'}`, source); }
@@ -281,6 +335,20 @@ document.addEventListener('DOMContentLoaded', () => {
         showResult();
     };
       
+    // --- NEW: Search result pages return an array of job cards ---
+    const displayJobList = (jobs) => {
+        resultContent.innerHTML = '';
+        createCopiableBlock(resultContent, `<h2>${jobs.length} jobs found</h2>`, 'job-title');
+        resultContent.appendChild(document.createElement('hr'));
+        jobs.forEach(job => {
+            const subHeaderText = [job.location, job.salary, job.date_posted].filter(item => item && item !== 'Not available').join(' · ');
+            const linkHTML = (job.job_url && job.job_url !== 'Not available') ? `<a href="${job.job_url}" target="_blank">${job.job_title}</a>` : job.job_title;
+            const itemHTML = `<strong>${linkHTML}</strong><div>${job.company_name}</div><div class="item-location">${subHeaderText}</div>`;
+            createCopiableBlock(resultContent, itemHTML, 'item');
+        });
+        showResult();
+    };
+
     const displayCompanyData = (data) => {
         resultContent.innerHTML = '';
         const headerDiv = document.createElement('div');